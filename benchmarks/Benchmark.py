@@ -0,0 +1,175 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import config
+from benchmarks import Generate
+from database_operations import Catalog
+from database_operations import Connection
+from database_operations.Schema import ARTIFACT_TABLE
+from html_operations import Output
+from html_operations import QRCache
+from html_operations import Render
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+FOLDER_PREFIX = "bench_"
+
+
+def folder_name(size):
+    return f"{FOLDER_PREFIX}{size}"
+
+
+def _folder_size(folder):
+    with Connection.cursor() as cursor:
+        if folder not in Catalog.list_folders(cursor):
+            return None
+        if Catalog.normalized():
+            cursor.execute(f"SELECT COUNT(*) FROM `{ARTIFACT_TABLE}` WHERE folder = %s", (folder,))
+        else:
+            cursor.execute(f"SELECT COUNT(*) FROM `{folder}`")
+        return cursor.fetchone()[0]
+
+
+def seed(size, seed_value=0):
+    """Create the benchmark folder for `size` artifacts unless it already holds exactly that many."""
+    folder = folder_name(size)
+    existing = _folder_size(folder)
+    if existing == size:
+        return folder
+    started = time.perf_counter()
+    # The folder number keeps titles unique across the benchmark folders; the side indexes are filled as the
+    # rows go in, so the bench folders are searchable like any other. A folder of another size is replaced.
+    Generate.generate_folder(folder, size, seed=seed_value, folder_number=size, index=True, replace=True)
+    print(f"Seeded {folder} in {time.perf_counter() - started:.1f}s")
+    return folder
+
+
+def drop(size):
+    Generate.drop_folder(folder_name(size))
+
+
+def measure(operation, inputs):
+    """Run `operation` once per input and return latency percentiles (milliseconds) and throughput."""
+    latencies = []
+    started = time.perf_counter()
+    for value in inputs:
+        before = time.perf_counter()
+        operation(value)
+        latencies.append((time.perf_counter() - before) * 1000)
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+
+    def percentile(fraction):
+        return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))]
+
+    return {
+        "runs": len(latencies),
+        "mean_ms": statistics.fmean(latencies),
+        "p50_ms": percentile(0.50),
+        "p90_ms": percentile(0.90),
+        "p99_ms": percentile(0.99),
+        "max_ms": latencies[-1],
+        "ops_per_s": len(latencies) / elapsed if elapsed else None,
+    }
+
+
+def run_size(size, repeat, work_dir):
+    """Benchmark the hot paths against the folder of `size` artifacts."""
+    folder = folder_name(size)
+    rng = random.Random(size)
+    folder_titles = Catalog.titles_in_folder(folder)
+    titles = [rng.choice(folder_titles) for _ in range(repeat)]
+    rows = [Catalog.fetch_artifact(title)[0] for title in titles[:min(repeat, 50)]]
+    qr_cache = QRCache.QRCache(os.path.join(work_dir, f"qr-{size}"))
+    results = {}
+
+    # get_titles: the cold path rebuilds the in-process title index with one scan over every folder
+    def all_titles_cold(_):
+        Catalog.title_index.invalidate()
+        Catalog.all_titles()
+
+    results["get_titles_cold"] = measure(all_titles_cold, range(max(1, repeat // 20)))
+    results["get_titles_warm"] = measure(lambda _: Catalog.all_titles(), range(max(1, repeat // 20)))
+
+    # fetch_data_for_title_dynamic
+    results["fetch_artifact"] = measure(Catalog.fetch_artifact, titles)
+    results["title_page"] = measure(lambda after: Catalog.title_page(folder, after, 200), titles)
+
+    # generate_html_page, without the save dialog
+    page_path = os.path.join(work_dir, f"page-{size}.html")
+    results["render_page"] = measure(
+        lambda data: Output.write_if_changed(page_path, Render.iter_page(data, data["title"]), compress=True),
+        (rows * (repeat // len(rows) + 1))[:repeat]
+    )
+
+    # generate_qr: first rendering, then served from the caches
+    urls = [Render.page_url(config.site_base_url, folder, data["title"]) for data in rows]
+    results["qr_cold"] = measure(lambda url: qr_cache.display_image(url, size=200), urls)
+    results["qr_warm"] = measure(lambda url: qr_cache.display_image(url, size=200), urls)
+    return results
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(sizes, repeat=200, keep=True, output=None):
+    """Seed, benchmark and (unless `keep`) drop each size; write the results as JSON and return them."""
+    report = {
+        "revision": _git_revision(),
+        "started": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "catalog_layout": config.catalog_layout,
+        "repeat": repeat,
+        "sizes": {},
+    }
+    with Connection.cursor() as cursor:
+        cursor.execute("SELECT VERSION()")
+        report["server"] = cursor.fetchone()[0]
+
+    with tempfile.TemporaryDirectory(prefix="museum-bench-") as work_dir:
+        for size in sizes:
+            seed(size)
+            print(f"Benchmarking {size} artifacts...")
+            report["sizes"][str(size)] = run_size(size, repeat, work_dir)
+            for operation, stats in report["sizes"][str(size)].items():
+                print(f"  {operation:16} p50 {stats['p50_ms']:8.2f} ms  p99 {stats['p99_ms']:8.2f} ms  "
+                      f"{stats['ops_per_s']:10.1f} ops/s")
+            if not keep:
+                drop(size)
+
+    output = output or os.path.join(RESULTS_DIR, f"{report['started'][:10]}-{report['revision']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {output}")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the fetch, render and QR hot paths against MySQL.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="Folder sizes to seed")
+    parser.add_argument("--repeat", type=int, default=200, help="Measured calls per operation")
+    parser.add_argument("--drop", action="store_true", help="Drop the benchmark folders afterwards")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/<date>-<revision>.json)")
+    args = Connection.login_from_args(parser, argv)
+
+    run(args.sizes, repeat=args.repeat, keep=not args.drop, output=args.output)
+
+
+if __name__ == "__main__":
+    main()
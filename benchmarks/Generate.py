@@ -0,0 +1,238 @@
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+from database_operations import Catalog
+from database_operations import Connection
+from database_operations import Normalized
+from database_operations import Search
+from database_operations import Tags
+from database_operations.Schema import ARTIFACT_TABLE, FOLDER_TABLE, SEARCH_TABLE, TAG_POSTING_TABLE
+
+# Word lists the synthetic catalog is drawn from
+ADJECTIVES = [
+    "Brass", "Oak", "Carved", "Painted", "Iron", "Copper", "Ivory", "Whalebone", "Teak", "Steel", "Leather",
+    "Canvas", "Pewter", "Silver", "Bronze", "Ceramic", "Glass", "Wooden", "Hand-drawn", "Engraved", "Scrimshaw",
+]
+NOUNS = [
+    "Sextant", "Compass", "Telescope", "Ship Model", "Harpoon", "Anchor", "Lantern", "Chronometer", "Figurehead",
+    "Sea Chest", "Logbook", "Chart", "Diving Helmet", "Bell", "Oar", "Rope Block", "Quadrant", "Barometer",
+    "Fishing Net", "Buoy", "Porthole", "Ship's Wheel", "Photograph", "Letter", "Uniform", "Medal", "Flag",
+]
+QUALIFIERS = [
+    "from the schooner Bluenose", "of a Lunenburg fisherman", "recovered off Sable Island", "used on the Grand Banks",
+    "from a Halifax chandlery", "of the Cunard line", "from HMCS Sackville", "from a whaling voyage",
+    "from a lighthouse keeper", "of a rum runner", "from the Titanic recovery", "of a privateer",
+]
+PLACES = ["Halifax", "Lunenburg", "Yarmouth", "Pictou", "Sydney", "Liverpool", "Shelburne", "Digby", "Louisbourg"]
+SURNAMES = ["MacLeod", "Smith", "Cameron", "Doucet", "LeBlanc", "Fraser", "Murray", "Oickle", "Zinck", "Morash"]
+PUBLISHERS = ["Nimbus", "Formac", "Goose Lane", "McGill-Queen's UP", "Maritime Museum Press", "Lancelot Press"]
+SENTENCE_WORDS = [
+    "hull", "voyage", "harbour", "rigging", "crew", "captain", "cargo", "storm", "wreck", "keel", "mast", "sail",
+    "deck", "fleet", "fishery", "shipyard", "tide", "navigation", "donated", "restored", "condition", "original",
+    "century", "maker", "inscription", "family", "museum", "collection", "recovered", "built", "used", "the", "of",
+    "and", "a", "was", "in", "by", "with", "on", "for", "from", "this", "its",
+]
+TAG_STEMS = [
+    "whaling", "fishing", "navigation", "shipbuilding", "trade", "war", "rescue", "lighthouse", "sail", "steam",
+    "schooner", "titanic", "halifax explosion", "rum running", "privateer", "immigration", "coast guard", "diving",
+    "charts", "instruments", "tools", "clothing", "photographs", "letters", "models", "art", "ropework", "lunenburg",
+]
+TAG_ZIPF_EXPONENT = 1.1  # Frequency of the k-th most common tag is proportional to 1 / k ** exponent
+
+INSERT_ROWS_PER_STATEMENT = 500
+ROWS_PER_TRANSACTION = 5000
+
+
+def tag_vocabulary():
+    """Return the tag vocabulary, most frequent first: every stem, then stem/place and stem/decade variants."""
+    tags = list(TAG_STEMS)
+    tags += [f"{stem} {place}".lower() for stem in TAG_STEMS for place in PLACES]
+    tags += [f"{decade}s {stem}" for decade in range(1750, 1990, 10) for stem in TAG_STEMS]
+    return [tag[:Catalog.TAG_MAX_LENGTH].strip() for tag in tags]
+
+
+_TAGS = tag_vocabulary()
+_TAG_WEIGHTS = list(accumulate(1 / rank ** TAG_ZIPF_EXPONENT for rank in range(1, len(_TAGS) + 1)))
+
+
+def _tags(rng):
+    count = min(len(Catalog.TAG_COLUMNS), int(rng.expovariate(1 / 4)))  # Most artifacts have a few, some many
+    tags = []
+    for tag in rng.choices(_TAGS, cum_weights=_TAG_WEIGHTS, k=count * 2):
+        if tag not in tags:
+            tags.append(tag)
+    return tags[:count]
+
+
+def _description(rng):
+    # Log-normal lengths: mostly a short paragraph, occasionally up to the form's limit
+    length = min(Catalog.DESCRIPTION_MAX_LENGTH, int(rng.lognormvariate(5.5, 0.8)))
+    words = []
+    size = 0
+    while size < length:
+        word = rng.choice(SENTENCE_WORDS)
+        words.append(word)
+        size += len(word) + 1
+    text = " ".join(words)[:length - 1].rsplit(" ", 1)[0]  # Whole words, leaving room for the full stop
+    return text[:1].upper() + text[1:] + "." if text else ""
+
+
+def _image_name(rng):
+    moment = datetime(2005, 1, 1) + timedelta(seconds=rng.randrange(20 * 365 * 24 * 3600))
+    style = rng.random()
+    if style < 0.5:
+        return f"IMG_{moment:%Y%m%d_%H%M%S}.jpg"
+    if style < 0.8:
+        return f"DSC{rng.randrange(100000):05d}.JPG"
+    return f"scan_{rng.randrange(10000):04d}.tif"
+
+
+def _reference(rng):
+    style = rng.random()
+    if style < 0.6:
+        reference = (f"{rng.choice(SURNAMES)}, {rng.choice('ABCDEFGHJKLMRSTW')}. ({rng.randint(1890, 2020)}). "
+                     f"{rng.choice(NOUNS)}s of {rng.choice(PLACES)}. {rng.choice(PUBLISHERS)}, "
+                     f"p. {rng.randint(1, 400)}")
+    elif style < 0.85:
+        reference = f"Accession {rng.randint(1950, 2024)}.{rng.randint(1, 300)}.{rng.randint(1, 40)}"
+    else:
+        reference = f"Nova Scotia Archives, MG {rng.randint(1, 100)} vol. {rng.randint(1, 900)}"
+    return reference[:Catalog.REFERENCE_MAX_LENGTH]
+
+
+def _size(rng):
+    # Mostly hand-sized objects (centimetres), with a long tail up to whole boats
+    return round(min(Catalog.SIZE_MAX, rng.lognormvariate(3.5, 1.2)), 2)
+
+
+def artifact_rows(rng, count, folder_number):
+    """Yield `count` synthetic rows (ARTIFACT_COLUMNS dicts) respecting the entry form limits."""
+    for number in range(count):
+        # The numeric suffix keeps titles unique across the whole catalog, as the title index expects
+        suffix = f" #{folder_number}-{number}"
+        title = f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {rng.choice(QUALIFIERS)}"
+        title = title[:Catalog.TITLE_MAX_LENGTH - len(suffix)] + suffix
+        location = f"{rng.choice(PLACES)} storage, shelf {rng.randint(1, 60)}" if rng.random() < 0.3 else \
+            f"Gallery {rng.randint(1, 12)}, case {rng.randint(1, 40)}"
+        yield Catalog.entry_row(
+            title,
+            _description(rng),
+            [_reference(rng) for _ in range(min(len(Catalog.REFERENCE_COLUMNS), int(rng.expovariate(1 / 2))))],
+            location[:Catalog.LOCATION_MAX_LENGTH],
+            {"length": _size(rng), "width": _size(rng), "height": _size(rng)},
+            _tags(rng),
+            [_image_name(rng) for _ in range(min(len(Catalog.IMAGE_COLUMNS), int(rng.expovariate(1 / 2))))],
+        )
+
+
+def bulk_insert(folder, rows, index=False):
+    """Insert rows with multi-row INSERT statements, ROWS_PER_TRANSACTION rows per commit.
+
+    In the normalized layout each statement-sized chunk goes through Normalized.write_rows, whose executemany calls
+    are sent as multi-row INSERTs too. The side indexes (search, tags) are only updated with `index`; otherwise
+    rebuild them afterwards with python -m database_operations.Reindex, which is faster for a whole catalog.
+    """
+    rows = list(rows)
+    columns = Catalog.ARTIFACT_COLUMNS
+    row_placeholders = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    for start in range(0, len(rows), ROWS_PER_TRANSACTION):
+        with Connection.transaction() as cursor:
+            for offset in range(start, min(start + ROWS_PER_TRANSACTION, len(rows)), INSERT_ROWS_PER_STATEMENT):
+                chunk = rows[offset:min(offset + INSERT_ROWS_PER_STATEMENT, start + ROWS_PER_TRANSACTION)]
+                if Catalog.normalized():
+                    Normalized.write_rows(cursor, folder, chunk)
+                else:
+                    cursor.execute(
+                        f"INSERT INTO `{folder}` ({', '.join(columns)}) "
+                        f"VALUES {', '.join([row_placeholders] * len(chunk))}",
+                        tuple(row[column] for row in chunk for column in columns)
+                    )
+                if index:
+                    Search.index_rows(cursor, folder, chunk)
+                    Tags.index_rows(cursor, folder, chunk)
+    return len(rows)
+
+
+def drop_folder(folder):
+    """Delete a folder, its artifacts and their side index entries. Returns False if there was no such folder."""
+    with Connection.transaction() as cursor:
+        if folder not in Catalog.list_folders(cursor):
+            return False
+        if Catalog.normalized():
+            cursor.execute(f"DELETE FROM `{ARTIFACT_TABLE}` WHERE folder = %s", (folder,))
+            cursor.execute(f"DELETE FROM `{FOLDER_TABLE}` WHERE name = %s", (folder,))
+        else:
+            cursor.execute(f"DROP TABLE `{folder}`")
+        # The side indexes are keyed by folder too
+        if Search.enabled(cursor):
+            cursor.execute(f"DELETE FROM `{SEARCH_TABLE}` WHERE folder = %s", (folder,))
+        if Tags.enabled(cursor):
+            cursor.execute(f"DELETE FROM `{TAG_POSTING_TABLE}` WHERE folder = %s", (folder,))
+    Catalog.title_index.invalidate()
+    return True
+
+
+def generate_folder(folder, count, seed=0, folder_number=0, index=False, replace=False):
+    """Create `folder` and fill it with `count` synthetic artifacts. The same seed always yields the same data.
+
+    With `index`, the search and tag indexes are updated as the rows are inserted (see bulk_insert).
+    A folder left by an earlier run is dropped first with `replace`; otherwise it raises ValueError.
+    """
+    rng = random.Random(f"{seed}-{folder_number}")  # Per-folder streams: adding folders does not change the others
+    if replace:
+        drop_folder(folder)
+    else:
+        with Connection.cursor() as cursor:
+            if folder in Catalog.list_folders(cursor):
+                raise ValueError(f"Folder {folder} already exists; pass --drop to replace it.")
+    Catalog.create_folder(folder)
+    inserted = 0
+    batch = []
+    for row in artifact_rows(rng, count, folder_number):
+        batch.append(row)
+        if len(batch) >= ROWS_PER_TRANSACTION:
+            inserted += bulk_insert(folder, batch, index)
+            batch = []
+    if batch:
+        inserted += bulk_insert(folder, batch, index)
+    Catalog.title_index.invalidate()
+    return inserted
+
+
+def generate(folders, artifacts, seed=0, prefix="synthetic", index=False, replace=False):
+    """Create `folders` folder tables named <prefix>_NNN with `artifacts` artifacts each (see generate_folder)."""
+    started = time.perf_counter()
+    total = 0
+    for number in range(folders):
+        folder = f"{prefix}_{number:03d}"
+        total += generate_folder(folder, artifacts, seed, number, index, replace)
+        elapsed = time.perf_counter() - started
+        print(f"{folder}: {artifacts} artifacts ({total / elapsed:.0f} rows/s overall)")
+    print(f"Generated {total} artifacts in {folders} folders in {time.perf_counter() - started:.1f}s.")
+    if not index:
+        print("Rebuild the side indexes with: python -m database_operations.Reindex")
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fill the catalog with reproducible synthetic artifacts.")
+    parser.add_argument("--folders", type=int, default=10, help="Number of folder tables to create")
+    parser.add_argument("--artifacts", type=int, default=1000, help="Artifacts per folder")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (same seed, same catalog)")
+    parser.add_argument("--prefix", default="synthetic", help="Folder names are <prefix>_000, <prefix>_001, ...")
+    parser.add_argument("--index", action="store_true",
+                        help="Update the search and tag indexes while inserting (instead of running Reindex afterwards)")
+    parser.add_argument("--drop", action="store_true", help="Replace the folders left by an earlier run")
+    args = Connection.login_from_args(parser, argv)
+
+    try:
+        generate(args.folders, args.artifacts, args.seed, args.prefix, args.index, args.drop)
+    except ValueError as err:
+        parser.exit(1, f"{err}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+import os
+
 # MySQL Credentials
 mysql_username = None
 mysql_password = None
@@ -6,6 +8,48 @@ mysql_password = None
 #mysql_username = "root"
 #mysql_password = "YellowMYSQL45*"
 
+# MySQL server and connection pool
+mysql_host = "localhost"
+mysql_database = "museum"
+mysql_pool_size = 5  # Maximum number of open connections shared by the whole application
+mysql_pool_timeout = 10  # Seconds to wait for a free connection before giving up
+mysql_health_check_interval = 30  # Ping connections that have been idle longer than this (seconds)
+
+# Catalog storage layout: "wide" (one table per folder with tag_1..tag_15 etc. columns) or "normalized"
+# (artifacts table plus indexed tag/reference/image tables; populate it with python -m database_operations.Migrate)
+catalog_layout = "wide"
+
+# Static site generation (see WS_README.txt)
+site_output_root = "/var/www/html/marinemuseuminfo.com/public_html"
+site_base_url = "http://marinemuseuminfo.com"  # Public URL of site_output_root, encoded in the QR codes
+site_workers = None  # Rendering processes; None uses every CPU
+
+# QR codes are rendered once and cached here (see html_operations/QRCache.py)
+qr_cache_dir = os.path.join(os.path.expanduser("~"), ".museum_cache", "qr")
+
+# Uploaded images: originals and their web derivatives are kept here (see database_operations/Images.py)
+image_store_root = os.path.join(os.path.expanduser("~"), "museum_images")
+image_widths = (320, 640, 1280)  # Derivative widths in pixels; originals are never upscaled
+image_workers = None  # Derivative processes; None uses every CPU
+image_near_duplicate_distance = 6  # Flag uploads whose perceptual hash differs by at most this many bits; None disables
+
+# Database and rendering calls made from the windows run on these background threads (see html_operations/Background.py)
+gui_workers = 4
+
+# Timing metrics of database calls, page writes and QR rendering (see metrics.py); None disables them.
+# "{role}" in the path is replaced by the program name (QR, Site, ...), so programs running at once keep separate
+# files; site build workers report to the Site process rather than writing files of their own.
+metrics_file = None  # e.g. os.path.join(os.path.expanduser("~"), ".museum_cache", "metrics-{role}.prom")
+metrics_format = "json"  # "json" or "prometheus" (text format, for the node_exporter textfile collector)
+metrics_flush_interval = 30  # Seconds between writes of the metrics file
+
+# Slow query log (see database_operations/QueryLog.py): statements slower than slow_query_ms are logged, with the
+# EXPLAIN plan of each new query shape. None disables it.
+slow_query_ms = None  # e.g. 200
+slow_query_log = os.path.join(os.path.expanduser("~"), ".museum_cache", "slow_queries.log")
+slow_query_log_max_bytes = 5 * 1024 * 1024  # The log is rotated at this size...
+slow_query_log_backups = 3  # ...keeping this many old files
+
 #global color scheme
 BG_COLOR = "#E0F0FD"  # Light blue background
 ENTRY_COLOR = "#BBDEFB"  # Lighter blue for input fields
@@ -0,0 +1,2 @@
+# Lets `python -m pytest` (or plain `pytest`) import the project packages from the repository root.
+# The tests in tests/ cover pure logic only and need no MySQL server.
@@ -0,0 +1,634 @@
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import Counter
+
+import mysql.connector
+
+import config
+import metrics
+from database_operations import Connection
+from database_operations import Normalized
+from database_operations import Search
+from database_operations import Tags
+# The column layout lives in Schema; it is re-exported here for callers of the catalog
+from database_operations.Schema import (
+    ARTIFACT_COLUMNS, DESCRIPTION_MAX_LENGTH, IMAGE_COLUMNS, INTERNAL_TABLE_PREFIX, LOCATION_MAX_LENGTH,
+    REFERENCE_COLUMNS, REFERENCE_MAX_LENGTH, REFERENCE_TABLE, SIZE_COLUMNS, SIZE_MAX, TAG_COLUMNS, TAG_MAX_LENGTH,
+    TAG_TABLE, TITLE_MAX_LENGTH, folder_table_ddl
+)
+
+MISS_REFRESH_INTERVAL = 30  # Seconds: a title index older than this is rebuilt when a lookup misses
+
+
+def normalized():
+    """Return True when the catalog uses the normalized layout (see config.catalog_layout)."""
+    return config.catalog_layout == "normalized"
+
+
+def list_folders(cursor):
+    """Return the names of all folders of the configured layout."""
+    if normalized():
+        return Normalized.list_folders(cursor)
+    return list_folder_tables(cursor)
+
+
+def list_folder_tables(cursor):
+    """Return the names of all wide-layout folder tables, i.e. every non-internal table with a 'title' column."""
+    cursor.execute("""
+    SELECT TABLE_NAME
+    FROM INFORMATION_SCHEMA.COLUMNS
+    WHERE TABLE_SCHEMA = %s AND COLUMN_NAME = 'title'
+    ORDER BY TABLE_NAME
+    """, (config.mysql_database,))
+    return [row[0] for row in cursor.fetchall() if not row[0].startswith(INTERNAL_TABLE_PREFIX)]
+
+
+_title_indexed_tables = set()
+_title_indexed_lock = threading.Lock()
+
+
+def _add_title_index(cursor, table, data_type):
+    key = "title" if data_type.lower() in ("char", "varchar") else "title(75)"  # TEXT columns need a prefix
+    try:
+        cursor.execute(f"ALTER TABLE `{table}` ADD INDEX idx_title ({key})")
+        print(f"Added the title index to {table}")
+    except mysql.connector.Error as err:
+        # The index is only an optimisation (e.g. the user may lack ALTER privileges)
+        print(f"Could not add a title index to {table}: {err}")
+
+
+def ensure_title_index(cursor, table):
+    """Add an index on `title` to a folder table that lacks one (checked once per table per process).
+
+    A schema change: run by Migrate for tables created before folder_table_ddl had the index, never on lookups.
+    """
+    with _title_indexed_lock:
+        if table in _title_indexed_tables:
+            return
+        cursor.execute("""
+        SELECT COUNT(*)
+        FROM INFORMATION_SCHEMA.STATISTICS
+        WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND COLUMN_NAME = 'title' AND SEQ_IN_INDEX = 1
+        """, (config.mysql_database, table))
+        if not cursor.fetchone()[0]:
+            cursor.execute("""
+            SELECT DATA_TYPE
+            FROM INFORMATION_SCHEMA.COLUMNS
+            WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND COLUMN_NAME = 'title'
+            """, (config.mysql_database, table))
+            _add_title_index(cursor, table, cursor.fetchone()[0])
+        _title_indexed_tables.add(table)
+
+
+def ensure_title_indexes():
+    """Add the title index to every wide-layout folder table that lacks it. Returns the tables it was added to.
+
+    Keyset paging (title_page) is a range scan only with this index, which folder_table_ddl creates but older
+    tables lack. One INFORMATION_SCHEMA query finds them; run at application login and by Migrate --title-indexes.
+    """
+    if normalized():
+        return []
+    with Connection.cursor() as cursor:
+        cursor.execute("""
+        SELECT c.TABLE_NAME, c.DATA_TYPE
+        FROM INFORMATION_SCHEMA.COLUMNS c
+        WHERE c.TABLE_SCHEMA = %s AND c.COLUMN_NAME = 'title' AND NOT EXISTS (
+            SELECT 1 FROM INFORMATION_SCHEMA.STATISTICS s
+            WHERE s.TABLE_SCHEMA = c.TABLE_SCHEMA AND s.TABLE_NAME = c.TABLE_NAME
+            AND s.COLUMN_NAME = 'title' AND s.SEQ_IN_INDEX = 1
+        )
+        """, (config.mysql_database,))
+        missing = [(table, data_type) for table, data_type in cursor.fetchall()
+                   if not table.startswith(INTERNAL_TABLE_PREFIX)]
+        with _title_indexed_lock:
+            for table, data_type in missing:
+                _add_title_index(cursor, table, data_type)
+                _title_indexed_tables.add(table)
+    return [table for table, _ in missing]
+
+
+def _prefix_key(title):
+    return str(title).casefold()
+
+
+class TitleIndex:
+    """In-process hash index mapping every title to the folder table that holds it.
+
+    The index is built lazily with a single UNION ALL scan over the folder tables and is kept in sync
+    by the write helpers (record_write / record_delete). Lookups that miss, or that point at a row which
+    has since disappeared, rebuild it so that writes made by other clients are picked up too, but at most
+    once every MISS_REFRESH_INTERVAL seconds: a burst of mistyped titles does not rescan the catalog each time.
+
+    Next to the hash map it keeps sorted (casefolded title, title) lists, one for the whole catalog and one
+    per folder, so that type-ahead prefix queries are a bisect plus a short scan.
+
+    Scans run outside the lock and the new maps are swapped in afterwards, so readers on the Tk thread
+    never wait for the database: until the swap they see the previous (or no) snapshot.
+    """
+
+    def __init__(self):
+        self._tables = None
+        self._sorted = None
+        self._built_at = None
+        self._epoch = 0  # Bumped by invalidate(): a scan started before it is not installed
+        self._journal = None  # Writes recorded while a scan runs, replayed onto its result
+        self._lock = threading.Lock()  # Guards the maps; never held during a scan
+        self._build_lock = threading.Lock()  # One scan at a time
+
+    def _build(self, cursor):
+        if normalized():
+            return dict(Normalized.title_folders(cursor))
+        folders = list_folders(cursor)
+        tables = {}
+        if folders:
+            query = " UNION ALL ".join(f"SELECT title, %s FROM `{folder}`" for folder in folders)
+            cursor.execute(query, tuple(folders))
+            for title, table in cursor.fetchall():
+                tables.setdefault(title, table)  # First folder wins, as with the old per-table scan
+        return tables
+
+    @staticmethod
+    def _sort(tables):
+        sorted_titles = {None: []}
+        for title, table in tables.items():
+            sorted_titles[None].append((_prefix_key(title), title))
+            sorted_titles.setdefault(table, []).append((_prefix_key(title), title))
+        for entries in sorted_titles.values():
+            entries.sort()
+        return sorted_titles
+
+    def _load(self, cursor, max_age=None):
+        """Scan the catalog unless the index is built (and, with `max_age`, younger than that many seconds).
+
+        Returns (rebuilt, title -> folder map to read).
+        """
+        with self._build_lock:
+            with self._lock:
+                if self._tables is not None and (max_age is None or time.monotonic() - self._built_at < max_age):
+                    return False, self._tables  # Built meanwhile by another thread, or still fresh
+                epoch = self._epoch
+                self._journal = []
+            try:
+                tables = self._build(cursor)
+                sorted_titles = self._sort(tables)
+            finally:
+                with self._lock:
+                    journal, self._journal = self._journal, None
+            with self._lock:
+                for change in journal:
+                    self._apply(tables, sorted_titles, *change)
+                if epoch == self._epoch:
+                    self._tables, self._sorted = tables, sorted_titles
+                    self._built_at = time.monotonic()
+            return True, tables
+
+    def _ensure(self, cursor):
+        with self._lock:
+            tables = self._tables
+        if tables is None:
+            tables = self._load(cursor)[1]
+        return tables
+
+    def refresh(self, cursor, max_age=MISS_REFRESH_INTERVAL):
+        """Rebuild the index unless it was built less than `max_age` seconds ago. Returns True if it was rebuilt."""
+        return self._load(cursor, max_age)[0]
+
+    def lookup(self, cursor, title):
+        """Return the folder table holding `title`, or None."""
+        return self._ensure(cursor).get(title)
+
+    def titles(self, cursor):
+        """Return every indexed title."""
+        return list(self._ensure(cursor))
+
+    def with_prefix(self, cursor, prefix, folder=None, limit=200):
+        """Return up to `limit` titles starting with `prefix` (case-insensitive), in order, optionally of one folder.
+
+        With `cursor` None the index is only read from memory, without waiting for a scan in progress:
+        returns None if it has not been built yet.
+        """
+        key = _prefix_key(prefix)
+        while True:
+            with self._lock:
+                if self._sorted is not None:
+                    return self._scan_prefix(self._sorted.get(folder, []), key, limit)
+            if cursor is None:
+                return None
+            self._load(cursor)  # Not installed only if invalidate() ran during the scan: then scan again
+
+    @staticmethod
+    def _scan_prefix(entries, key, limit):
+        start = bisect_left(entries, (key,))
+        titles = []
+        for entry_key, title in entries[start:start + limit]:
+            if not entry_key.startswith(key):
+                break
+            titles.append(title)
+        return titles
+
+    @staticmethod
+    def _remove_sorted(sorted_titles, title, table):
+        for entries in (sorted_titles[None], sorted_titles.get(table, [])):
+            entry = (_prefix_key(title), title)
+            position = bisect_left(entries, entry)
+            if position < len(entries) and entries[position] == entry:
+                del entries[position]
+
+    @classmethod
+    def _apply(cls, tables, sorted_titles, title, table):
+        """Record in the maps that `title` now lives in `table` (None: deleted)."""
+        previous = tables.pop(title, None)
+        if previous is not None:
+            cls._remove_sorted(sorted_titles, title, previous)
+        if table is not None:
+            tables[title] = table
+            insort(sorted_titles[None], (_prefix_key(title), title))
+            insort(sorted_titles.setdefault(table, []), (_prefix_key(title), title))
+
+    def _record(self, title, table):
+        with self._lock:
+            if self._tables is not None:
+                self._apply(self._tables, self._sorted, title, table)
+            if self._journal is not None:
+                self._journal.append((title, table))
+
+    def record_write(self, title, table):
+        self._record(title, table)
+
+    def record_delete(self, title):
+        self._record(title, None)
+
+    def invalidate(self):
+        with self._lock:
+            self._epoch += 1
+            self._tables = None
+            self._sorted = None
+
+
+title_index = TitleIndex()
+
+
+def _select_artifact(cursor, table, title):
+    cursor.execute(
+        f"SELECT {', '.join(ARTIFACT_COLUMNS)} FROM `{table}` WHERE title = %s LIMIT 1",
+        (title,)
+    )
+    result = cursor.fetchone()
+    return dict(zip(ARTIFACT_COLUMNS, result)) if result else None
+
+
+@metrics.timed("db.fetch_artifact")
+def fetch_artifact(title):
+    """Resolve `title` through the title index and fetch its row; returns (data, table) or (None, None)."""
+    with Connection.cursor() as cursor:
+        if normalized():
+            return Normalized.select_artifact(cursor, title)  # The unique title index resolves it directly
+
+        table = title_index.lookup(cursor, title)
+        if table:
+            data = _select_artifact(cursor, table, title)
+            if data:
+                return data, table
+            title_index.record_delete(title)  # Stale entry: the row was deleted (or moved) by another client
+
+        # Miss: the title may have been written by another client since the index was built
+        if not title_index.refresh(cursor):
+            return None, None  # Built recently: a plain miss (mistyped or deleted title)
+        table = title_index.lookup(cursor, title)
+        if table:
+            data = _select_artifact(cursor, table, title)
+            if data:
+                return data, table
+        return None, None
+
+
+def all_titles():
+    """Return all titles across all folder tables."""
+    with Connection.cursor() as cursor:
+        return title_index.titles(cursor)
+
+
+def iter_folder_rows(folder, batch_size=500):
+    """Stream every artifact row of a folder table as dicts, `batch_size` rows at a time."""
+    if normalized():
+        yield from Normalized.iter_folder_rows(folder, batch_size)
+        return
+    with Connection.cursor() as cursor:
+        cursor.execute(f"SELECT {', '.join(ARTIFACT_COLUMNS)} FROM `{folder}`")
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield dict(zip(ARTIFACT_COLUMNS, row))
+
+
+def iter_folder_titles(folder, batch_size=1000):
+    """Stream every title of a folder table."""
+    if normalized():
+        yield from Normalized.iter_folder_titles(folder, batch_size)
+        return
+    with Connection.cursor() as cursor:
+        cursor.execute(f"SELECT title FROM `{folder}`")
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield row[0]
+
+
+def entry_row(title, description="", references=None, location="", size=None, tags=None, image_titles=None):
+    """Map the fields collected by the entry forms onto the folder-table columns (empty values become NULL)."""
+    size = size or {}
+    values = {
+        "title": title,
+        "description": description,
+        "location": location,
+        "hight": size.get("height"),
+        "width": size.get("width"),
+        "length": size.get("length"),
+    }
+    for columns, items in ((IMAGE_COLUMNS, image_titles), (REFERENCE_COLUMNS, references), (TAG_COLUMNS, tags)):
+        items = list(items or [])
+        values.update(zip(columns, items + [None] * (len(columns) - len(items))))
+    return {column: (values.get(column) if values.get(column) not in ("", None) else None)
+            for column in ARTIFACT_COLUMNS}
+
+
+def validate_row(row):
+    """Check a row against the limits the entry forms enforce. Returns a list of error messages (empty if valid)."""
+    errors = []
+    if not row.get("title"):
+        errors.append("title is required")
+    if not row.get("description"):
+        errors.append("description is required")
+    limits = [("title", TITLE_MAX_LENGTH), ("description", DESCRIPTION_MAX_LENGTH), ("location", LOCATION_MAX_LENGTH)]
+    limits += [(column, REFERENCE_MAX_LENGTH) for column in REFERENCE_COLUMNS]
+    limits += [(column, TAG_MAX_LENGTH) for column in TAG_COLUMNS]
+    for column, limit in limits:
+        if row.get(column) and len(str(row[column])) > limit:
+            errors.append(f"{column} is longer than {limit} characters")
+    for column in SIZE_COLUMNS:
+        if row.get(column) is None:
+            continue
+        try:
+            if float(row[column]) > SIZE_MAX:
+                errors.append(f"{column} is larger than {SIZE_MAX}")
+        except (TypeError, ValueError):
+            errors.append(f"{column} is not a number")
+    return errors
+
+
+def _insert_sql(folder):
+    placeholders = ", ".join(["%s"] * len(ARTIFACT_COLUMNS))
+    return f"INSERT INTO `{folder}` ({', '.join(ARTIFACT_COLUMNS)}) VALUES ({placeholders})"
+
+
+def _delete_existing(cursor, titles):
+    """Delete the current rows of `titles`, wherever they live, so that saving an entry replaces it."""
+    by_table = {}
+    for title, table in existing_titles(cursor, titles).items():
+        by_table.setdefault(table, []).append(title)
+    for table, table_titles in by_table.items():
+        placeholders = ", ".join(["%s"] * len(table_titles))
+        cursor.execute(f"DELETE FROM `{table}` WHERE title IN ({placeholders})", tuple(table_titles))
+
+
+def title_folder(cursor, title):
+    """Return the folder holding `title`, or None.
+
+    Wide layout: resolved through the title index, which is rebuilt on a miss when it is older than
+    MISS_REFRESH_INTERVAL, so titles written by other clients are seen too.
+    """
+    if normalized():
+        return Normalized.folder_of(cursor, title)
+    table = title_index.lookup(cursor, title)
+    if table is None and title_index.refresh(cursor):
+        table = title_index.lookup(cursor, title)
+    return table
+
+
+def _check_title_free(cursor, title, own=None):
+    """Raise ValueError if `title` belongs to an entry other than `own` ((folder, title) being edited, or None)."""
+    folder = title_folder(cursor, title)
+    if folder is not None and (folder, title) != own:
+        raise ValueError(f"An entry titled '{title}' already exists in {folder}.")
+
+
+def existing_titles(cursor, titles, batch_size=500):
+    """Return {title: folder} for those of `titles` already in the catalog, one query per `batch_size` titles.
+
+    Reads the tables, not the title index: bulk loads neither build the index nor depend on its age.
+    """
+    titles = list(dict.fromkeys(titles))
+    found = {}
+    folders = None if normalized() else list_folders(cursor)
+    for start in range(0, len(titles), batch_size):
+        batch = titles[start:start + batch_size]
+        if normalized():
+            found.update(Normalized.folders_of(cursor, batch))
+            continue
+        if not folders:
+            break
+        placeholders = ", ".join(["%s"] * len(batch))
+        query = " UNION ALL ".join(f"SELECT title, %s FROM `{folder}` WHERE title IN ({placeholders})"
+                                   for folder in folders)
+        params = []
+        for folder in folders:
+            params += [folder] + batch
+        cursor.execute(query, tuple(params))
+        for title, folder in cursor.fetchall():
+            found.setdefault(title, folder)  # First folder wins, as in the title index
+    return found
+
+
+def _check_batch(cursor, titles, replace):
+    """Raise ValueError if a title appears twice in `titles` or, unless `replace`, is already in the catalog."""
+    repeated = [title for title, count in Counter(titles).items() if count > 1]
+    if repeated:
+        raise ValueError(f"These titles appear more than once: {_title_list(repeated)}.")
+    if replace:
+        return
+    taken = existing_titles(cursor, titles)
+    if len(taken) == 1:
+        title, folder = next(iter(taken.items()))
+        raise ValueError(f"An entry titled '{title}' already exists in {folder}.")
+    if taken:
+        raise ValueError(f"These titles already exist: {_title_list(taken)}.")
+
+
+def _title_list(titles, shown=10):
+    titles = list(titles)
+    text = ", ".join(f"'{title}'" for title in titles[:shown])
+    return text + (f" and {len(titles) - shown} more" if len(titles) > shown else "")
+
+
+def _index_written(cursor, folder, rows):
+    """Bring the side indexes up to date with rows just written (inside the same transaction)."""
+    Search.index_rows(cursor, folder, rows)
+    Tags.index_rows(cursor, folder, rows)
+
+
+def _index_deleted(cursor, titles):
+    Search.remove_titles(cursor, titles)
+    Tags.remove_titles(cursor, titles)
+
+
+@metrics.timed("db.insert_entry")
+def insert_entry(folder, row, replace=False):
+    """Write one new entry into a folder table with a prepared statement, inside a single transaction.
+
+    Raises ValueError if the title is already used, unless `replace`, which overwrites that entry wherever it is.
+    """
+    if normalized():
+        with Connection.transaction() as cursor:
+            if not replace:
+                _check_title_free(cursor, row["title"])
+            Normalized.write_rows(cursor, folder, [row], replace=replace)
+            _index_written(cursor, folder, [row])
+        title_index.record_write(row["title"], folder)
+        return
+    with Connection.transaction(prepared=True) as cursor:
+        if replace:
+            _delete_existing(cursor, [row["title"]])
+        else:
+            _check_title_free(cursor, row["title"])
+        cursor.execute(_insert_sql(folder), tuple(row[column] for column in ARTIFACT_COLUMNS))
+        _index_written(cursor, folder, [row])
+    title_index.record_write(row["title"], folder)
+
+
+@metrics.timed("db.replace_entry")
+def replace_entry(folder, row, original_folder, original_title):
+    """Save an edited entry: delete exactly the original (folder, title) row and write `row` into `folder`.
+
+    The title and the folder may both have changed. Raises ValueError if the new title belongs to another entry.
+    """
+    with Connection.transaction() as cursor:
+        _check_title_free(cursor, row["title"], own=(original_folder, original_title))
+        if normalized():
+            Normalized.delete_artifact(cursor, original_folder, original_title)
+            Normalized.write_rows(cursor, folder, [row])
+        else:
+            cursor.execute(f"DELETE FROM `{original_folder}` WHERE title = %s", (original_title,))
+            cursor.execute(_insert_sql(folder), tuple(row[column] for column in ARTIFACT_COLUMNS))
+        _index_deleted(cursor, [original_title])
+        _index_written(cursor, folder, [row])
+    title_index.record_delete(original_title)
+    title_index.record_write(row["title"], folder)
+
+
+@metrics.timed("db.insert_entries")
+def insert_entries(folder, rows, replace=False):
+    """Write many entries into a folder table with one batched executemany, committed together.
+
+    Raises ValueError, before anything is written, if a title appears twice in `rows` or, unless `replace`,
+    is already used.
+    """
+    rows = list(rows)
+    if not rows:
+        return 0
+    with Connection.transaction() as cursor:
+        _check_batch(cursor, [row["title"] for row in rows], replace)
+        if normalized():
+            Normalized.write_rows(cursor, folder, rows, replace=replace)
+        else:
+            if replace:
+                _delete_existing(cursor, [row["title"] for row in rows])
+            # executemany rewrites this into multi-row INSERT statements: one round trip per batch, not per row
+            cursor.executemany(_insert_sql(folder), [tuple(row[column] for column in ARTIFACT_COLUMNS) for row in rows])
+        _index_written(cursor, folder, rows)
+    for row in rows:
+        title_index.record_write(row["title"], folder)
+    return len(rows)
+
+
+@metrics.timed("db.delete_title")
+def delete_title(title):
+    """Delete the entry with this title from whichever folder table holds it. Returns the table, or None."""
+    with Connection.transaction() as cursor:
+        if normalized():
+            table = Normalized.delete_titles(cursor, [title]).get(title)
+        else:
+            table = title_index.lookup(cursor, title)
+            if table:
+                cursor.execute(f"DELETE FROM `{table}` WHERE title = %s", (title,))
+        if table:
+            _index_deleted(cursor, [title])
+    title_index.record_delete(title)
+    return table
+
+
+def titles_in_folder(folder):
+    """Return every title of a folder."""
+    return list(iter_folder_titles(folder))
+
+
+def title_page(folder, after="", limit=200):
+    """Return up to `limit` titles of a folder that sort after `after`, in title order.
+
+    Keyset pagination: each page is one range scan of the title index, however deep into the folder it starts.
+    """
+    with Connection.cursor() as cursor:
+        if normalized():
+            return Normalized.title_page(cursor, folder, after, limit)
+        cursor.execute(f"SELECT title FROM `{folder}` WHERE title > %s ORDER BY title LIMIT %s", (after, limit))
+        return [row[0] for row in cursor.fetchall()]
+
+
+def thumbnail_page(folder, after="", limit=60):
+    """Like title_page, but returns (title, first image name or None) pairs, for gallery pages."""
+    with Connection.cursor() as cursor:
+        if normalized():
+            return Normalized.thumbnail_page(cursor, folder, after, limit)
+        cursor.execute(
+            f"SELECT title, COALESCE({', '.join(IMAGE_COLUMNS)}) FROM `{folder}` "
+            f"WHERE title > %s ORDER BY title LIMIT %s",
+            (after, limit)
+        )
+        return cursor.fetchall()
+
+
+def create_folder(folder):
+    """Create a new, empty folder. Raises ValueError for names that are not safe table names."""
+    if not re.fullmatch(r"[A-Za-z0-9][A-Za-z0-9 _-]{0,63}", folder or ""):
+        raise ValueError("Folder names may only use letters, digits, spaces, '-' and '_' (up to 64 characters).")
+    with Connection.cursor() as cursor:
+        if normalized():
+            Normalized.create_folder(cursor, folder)
+        else:
+            cursor.execute(folder_table_ddl(folder))
+
+
+def _find_by_list_column(table, value_column, columns, value):
+    with Connection.cursor() as cursor:
+        if normalized():
+            return Normalized.find_by_child(cursor, table, value_column, value)
+        # Wide layout: every folder table has to be scanned with one predicate per positional column
+        folders = list_folders(cursor)
+        if not folders:
+            return []
+        predicate = " OR ".join(f"{column} = %s" for column in columns)
+        query = " UNION ALL ".join(f"SELECT %s, title FROM `{folder}` WHERE {predicate}" for folder in folders)
+        params = []
+        for folder in folders:
+            params += [folder] + [value] * len(columns)
+        cursor.execute(query, tuple(params))
+        return cursor.fetchall()
+
+
+def find_by_tag(tag):
+    """Return (folder, title) of every artifact carrying `tag`."""
+    with Connection.cursor() as cursor:
+        use_postings = Tags.enabled(cursor)
+    if use_postings:
+        return Tags.filter_artifacts(all_of=[tag])  # One index range scan, whatever the layout
+    return _find_by_list_column(TAG_TABLE, "tag", TAG_COLUMNS, tag)
+
+
+def find_by_reference(reference):
+    """Return (folder, title) of every artifact citing `reference`."""
+    return _find_by_list_column(REFERENCE_TABLE, "reference", REFERENCE_COLUMNS, reference)
@@ -0,0 +1,251 @@
+import getpass
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+import mysql.connector
+from mysql.connector import errors
+
+import config
+import metrics
+from database_operations import QueryLog
+
+
+class ConnectionPool:
+    """A bounded, thread-safe pool of MySQL connections with health checks and automatic reconnects."""
+
+    def __init__(self, user, password, host="localhost", database="museum", size=5, timeout=10,
+                 health_check_interval=30):
+        self.user = user
+        self.password = password
+        self.host = host
+        self.database = database
+        self.size = size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+
+        self._idle = queue.LifoQueue()  # (connection, released_at); LIFO keeps the warmest connections in use
+        self._slots = threading.BoundedSemaphore(size)  # Caps the number of open connections
+        self._closed = False
+
+    @property
+    def credentials(self):
+        return self.host, self.database, self.user, self.password
+
+    def _connect(self):
+        """Open a new server connection. Autocommit keeps pooled reads from seeing stale snapshots."""
+        return mysql.connector.connect(
+            host=self.host,
+            user=self.user,
+            password=self.password,
+            database=self.database,
+            autocommit=True,
+            consume_results=True  # A partially read result must not poison the connection for the next user
+        )
+
+    def _is_healthy(self, connection, released_at):
+        """Ping connections that sat idle for a while, reconnecting them if the server dropped them."""
+        if time.monotonic() - released_at < self.health_check_interval:
+            return True
+        try:
+            connection.ping(reconnect=True, attempts=2, delay=0)
+            return True
+        except mysql.connector.Error:
+            return False
+
+    def acquire(self):
+        """Check a connection out of the pool, blocking for up to `timeout` seconds if all are in use."""
+        if self._closed:
+            raise errors.PoolError("The connection pool has been closed.")
+        if not self._slots.acquire(timeout=self.timeout):
+            raise errors.PoolError(f"No MySQL connection became available within {self.timeout}s.")
+
+        try:
+            while True:
+                try:
+                    connection, released_at = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._connect()  # Pool not yet full: open a fresh connection
+                if self._is_healthy(connection, released_at):
+                    return connection
+                _close_quietly(connection)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, connection, broken=False):
+        """Return a connection to the pool, discarding it if it is `broken` or the pool was closed.
+
+        No ping here: a connection that failed is flagged by the caller, one dropped while idle by _is_healthy.
+        """
+        try:
+            if self._closed or broken:
+                _close_quietly(connection)
+                return
+            if connection.unread_result:
+                connection.consume_results()
+            if connection.in_transaction:
+                connection.rollback()  # Never hand a half-finished transaction to the next caller
+            self._idle.put((connection, time.monotonic()))
+        except mysql.connector.Error:
+            _close_quietly(connection)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        """Close every idle connection; connections still checked out are closed when released."""
+        self._closed = True
+        while True:
+            try:
+                connection, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            _close_quietly(connection)
+
+
+class TableCheck:
+    """Cached existence check for an optional table (e.g. a side index built on demand).
+
+    A positive answer is kept for the life of the process; a negative one is re-checked after `interval`
+    seconds, so a table created by another process is picked up without querying on every call.
+    """
+
+    def __init__(self, table, interval=60):
+        self.table = table
+        self.interval = interval
+        self._exists = False
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def mark_created(self):
+        with self._lock:
+            self._exists = True
+
+    def exists(self, cursor):
+        with self._lock:
+            if self._exists or (self._checked_at is not None and time.monotonic() - self._checked_at < self.interval):
+                return self._exists
+            cursor.execute(
+                "SELECT COUNT(*) FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s",
+                (config.mysql_database, self.table)
+            )
+            self._exists = bool(cursor.fetchone()[0])
+            self._checked_at = time.monotonic()
+            return self._exists
+
+
+def _close_quietly(connection):
+    try:
+        connection.close()
+    except mysql.connector.Error:
+        pass
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the shared pool, rebuilding it whenever the credentials stored in config change."""
+    global _pool
+    with _pool_lock:
+        credentials = (config.mysql_host, config.mysql_database, config.mysql_username, config.mysql_password)
+        if _pool is None or _pool.credentials != credentials:
+            if _pool is not None:
+                _pool.close()
+            _pool = ConnectionPool(
+                user=config.mysql_username,
+                password=config.mysql_password,
+                host=config.mysql_host,
+                database=config.mysql_database,
+                size=config.mysql_pool_size,
+                timeout=config.mysql_pool_timeout,
+                health_check_interval=config.mysql_health_check_interval
+            )
+        return _pool
+
+
+def close_pool():
+    """Close the shared pool (e.g. on logout or application exit)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+PASSWORD_VARIABLE = "MUSEUM_MYSQL_PASSWORD"  # Lets scripts log in without a prompt (and without a --password argument)
+
+
+def login_from_args(parser, argv=None):
+    """Add --user to a command-line parser, parse `argv` and store the MySQL credentials in config.
+
+    The password comes from config, then from the MUSEUM_MYSQL_PASSWORD environment variable, and is otherwise
+    prompted for; it is never taken from the command line, where ps and the shell history would show it.
+    Returns the parsed arguments.
+    """
+    parser.add_argument("--user", default=config.mysql_username, help="MySQL user name")
+    args = parser.parse_args(argv)
+    config.mysql_username = args.user or input("MySQL username: ")
+    config.mysql_password = (config.mysql_password or os.environ.get(PASSWORD_VARIABLE)
+                             or getpass.getpass("MySQL password: "))
+    return args
+
+
+def check_credentials():
+    """Open (and pool) one connection to validate the credentials in config; raises mysql.connector.Error."""
+    with connection():
+        pass
+
+
+@contextmanager
+def connection():
+    """Borrow a pooled connection for the duration of a `with` block."""
+    pool = get_pool()
+    conn = pool.acquire()
+    broken = False
+    try:
+        yield conn
+    except (errors.OperationalError, errors.InterfaceError):
+        broken = True  # Lost or unusable connection: do not hand it to the next caller
+        raise
+    finally:
+        pool.release(conn, broken)
+
+
+def _open_cursor(conn, kwargs):
+    cur = conn.cursor(**kwargs)
+    if config.slow_query_ms is not None or metrics.enabled():
+        cur = QueryLog.LoggedCursor(cur)  # Every statement is timed; those over the threshold are logged
+    return cur
+
+
+@contextmanager
+def cursor(**kwargs):
+    """Borrow a pooled connection and yield a cursor on it; both are returned/closed on exit."""
+    with connection() as conn:
+        cur = _open_cursor(conn, kwargs)
+        try:
+            yield cur
+        finally:
+            cur.close()
+            QueryLog.explain_pending(conn, cur)
+
+
+@contextmanager
+def transaction(**kwargs):
+    """Yield a cursor inside a single transaction, committed on success and rolled back on any error."""
+    with connection() as conn:
+        conn.start_transaction()
+        cur = _open_cursor(conn, kwargs)
+        try:
+            yield cur
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+            QueryLog.explain_pending(conn, cur)
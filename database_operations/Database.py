@@ -1,6 +1,11 @@
+import os
+import re
 import tkinter as tk
-from tkinter import filedialog, scrolledtext, ttk, Frame, BOTH, LEFT, RIGHT, Y, Canvas
+from tkinter import filedialog, scrolledtext, ttk, messagebox, Frame, BOTH, LEFT, RIGHT, Y, Canvas
 from html_operations import QR
+from database_operations import Catalog
+from database_operations import Images
+from html_operations import Background
 import config
 
 
@@ -10,18 +15,13 @@ def parse_size_to_dict(size_str):
         return size_str  # Already a dictionary, return as is
     size_dict = {"length": "", "width": "", "height": ""}
     if isinstance(size_str, str):
-        size_parts = size_str.split()
-        for part in size_parts:
-            if part.startswith("Length:"):
-                size_dict["length"] = part.split(":")[1].strip()
-            elif part.startswith("Width:"):
-                size_dict["width"] = part.split(":")[1].strip()
-            elif part.startswith("Height:"):
-                size_dict["height"] = part.split(":")[1].strip()
+        # Matches both "Length:12.0" and "Length: 12.0" (as built by make_new_entry)
+        for name, value in re.findall(r"(Length|Width|Height):\s*(\S+)", size_str):
+            size_dict[name.lower()] = value.strip()
     return size_dict
 
 
-def final_check_window(title, description, image_titles, biblio_ref, location, size, tags, window_4):
+def final_check_window(title, description, image_titles, biblio_ref, location, size, tags, window_4, original=None):
     """Creates Window 6: Display title, description, image titles, and send button."""
     # Create Window 6
     window_6 = tk.Tk()
@@ -77,7 +77,7 @@ def final_check_window(title, description, image_titles, biblio_ref, location, s
         images_frame.pack(pady=10)
 
         for image in image_titles:
-            create_centered_label(image, font=config.FONT)
+            create_centered_label(os.path.basename(image), font=config.FONT)
     else:
         create_centered_label("No images were sent", font=config.FONT_BOLD, fg="red")
 
@@ -133,7 +133,8 @@ def final_check_window(title, description, image_titles, biblio_ref, location, s
                 location=location,
                 size=parse_size_to_dict(size),  # Ensure size remains a dictionary
                 tags=tags,
-                image_titles=image_titles
+                image_titles=image_titles,
+                original=original
             )
         )
     )
@@ -148,7 +149,7 @@ def final_check_window(title, description, image_titles, biblio_ref, location, s
         bg=config.BUTTON_COLOR,
         command=lambda: (
             window_6.destroy(),
-            open_select_where_to_store_window(title, description, references=biblio_ref, location=location, size=size, tags=tags, image_titles=image_titles)
+            open_select_where_to_store_window(title, description, references=biblio_ref, location=location, size=size, tags=tags, image_titles=image_titles, original=original)
         )
     )
     send_button.pack(pady=20)
@@ -156,8 +157,11 @@ def final_check_window(title, description, image_titles, biblio_ref, location, s
     window_6.mainloop()
 
 
-def send_to_db_window(title="", description="", references=None, location="", size="", tags="", image_titles=None):
-    """Creates Window 4: Display title, description, and reference input functionality."""
+def send_to_db_window(title="", description="", references=None, location="", size="", tags="", image_titles=None, original=None):
+    """Creates Window 4: Display title, description, and reference input functionality.
+
+    `original` is the (folder, title) of the entry being modified, None for a new entry.
+    """
 
     # Create Window 4
     window_4 = tk.Tk()
@@ -217,7 +221,7 @@ def send_to_db_window(title="", description="", references=None, location="", si
         # If all inputs are valid, proceed to open Window 6 and destroy Window 4
         if is_valid:
             window_4.destroy()
-            final_check_window(title, description, image_titles, biblio_ref, location, size, tags, window_4)
+            final_check_window(title, description, image_titles, biblio_ref, location, size, tags, window_4, original)
 
     def upload_image():
         """Handle image upload."""
@@ -225,8 +229,7 @@ def send_to_db_window(title="", description="", references=None, location="", si
             file_path = filedialog.askopenfilename(title="Select an Image",
                                                    filetypes=[("Image Files", "*.png;*.jpg;*.jpeg")])
             if file_path:
-                image_title = file_path.split('/')[-1]
-                image_titles.append(image_title)
+                image_titles.append(file_path)  # The file is copied into the image store when the entry is saved
                 update_image_titles()
                 update_upload_count()
 
@@ -242,7 +245,7 @@ def send_to_db_window(title="", description="", references=None, location="", si
             image_frame = tk.Frame(image_titles_frame, bg=config.BG_COLOR)
             image_frame.pack(anchor="w", pady=2)
 
-            title_label = tk.Label(image_frame, text=image, font=config.FONT, bg=config.BG_COLOR)
+            title_label = tk.Label(image_frame, text=os.path.basename(image), font=config.FONT, bg=config.BG_COLOR)
             title_label.pack(side="left")
 
             remove_button = tk.Button(image_frame, text="X", font=config.FONT_BOLD, fg="white", bg=config.BUTTON_COLOR,
@@ -538,7 +541,7 @@ def send_to_db_window(title="", description="", references=None, location="", si
     window_4.mainloop()
 
 
-def open_select_where_to_store_window(title="", description="", references=None, location="", size="", tags="", image_titles=None):
+def open_select_where_to_store_window(title="", description="", references=None, location="", size="", tags="", image_titles=None, original=None):
     """Open a window to select where to store the data."""
     # Create the window
     select_window = tk.Tk()
@@ -575,12 +578,21 @@ def open_select_where_to_store_window(title="", description="", references=None,
     folder_scrollbar.pack(side="right", fill="y")
     folder_listbox.config(yscrollcommand=folder_scrollbar.set)
 
+    # Shows what is being loaded while a request runs in the background
+    status_label = tk.Label(select_window, text="", font=config.FONT_TEXT, bg=config.BG_COLOR, fg=config.TEXT_COLOR)
+    status_label.pack()
+    folder_channel = Background.Channel(select_window, status_label)
+
     # Populate the folder list dynamically
     def refresh_folder_list():
-        folder_listbox.delete(0, "end")  # Clear the listbox
-        folders = QR.get_folders()  # Fetch updated folder names
-        for folder in folders:
-            folder_listbox.insert("end", folder)
+        def fill_folders(folders):
+            folder_listbox.delete(0, "end")  # Clear the listbox
+            for folder in folders:
+                folder_listbox.insert("end", folder)
+            if original and original[0] in folders:
+                folder_listbox.selection_set(folders.index(original[0]))  # A modified entry stays in its folder by default
+
+        folder_channel.submit(QR.get_folders, on_done=fill_folders, message="Loading folders…")  # Fetch updated folder names
 
     refresh_folder_list()
 
@@ -588,14 +600,17 @@ def open_select_where_to_store_window(title="", description="", references=None,
     def create_new_folder():
         folder_name = folder_name_entry.get().strip()
         if folder_name:
-            try:
-                # Add logic to create the folder in the database
-                QR.create_folder(folder_name)  # Replace with your folder creation function
+            def created(_):
                 tk.messagebox.showinfo("Success", f"Folder '{folder_name}' created successfully!")
                 folder_name_entry.delete(0, "end")  # Clear the input field
                 refresh_folder_list()  # Refresh the folder list
-            except Exception as e:
+
+            def failed(e):
                 tk.messagebox.showerror("Error", f"Failed to create folder: {e}")
+
+            # Create the folder in the database
+            folder_channel.submit(QR.create_folder, folder_name, on_done=created, on_error=failed,
+                                  message=f"Creating {folder_name}…")
         else:
             tk.messagebox.showwarning("Input Error", "Folder name cannot be empty!")
 
@@ -622,19 +637,44 @@ def open_select_where_to_store_window(title="", description="", references=None,
         command=create_new_folder
     ).pack(side="left", padx=5)
 
+    # Saving stores the images and writes the entry in the background; the window stays open if it fails
+    save_channel = Background.Channel(select_window, status_label)
+
     # Button to confirm the selection and send to the database
     def send_to_selected_folder():
         try:
             # Get the selected folder
             selected_folder = folder_listbox.get(folder_listbox.curselection())
-            print(f"Data will be sent to folder: {selected_folder}")  # Debug output
-            send_to_database(selected_folder, title, description, references, location, size, tags, image_titles)
-            select_window.destroy()
         except tk.TclError:
             tk.messagebox.showwarning("Selection Error", "Please select a folder before proceeding.")
+            return
+        if save_channel.busy():
+            return  # Already saving
+        print(f"Data will be sent to folder: {selected_folder}")  # Debug output
+
+        def saved(flagged):
+            warn_near_duplicates(flagged)
+            messagebox.showinfo("Success", f"'{title}' was saved to {selected_folder}.")
+            select_window.destroy()
+
+        def failed(err):
+            if isinstance(err, ValueError):
+                messagebox.showerror("Duplicate Title", f"{err} Please choose another title.")
+            elif isinstance(err, OSError):
+                messagebox.showerror("Image Error", f"Error storing the images of '{title}': {err}")
+            else:
+                Background.show_error(err)
+
+        def progress(done, total):
+            save_channel.progress(f"Processing images {done}/{total}…")  # Called from the worker thread
+
+        save_channel.submit(
+            send_to_database, selected_folder, title, description, references, location, size, tags, image_titles,
+            original, progress, on_done=saved, on_error=failed, message=f"Saving {title}…"
+        )
 
     # Send Button
-    tk.Button(
+    send_button = tk.Button(
         select_window,
         text="Send to Database",
         font=config.FONT_BOLD,
@@ -645,7 +685,9 @@ def open_select_where_to_store_window(title="", description="", references=None,
         padx=10,
         pady=5,
         command=send_to_selected_folder
-    ).pack(pady=20)
+    )
+    send_button.pack(pady=20)
+    save_channel.controls.append(send_button)  # Disabled while the entry is being saved
 
     select_window.mainloop()
 
@@ -744,8 +786,7 @@ def make_new_entry(title="", description="", image_titles=None, biblio_ref="", l
             file_path = filedialog.askopenfilename(title="Select an Image",
                                                    filetypes=[("Image Files", "*.png;*.jpg;*.jpeg")])
             if file_path:
-                image_title = file_path.split('/')[-1]
-                image_titles.append(image_title)
+                image_titles.append(file_path)  # The file is copied into the image store when the entry is saved
                 update_image_titles()
                 update_upload_count()
 
@@ -761,7 +802,7 @@ def make_new_entry(title="", description="", image_titles=None, biblio_ref="", l
             image_frame = tk.Frame(image_titles_frame, bg=config.BG_COLOR)
             image_frame.pack(anchor="w", pady=2)
 
-            title_label = tk.Label(image_frame, text=image, font=config.FONT, bg=config.BG_COLOR)
+            title_label = tk.Label(image_frame, text=os.path.basename(image), font=config.FONT, bg=config.BG_COLOR)
             title_label.pack(side="left")
 
             remove_button = tk.Button(image_frame, text="X", font=config.FONT_BOLD, fg="white", bg=config.BUTTON_COLOR,
@@ -1043,10 +1084,65 @@ def make_new_entry(title="", description="", image_titles=None, biblio_ref="", l
     window_4.mainloop()
 
 
-def send_to_database(folder, title="", description="", references=None, location="", size="", tags="", image_titles=None):
-    # TODO
-    # À implementer par LAPLANTE
-    print("Sent to database")
+def ingest_images(image_titles, progress=None):
+    """Copy newly uploaded image files into the image store; returns the stored names (already stored names are kept)."""
+    image_titles = list(image_titles or [])
+    paths = [image for image in image_titles if os.path.isabs(image) and os.path.isfile(image)]  # From the file dialog
+    names = dict(zip(paths, Images.ingest(paths, progress=progress))) if paths else {}
+    return [names.get(image, image) for image in image_titles]
+
+
+def send_to_database(folder, title="", description="", references=None, location="", size="", tags="", image_titles=None, original=None, progress=None):
+    """Store the uploaded images and write one entry into the selected folder table in a single transaction.
+
+    A new entry must have a title that is not used yet; a modified entry (`original` is its (folder, title))
+    replaces exactly its original row, even when its title or folder changed. Runs on a Background worker: errors
+    are raised (ValueError for a duplicate title). Returns the near-duplicates of the uploaded images (see
+    warn_near_duplicates). `progress(done, total)` is called as the uploaded images are processed.
+    """
+    uploaded = [os.path.isabs(image) for image in image_titles or []]
+    image_titles = ingest_images(image_titles, progress)
+    # Only images uploaded now are checked: entries re-saved with stored images are not flagged again
+    flagged = Images.near_duplicates([name for name, new in zip(image_titles, uploaded) if new]) if any(uploaded) else {}
+    row = Catalog.entry_row(title, description, references, location, parse_size_to_dict(size), tags, image_titles)
+    if original:
+        Catalog.replace_entry(folder, row, *original)
+    else:
+        Catalog.insert_entry(folder, row)
+    print(f"Sent to database: {title} -> {folder}")
+    return flagged
+
+
+def warn_near_duplicates(flagged):
+    """Tell the user which uploaded images closely resemble images already in the catalog (on the Tk thread)."""
+    if flagged:
+        for name, matches in flagged.items():
+            print(f"Image {name} resembles: {', '.join(other for other, _ in matches)}")
+        messagebox.showwarning(
+            "Possible Duplicate Images",
+            f"{len(flagged)} of the uploaded images closely resemble images already in the catalog. "
+            "They have been stored anyway."
+        )
+
+
+def send_many_to_database(folder, entries):
+    """Write many entries (dicts with the send_to_database keyword arguments) into a folder table in one transaction.
+
+    Intended for scripted loads: errors are raised, and either every entry is committed or none is.
+    """
+    rows = [
+        Catalog.entry_row(
+            entry.get("title", ""),
+            entry.get("description", ""),
+            entry.get("references"),
+            entry.get("location", ""),
+            parse_size_to_dict(entry.get("size", "")),
+            entry.get("tags"),
+            ingest_images(entry.get("image_titles"))
+        )
+        for entry in entries
+    ]
+    return Catalog.insert_entries(folder, rows)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,265 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageOps
+
+import config
+from database_operations import Connection
+from database_operations.Schema import IMAGE_STORE_DDL, IMAGE_STORE_TABLE
+
+ORIGINALS_DIR = "originals"
+DERIVED_DIR = "derived"
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def original_path(name, root=None):
+    return os.path.join(root or config.image_store_root, ORIGINALS_DIR, name)
+
+
+_table = Connection.TableCheck(IMAGE_STORE_TABLE)
+_dhash_checked = False
+_dhash_lock = threading.Lock()
+
+
+def ensure_schema(cursor):
+    """Create the image table, or bring one created by an older version up to date. DDL: call outside transactions."""
+    cursor.execute(IMAGE_STORE_DDL)
+    _table.mark_created()
+    _ensure_dhash_column(cursor)
+
+
+def _ensure_dhash_column(cursor):
+    """Add the dhash column to image tables created before it existed (checked once per process)."""
+    global _dhash_checked
+    with _dhash_lock:
+        if _dhash_checked:
+            return
+        cursor.execute(
+            "SELECT COUNT(*) FROM INFORMATION_SCHEMA.COLUMNS "
+            "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND COLUMN_NAME = 'dhash'",
+            (config.mysql_database, IMAGE_STORE_TABLE)
+        )
+        if not cursor.fetchone()[0]:
+            cursor.execute(f"ALTER TABLE `{IMAGE_STORE_TABLE}` ADD COLUMN dhash BIGINT UNSIGNED AFTER height")
+            print("Added the dhash column to the image table. Hash the images stored before it with: "
+                  "python -m database_operations.Images --rebuild")
+        _dhash_checked = True
+
+
+def enabled(cursor):
+    """Return True once images have been ingested (the image table is created on first use)."""
+    return _table.exists(cursor)
+
+
+def file_sha256(path):
+    """Hash a file in fixed-size chunks, so that large TIFF scans are never held in memory."""
+    digest = hashlib.sha256()
+    buffer = bytearray(HASH_CHUNK_SIZE)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as file:
+        while True:
+            read = file.readinto(buffer)
+            if not read:
+                break
+            digest.update(view[:read])
+    return digest.hexdigest()
+
+
+def _store_original(path, root):
+    """Store `path` under its content digest and return that name; identical content is only ever copied once."""
+    name = f"{file_sha256(path)}{os.path.splitext(path)[1].lower()}"
+    if os.path.exists(original_path(name, root)):
+        return name  # Same bytes already on disk, whatever file name they were uploaded under
+    os.makedirs(os.path.dirname(original_path(name, root)), exist_ok=True)
+    partial = original_path(name, root) + ".part"
+    shutil.copyfile(path, partial)
+    os.replace(partial, original_path(name, root))  # Never leaves a half-copied original under the final name
+    return name
+
+
+def _recorded(names):
+    """Return the names among `names` that have an image row, i.e. whose derivatives were generated and recorded."""
+    names = list(dict.fromkeys(names))
+    with Connection.cursor() as cursor:
+        if not names or not enabled(cursor):
+            return set()
+        placeholders = ", ".join(["%s"] * len(names))
+        cursor.execute(f"SELECT name FROM `{IMAGE_STORE_TABLE}` WHERE name IN ({placeholders})", tuple(names))
+        return {row[0] for row in cursor.fetchall()}
+
+
+def dhash(image):
+    """Return the 64-bit difference hash of an image: similar pictures (resized, recompressed) differ in few bits."""
+    pixels = image.convert("L").resize((9, 8), Image.LANCZOS).tobytes()
+    bits = 0
+    for row in range(8):
+        for column in range(8):
+            bits = bits << 1 | (pixels[row * 9 + column] > pixels[row * 9 + column + 1])
+    return bits
+
+
+def make_derivatives(name, root, widths):
+    """Worker: write the WebP and JPEG derivatives of a stored original, largest first.
+
+    Returns (name, width, height, dhash, derivatives) with one {"width", "height", "webp", "jpeg"} dict per
+    derivative, paths relative to the store root.
+    """
+    stem = os.path.splitext(name)[0]
+    os.makedirs(os.path.join(root, DERIVED_DIR), exist_ok=True)
+    with Image.open(original_path(name, root)) as original:
+        width, height = original.size
+        if original.getexif().get(0x0112, 1) in (5, 6, 7, 8):  # EXIF orientation: rotated by 90 degrees
+            width, height = height, width
+        largest = max(widths)
+        original.draft("RGB", (largest, largest))  # JPEG originals are decoded at a reduced scale when possible
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+
+        # Never upscale: widths above the original collapse to the original width
+        targets = sorted({min(target, image.width) for target in widths}, reverse=True)
+        derivatives = []
+        for target in targets:
+            # Each size is resampled from the previous (larger) one, which is much cheaper than from the original
+            if target != image.width:
+                image = image.resize((target, max(1, round(image.height * target / image.width))), Image.LANCZOS)
+            webp = f"{DERIVED_DIR}/{stem}-{target}.webp"
+            jpeg = f"{DERIVED_DIR}/{stem}-{target}.jpg"
+            image.save(os.path.join(root, webp), "WEBP", quality=WEBP_QUALITY, method=4)
+            flat = image
+            if image.mode == "RGBA":
+                flat = Image.new("RGB", image.size, "white")  # JPEG has no transparency
+                flat.paste(image, mask=image.getchannel("A"))
+            flat.save(os.path.join(root, jpeg), "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+            derivatives.append({"width": image.width, "height": image.height, "webp": webp, "jpeg": jpeg})
+        perceptual_hash = dhash(image)  # From the smallest derivative: same result, a fraction of the work
+    return name, width, height, perceptual_hash, derivatives[::-1]
+
+
+def _generate(names, root, widths, workers):
+    """Yield make_derivatives results, in a process pool when there is more than one image."""
+    if len(names) == 1:
+        yield make_derivatives(names[0], root, widths)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(make_derivatives, names, [root] * len(names), [widths] * len(names))
+
+
+def _record(records):
+    with Connection.cursor() as cursor:
+        ensure_schema(cursor)  # DDL commits implicitly, so it is kept out of the transaction
+    with Connection.transaction() as cursor:
+        cursor.executemany(
+            f"REPLACE INTO `{IMAGE_STORE_TABLE}` (name, width, height, dhash, derivatives) VALUES (%s, %s, %s, %s, %s)",
+            [(name, width, height, bits, json.dumps(derivatives)) for name, width, height, bits, derivatives in records]
+        )
+
+
+def ingest(paths, root=None, widths=None, workers=None, progress=None):
+    """Copy image files into the content-addressed store and generate their web derivatives.
+
+    Returns the stored image names (SHA-256 digest plus extension), in the order of `paths`; these are what the
+    img_1..img_5 columns hold. Images already in the store are neither copied nor processed again.
+    `progress(done, total)` is called as the images are processed.
+
+    An image counts as stored once its row is recorded, not when its original is on disk: if generating the
+    derivatives or recording them failed, uploading it again processes it again.
+    """
+    root = root or config.image_store_root
+    widths = widths or config.image_widths
+    names = [_store_original(path, root) for path in paths]
+    recorded = _recorded(names)
+    new = [name for name in dict.fromkeys(names) if name not in recorded]
+    if new:
+        records = []  # Collected first: no transaction is held while the images are processed
+        if progress:
+            progress(0, len(new))
+        for record in _generate(new, root, widths, workers or config.image_workers):
+            records.append(record)
+            if progress:
+                progress(len(records), len(new))
+        _record(records)
+    return names
+
+
+def image_info(cursor, names):
+    """Return {name: {"width", "height", "derivatives"}} for the stored images among `names`."""
+    names = [name for name in dict.fromkeys(names) if name]
+    if not names or not enabled(cursor):
+        return {}
+    placeholders = ", ".join(["%s"] * len(names))
+    cursor.execute(
+        f"SELECT name, width, height, derivatives FROM `{IMAGE_STORE_TABLE}` WHERE name IN ({placeholders})",
+        tuple(names)
+    )
+    return {
+        name: {"width": width, "height": height, "derivatives": json.loads(derivatives)}
+        for name, width, height, derivatives in cursor.fetchall()
+    }
+
+
+def near_duplicates(names, distance=None):
+    """Return {name: [(other name, differing bits), ...]} for stored images that closely resemble other stored ones."""
+    distance = config.image_near_duplicate_distance if distance is None else distance
+    names = [name for name in dict.fromkeys(names) if name]
+    flagged = {}
+    if distance is None or distance < 0 or not names:
+        return flagged
+    with Connection.cursor() as cursor:
+        if not enabled(cursor):
+            return flagged
+        _ensure_dhash_column(cursor)  # Installs whose image table predates near-duplicate detection
+        for name in names:
+            # A full scan of 8-byte hashes with BIT_COUNT: milliseconds even for a large collection
+            cursor.execute(
+                f"SELECT other.name, BIT_COUNT(image.dhash ^ other.dhash) AS distance "
+                f"FROM `{IMAGE_STORE_TABLE}` image JOIN `{IMAGE_STORE_TABLE}` other "
+                f"ON other.name <> image.name AND other.dhash IS NOT NULL "
+                f"WHERE image.name = %s HAVING distance <= %s ORDER BY distance",
+                (name, distance)
+            )
+            matches = cursor.fetchall()
+            if matches:
+                flagged[name] = matches
+    return flagged
+
+
+def rebuild_derivatives(root=None, widths=None, workers=None):
+    """Regenerate the derivatives (and perceptual hashes) of every stored original, e.g. after changing
+    config.image_widths or to hash images stored before near-duplicate detection existed."""
+    root = root or config.image_store_root
+    directory = os.path.join(root, ORIGINALS_DIR)
+    names = sorted(name for name in os.listdir(directory) if not name.endswith(".part")) if os.path.isdir(directory) else []
+    if names:
+        _record(list(_generate(names, root, widths or config.image_widths, workers or config.image_workers)))
+    print(f"Regenerated the derivatives of {len(names)} images in {root}")
+    return len(names)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest images into managed storage and build their web derivatives.")
+    parser.add_argument("paths", nargs="*", help="Image files to ingest")
+    parser.add_argument("--rebuild", action="store_true", help="Regenerate the derivatives of every stored image")
+    parser.add_argument("--workers", type=int, default=config.image_workers, help="Derivative processes")
+    args = Connection.login_from_args(parser, argv)
+
+    if args.rebuild:
+        rebuild_derivatives(workers=args.workers)
+    if args.paths:
+        names = ingest(args.paths, workers=args.workers)
+        flagged = near_duplicates(names)
+        for path, name in zip(args.paths, names):
+            print(f"{path} -> {name}")
+            for other, distance in flagged.get(name, []):
+                print(f"    looks like {other} ({distance} bits differ)")
+
+
+if __name__ == "__main__":
+    main()
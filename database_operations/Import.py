@@ -0,0 +1,144 @@
+import argparse
+import csv
+import json
+import time
+
+import mysql.connector
+
+from database_operations import Catalog
+from database_operations import Connection
+
+# JSONL records may carry lists instead of numbered columns
+LIST_FIELDS = {
+    "image_titles": Catalog.IMAGE_COLUMNS,
+    "images": Catalog.IMAGE_COLUMNS,
+    "references": Catalog.REFERENCE_COLUMNS,
+    "tags": Catalog.TAG_COLUMNS,
+}
+
+
+def iter_records(path, file_format=None):
+    """Stream (line number, record dict) pairs from a CSV file (with a header row) or a JSONL file."""
+    file_format = file_format or ("jsonl" if path.lower().endswith((".jsonl", ".json")) else "csv")
+    with open(path, newline="", encoding="utf-8-sig") as file:
+        if file_format == "csv":
+            reader = csv.DictReader(file)
+            for record in reader:
+                yield reader.line_num, record
+        else:
+            for line_number, line in enumerate(file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as err:
+                    yield line_number, {"__error__": f"invalid JSON: {err}"}
+                    continue
+                yield line_number, record if isinstance(record, dict) else {"__error__": "not a JSON object"}
+
+
+def record_to_row(record):
+    """Map an input record onto the folder-table columns. Returns (row, errors)."""
+    if "__error__" in record:
+        return None, [record["__error__"]]
+
+    row = dict.fromkeys(Catalog.ARTIFACT_COLUMNS)
+    errors = []
+    for key, value in record.items():
+        key = (key or "").strip()
+        if key in LIST_FIELDS and isinstance(value, list):
+            columns = LIST_FIELDS[key]
+            values = [item for item in value if item not in ("", None)]
+            if len(values) > len(columns):
+                errors.append(f"more than {len(columns)} {key}")
+            row.update(zip(columns, values))
+        elif key in row:
+            if isinstance(value, str):
+                value = value.strip()
+            row[key] = value if value not in ("", None) else None
+    return row, errors + Catalog.validate_row(row)
+
+
+def _write_chunk(folder, chunk, replace, reject):
+    """Insert one chunk in a single transaction; if it fails, retry row by row to isolate the bad rows."""
+    try:
+        return Catalog.insert_entries(folder, [row for _, row in chunk], replace=replace)
+    except (mysql.connector.Error, ValueError):
+        inserted = 0
+        for line_number, row in chunk:
+            try:
+                inserted += Catalog.insert_entries(folder, [row], replace=replace)
+            except ValueError as err:  # Title taken by another client since the chunk was checked
+                reject(line_number, row, [str(err)])
+            except mysql.connector.Error as err:
+                reject(line_number, row, [f"database error: {err}"])
+        return inserted
+
+
+def import_file(path, folder, file_format=None, chunk_size=1000, replace=False, rejects_path=None):
+    """Stream a CSV/JSONL inventory into a folder table in chunked transactions.
+
+    Invalid rows (and rows whose title already exists, unless `replace`) are written to a JSONL rejects file.
+    Only one chunk is held in memory at a time, and existing titles are looked up with one query per chunk
+    rather than through the title index, which is never loaded. Returns (inserted, rejected).
+    """
+    rejects_path = rejects_path or f"{path}.rejects.jsonl"
+    inserted = rejected = 0
+    started = time.perf_counter()
+
+    with open(rejects_path, "w", encoding="utf-8") as rejects_file:
+        def reject(line_number, record, errors):
+            nonlocal rejected
+            rejected += 1
+            rejects_file.write(json.dumps({"line": line_number, "errors": errors, "record": record}, default=str) + "\n")
+
+        def write(chunk):
+            """Reject the titles of `chunk` already in the catalog (one query) and insert the rest."""
+            taken = {}
+            if not replace:
+                with Connection.cursor() as cursor:
+                    taken = Catalog.existing_titles(cursor, [row["title"] for _, _, row in chunk])
+                for line_number, record, row in chunk:
+                    if row["title"] in taken:
+                        reject(line_number, record, [f"title already exists in {taken[row['title']]}"])
+            rows = [(line_number, row) for line_number, _, row in chunk if row["title"] not in taken]
+            return _write_chunk(folder, rows, replace, reject) if rows else 0
+
+        chunk = {}  # title -> (line number, record, row)
+        for line_number, record in iter_records(path, file_format):
+            row, errors = record_to_row(record)
+            if not errors and row["title"] in chunk:
+                errors = ["duplicate title in the input file"]
+            if errors:
+                reject(line_number, record, errors)
+                continue
+
+            chunk[row["title"]] = (line_number, record, row)
+            if len(chunk) >= chunk_size:
+                inserted += write(list(chunk.values()))
+                chunk = {}
+                print(f"{inserted} rows imported ({inserted / (time.perf_counter() - started):.0f} rows/s)")
+
+        if chunk:
+            inserted += write(list(chunk.values()))
+
+    print(f"Imported {inserted} rows into {folder} in {time.perf_counter() - started:.1f}s; "
+          f"{rejected} rejected (see {rejects_path})")
+    return inserted, rejected
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-import a CSV or JSONL inventory into a folder table.")
+    parser.add_argument("path", help="CSV (with a header row of column names) or JSONL file")
+    parser.add_argument("--folder", required=True, help="Folder table to import into")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="Input format (guessed from the extension)")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Rows per transaction")
+    parser.add_argument("--replace", action="store_true", help="Replace existing entries with the same title")
+    parser.add_argument("--rejects", help="Where to write rejected rows (default: <path>.rejects.jsonl)")
+    args = Connection.login_from_args(parser, argv)
+
+    import_file(args.path, args.folder, args.format, args.chunk_size, args.replace, args.rejects)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import argparse
+import time
+
+import mysql.connector
+
+import config
+from database_operations import Catalog
+from database_operations import Connection
+from database_operations import Normalized
+from database_operations.Schema import ARTIFACT_COLUMNS, ARTIFACT_TABLE, FOLDER_TABLE
+
+
+def _existing_titles(titles):
+    placeholders = ", ".join(["%s"] * len(titles))
+    with Connection.cursor() as cursor:
+        cursor.execute(f"SELECT title FROM `{ARTIFACT_TABLE}` WHERE title IN ({placeholders})", tuple(titles))
+        return {row[0] for row in cursor.fetchall()}
+
+
+def _copy_batch(folder, rows, replace):
+    """Copy one batch in its own short transaction; a failing batch is retried row by row."""
+    try:
+        with Connection.transaction() as cursor:
+            Normalized.write_rows(cursor, folder, rows, replace=replace)
+        return len(rows)
+    except mysql.connector.Error:
+        copied = 0
+        for row in rows:
+            try:
+                with Connection.transaction() as cursor:
+                    Normalized.write_rows(cursor, folder, [row], replace=replace)
+                copied += 1
+            except mysql.connector.Error as err:
+                print(f"Skipped '{row['title']}' from {folder}: {err}")
+        return copied
+
+
+def index_titles():
+    """Add the title index to wide-layout folder tables created before folder_table_ddl included it."""
+    added = Catalog.ensure_title_indexes()
+    print(f"Added the title index to {len(added)} folder tables.")
+    return len(added)
+
+
+def migrate(batch_size=500, replace=False, pause=0.0):
+    """Copy every wide-layout folder table into the normalized tables, in small batches.
+
+    Each batch is read with keyset pagination over the (indexed) title column and written in its own
+    transaction, so the catalog stays usable while the migration runs. Titles that were already migrated
+    are skipped unless `replace`; running it again therefore only copies what is new.
+    """
+    with Connection.cursor() as cursor:
+        Normalized.ensure_schema(cursor)
+        folders = Catalog.list_folder_tables(cursor)
+
+    total = 0
+    started = time.perf_counter()
+    for folder in folders:
+        with Connection.cursor() as cursor:
+            Catalog.ensure_title_index(cursor, folder)
+            cursor.execute(f"INSERT IGNORE INTO `{FOLDER_TABLE}` (name) VALUES (%s)", (folder,))
+
+        copied = 0
+        last_title = ""
+        while True:
+            with Connection.cursor() as cursor:
+                cursor.execute(
+                    f"SELECT {', '.join(ARTIFACT_COLUMNS)} FROM `{folder}` WHERE title > %s ORDER BY title LIMIT %s",
+                    (last_title, batch_size)
+                )
+                rows = [dict(zip(ARTIFACT_COLUMNS, row)) for row in cursor.fetchall()]
+            if not rows:
+                break
+            last_title = rows[-1]["title"]
+
+            if not replace:
+                existing = _existing_titles([row["title"] for row in rows])
+                rows = [row for row in rows if row["title"] not in existing]
+            if rows:
+                copied += _copy_batch(folder, rows, replace)
+            if pause:
+                time.sleep(pause)  # Leave room for curator traffic on busy servers
+
+        print(f"{folder}: {copied} artifacts copied")
+        total += copied
+
+    print(f"Migrated {total} artifacts from {len(folders)} folders in {time.perf_counter() - started:.1f}s. "
+          f"Set catalog_layout = \"normalized\" in config.py to switch the application over.")
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Copy the wide folder tables into the normalized catalog layout.")
+    parser.add_argument("--batch-size", type=int, default=500, help="Artifacts copied per transaction")
+    parser.add_argument("--replace", action="store_true", help="Re-copy artifacts that were already migrated")
+    parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between batches")
+    parser.add_argument("--title-indexes", action="store_true",
+                        help="Only add the missing title indexes to the wide folder tables (no migration)")
+    args = Connection.login_from_args(parser, argv)
+
+    if args.title_indexes:
+        index_titles()
+    else:
+        migrate(args.batch_size, args.replace, args.pause)
+
+
+if __name__ == "__main__":
+    main()
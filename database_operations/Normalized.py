@@ -0,0 +1,190 @@
+from database_operations import Connection
+from database_operations.Schema import (
+    ARTIFACT_COLUMNS, ARTIFACT_TABLE, CHILD_TABLES, FOLDER_TABLE, IMAGE_TABLE, NORMALIZED_DDL, SIZE_COLUMNS
+)
+
+# Columns stored on the artifacts table itself (the rest live in the child tables)
+BASE_COLUMNS = ["title", "description", "location"] + SIZE_COLUMNS
+
+
+def ensure_schema(cursor):
+    """Create the normalized tables if they do not exist yet."""
+    for statement in NORMALIZED_DDL:
+        cursor.execute(statement)
+
+
+def list_folders(cursor):
+    cursor.execute(f"SELECT name FROM `{FOLDER_TABLE}` ORDER BY name")
+    return [row[0] for row in cursor.fetchall()]
+
+
+def create_folder(cursor, folder):
+    cursor.execute(f"INSERT INTO `{FOLDER_TABLE}` (name) VALUES (%s)", (folder,))
+
+
+def title_folders(cursor):
+    """Return (title, folder) for every artifact (used to build the in-process title index)."""
+    cursor.execute(f"SELECT title, folder FROM `{ARTIFACT_TABLE}`")
+    return cursor.fetchall()
+
+
+def _hydrate(cursor, artifacts):
+    """Turn (id, folder, *BASE_COLUMNS) rows into wide-layout dicts, filling the list columns from the child tables."""
+    rows = {}
+    for artifact in artifacts:
+        data = dict.fromkeys(ARTIFACT_COLUMNS)
+        data.update(zip(BASE_COLUMNS, artifact[2:]))
+        rows[artifact[0]] = data
+    if not rows:
+        return []
+
+    placeholders = ", ".join(["%s"] * len(rows))
+    for table, value_column, columns in CHILD_TABLES:
+        cursor.execute(
+            f"SELECT artifact_id, position, {value_column} FROM `{table}` "
+            f"WHERE artifact_id IN ({placeholders})",
+            tuple(rows)
+        )
+        for artifact_id, position, value in cursor.fetchall():
+            if 0 < position <= len(columns):
+                rows[artifact_id][columns[position - 1]] = value
+    return [(artifact[1], rows[artifact[0]]) for artifact in artifacts]
+
+
+def _select_sql(where):
+    return f"SELECT id, folder, {', '.join(BASE_COLUMNS)} FROM `{ARTIFACT_TABLE}` WHERE {where}"
+
+
+def select_artifact(cursor, title):
+    """Fetch one artifact by title through the unique title index; returns (data, folder) or (None, None)."""
+    cursor.execute(_select_sql("title = %s"), (title,))
+    artifacts = cursor.fetchall()
+    if not artifacts:
+        return None, None
+    folder, data = _hydrate(cursor, artifacts)[0]
+    return data, folder
+
+
+def iter_folder_rows(folder, batch_size=500):
+    """Stream a folder's artifacts as wide-layout dicts, using keyset pagination over (folder, title)."""
+    last_title = ""
+    while True:
+        with Connection.cursor() as cursor:
+            cursor.execute(
+                _select_sql("folder = %s AND title > %s") + " ORDER BY title LIMIT %s",
+                (folder, last_title, batch_size)
+            )
+            artifacts = cursor.fetchall()
+            if not artifacts:
+                return
+            batch = _hydrate(cursor, artifacts)
+        for _, data in batch:
+            yield data
+        last_title = artifacts[-1][2]
+
+
+def iter_folder_titles(folder, batch_size=1000):
+    with Connection.cursor() as cursor:
+        cursor.execute(f"SELECT title FROM `{ARTIFACT_TABLE}` WHERE folder = %s ORDER BY title", (folder,))
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield row[0]
+
+
+def title_page(cursor, folder, after="", limit=200):
+    cursor.execute(
+        f"SELECT title FROM `{ARTIFACT_TABLE}` WHERE folder = %s AND title > %s ORDER BY title LIMIT %s",
+        (folder, after, limit)
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def thumbnail_page(cursor, folder, after="", limit=60):
+    cursor.execute(
+        f"SELECT a.title, (SELECT i.name FROM `{IMAGE_TABLE}` i WHERE i.artifact_id = a.id ORDER BY i.position LIMIT 1) "
+        f"FROM `{ARTIFACT_TABLE}` a WHERE a.folder = %s AND a.title > %s ORDER BY a.title LIMIT %s",
+        (folder, after, limit)
+    )
+    return cursor.fetchall()
+
+
+def delete_titles(cursor, titles):
+    """Delete artifacts by title (child rows go with them). Returns {title: folder} of what was deleted."""
+    titles = list(titles)
+    if not titles:
+        return {}
+    placeholders = ", ".join(["%s"] * len(titles))
+    cursor.execute(f"SELECT title, folder FROM `{ARTIFACT_TABLE}` WHERE title IN ({placeholders})", tuple(titles))
+    deleted = dict(cursor.fetchall())
+    if deleted:
+        cursor.execute(f"DELETE FROM `{ARTIFACT_TABLE}` WHERE title IN ({placeholders})", tuple(titles))
+    return deleted
+
+
+def folder_of(cursor, title):
+    """Return the folder of the artifact with this title, or None."""
+    cursor.execute(f"SELECT folder FROM `{ARTIFACT_TABLE}` WHERE title = %s", (title,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def folders_of(cursor, titles):
+    """Return {title: folder} for those of `titles` that exist."""
+    titles = list(titles)
+    if not titles:
+        return {}
+    placeholders = ", ".join(["%s"] * len(titles))
+    cursor.execute(f"SELECT title, folder FROM `{ARTIFACT_TABLE}` WHERE title IN ({placeholders})", tuple(titles))
+    return dict(cursor.fetchall())
+
+
+def delete_artifact(cursor, folder, title):
+    """Delete the artifact `title` of `folder` (child rows go with it). Returns the number of rows deleted."""
+    cursor.execute(f"DELETE FROM `{ARTIFACT_TABLE}` WHERE folder = %s AND title = %s", (folder, title))
+    return cursor.rowcount
+
+
+def write_rows(cursor, folder, rows, replace=False):
+    """Insert wide-layout rows into the normalized tables with one executemany per table."""
+    if replace:
+        delete_titles(cursor, [row["title"] for row in rows])
+
+    cursor.execute(f"INSERT IGNORE INTO `{FOLDER_TABLE}` (name) VALUES (%s)", (folder,))
+    cursor.executemany(
+        f"INSERT INTO `{ARTIFACT_TABLE}` (folder, {', '.join(BASE_COLUMNS)}) "
+        f"VALUES (%s, {', '.join(['%s'] * len(BASE_COLUMNS))})",
+        [(folder,) + tuple(row[column] for column in BASE_COLUMNS) for row in rows]
+    )
+
+    # Multi-row inserts do not report every generated id, so read them back through the title index
+    placeholders = ", ".join(["%s"] * len(rows))
+    cursor.execute(
+        f"SELECT title, id FROM `{ARTIFACT_TABLE}` WHERE title IN ({placeholders})",
+        tuple(row["title"] for row in rows)
+    )
+    ids = dict(cursor.fetchall())
+
+    for table, value_column, columns in CHILD_TABLES:
+        values = [
+            (ids[row["title"]], position, row[column])
+            for row in rows
+            for position, column in enumerate(columns, start=1)
+            if row[column] not in ("", None)
+        ]
+        if values:
+            cursor.executemany(
+                f"INSERT INTO `{table}` (artifact_id, position, {value_column}) VALUES (%s, %s, %s)", values
+            )
+
+
+def find_by_child(cursor, table, value_column, value):
+    """Return (folder, title) of every artifact with `value` in a child table: a single index lookup."""
+    cursor.execute(
+        f"SELECT a.folder, a.title FROM `{table}` c JOIN `{ARTIFACT_TABLE}` a ON a.id = c.artifact_id "
+        f"WHERE c.{value_column} = %s ORDER BY a.title",
+        (value,)
+    )
+    return cursor.fetchall()
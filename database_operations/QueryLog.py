@@ -0,0 +1,160 @@
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+
+import mysql.connector
+
+import config
+import metrics
+
+EXPLAINABLE = ("SELECT", "INSERT", "REPLACE", "UPDATE", "DELETE")
+MAX_LOGGED_LENGTH = 2000  # Characters of a statement (and of its parameters) written to the log
+
+_explained = set()  # Shapes whose plan has been captured (or queued) in this process
+_lock = threading.Lock()
+_logger = None
+
+
+def logger():
+    """Return the slow query logger, writing to config.slow_query_log through a RotatingFileHandler."""
+    global _logger
+    with _lock:
+        if _logger is None:
+            _logger = logging.getLogger("museum.slow_queries")
+            _logger.setLevel(logging.INFO)
+            _logger.propagate = False
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(config.slow_query_log)), exist_ok=True)
+                handler = RotatingFileHandler(config.slow_query_log, maxBytes=config.slow_query_log_max_bytes,
+                                              backupCount=config.slow_query_log_backups, encoding="utf-8")
+                handler.setFormatter(logging.Formatter("%(asctime)s %(process)d %(message)s"))
+            except OSError as err:
+                print(f"Could not open the slow query log {config.slow_query_log}: {err}")  # Never fail a query
+                handler = logging.NullHandler()
+            _logger.addHandler(handler)
+        return _logger
+
+
+def shape(statement):
+    """Return a statement with its literals and value lists replaced by placeholders.
+
+    Table names are kept: the same query over two folder tables can have different plans.
+    """
+    text = re.sub(r"'(?:[^'\\]|\\.|'')*'", "?", statement)  # String literals
+    text = re.sub(r"\b\d+(?:\.\d+)?\b", "?", text)  # Numbers
+    text = text.replace("%s", "?")
+    text = re.sub(r"\(\s*\?(?:\s*,\s*\?)*\s*\)", "(...)", text)  # IN (...) and VALUES (...) lists
+    text = re.sub(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+", "(...)", text)  # Multi-row VALUES
+    return " ".join(text.split())
+
+
+def shape_id(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:10]
+
+
+def _truncate(value):
+    text = str(value)
+    return text if len(text) <= MAX_LOGGED_LENGTH else text[:MAX_LOGGED_LENGTH] + "..."
+
+
+def statement_metric(operation):
+    """Metrics series of a statement: "db." plus its leading keyword (db.select, db.insert, ...)."""
+    match = re.match(r"\s*([A-Za-z]+)", operation)
+    return f"db.{match.group(1).lower()}" if match else "db.other"
+
+
+class LoggedCursor:
+    """Cursor proxy that times execute()/executemany(), records each statement in the metrics (see metrics.py)
+    and logs statements slower than config.slow_query_ms.
+
+    Only the time spent in execute() is measured; rows streamed by an unbuffered cursor are read later.
+    The plans of new slow shapes are queued in `pending` and captured by explain_pending() once the
+    caller is done with the connection, so the caller's result set is never disturbed.
+    """
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.pending = []
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def execute(self, operation, params=(), *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            result = self._cursor.execute(operation, params, *args, **kwargs)
+        except BaseException:
+            self._check(operation, params, time.perf_counter() - started, error=True)
+            raise
+        self._check(operation, params, time.perf_counter() - started)
+        return result
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        seq_params = list(seq_params)
+        first = seq_params[0] if seq_params else ()
+        note = f" ({len(seq_params)} rows)"
+        started = time.perf_counter()
+        try:
+            result = self._cursor.executemany(operation, seq_params, *args, **kwargs)
+        except BaseException:
+            self._check(operation, first, time.perf_counter() - started, note, error=True)
+            raise
+        self._check(operation, first, time.perf_counter() - started, note)
+        return result
+
+    def _check(self, operation, params, elapsed, note="", error=False):
+        metrics.observe(statement_metric(operation), elapsed, error=error)
+        if config.slow_query_ms is None:
+            return
+        milliseconds = elapsed * 1000
+        if milliseconds < config.slow_query_ms:
+            return
+        text = shape(operation)
+        identifier = shape_id(text)
+        logger().info(f"SLOW {milliseconds:.1f} ms{note} [{identifier}] {_truncate(' '.join(operation.split()))} "
+                      f"params={_truncate(params)}")
+        if not operation.lstrip().upper().startswith(EXPLAINABLE):
+            return
+        with _lock:
+            if identifier in _explained:
+                return
+            _explained.add(identifier)
+        self.pending.append((identifier, operation, params))
+
+
+def _format_plan(identifier, columns, rows):
+    lines = [f"EXPLAIN [{identifier}]"]
+    lines.append("  " + " | ".join(columns))
+    for row in rows:
+        plan = dict(zip(columns, row))
+        line = "  " + " | ".join("" if value is None else str(value) for value in row)
+        if str(plan.get("type", "")).upper() == "ALL":
+            line += f"  <-- full table scan of {plan.get('table')}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def explain_pending(connection, cursor):
+    """Log the EXPLAIN plan of every slow shape `cursor` queued, on the connection it ran on. Best effort."""
+    if not isinstance(cursor, LoggedCursor) or not cursor.pending:
+        return
+    try:
+        if connection.unread_result:
+            connection.consume_results()
+        explain = connection.cursor(buffered=True)
+        try:
+            for identifier, operation, params in cursor.pending:
+                explain.execute(f"EXPLAIN {operation}", params)
+                logger().info(_format_plan(identifier, explain.column_names, explain.fetchall()))
+        finally:
+            explain.close()
+    except mysql.connector.Error as err:
+        logger().info(f"EXPLAIN failed: {err}")
+    cursor.pending = []
@@ -0,0 +1,72 @@
+import argparse
+import time
+
+from database_operations import Catalog
+from database_operations import Connection
+from database_operations import Search
+from database_operations import Tags
+from database_operations.Schema import SEARCH_TABLE, TAG_POSTING_TABLE
+
+
+def _iter_batches(batch_size):
+    """Yield (folder, rows) batches covering the whole catalog."""
+    with Connection.cursor() as cursor:
+        folders = Catalog.list_folders(cursor)
+    for folder in folders:
+        batch = []
+        for row in Catalog.iter_folder_rows(folder, batch_size):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield folder, batch
+                batch = []
+        if batch:
+            yield folder, batch
+
+
+def rebuild_search(batch_size=500):
+    """(Re)create the full-text search table from every folder. Writes keep it current afterwards."""
+    started = time.perf_counter()
+    with Connection.cursor() as cursor:
+        Search.ensure_schema(cursor)
+        cursor.execute(f"TRUNCATE TABLE `{SEARCH_TABLE}`")
+
+    indexed = 0
+    for folder, rows in _iter_batches(batch_size):
+        with Connection.transaction() as cursor:
+            Search.index_rows(cursor, folder, rows)
+        indexed += len(rows)
+    print(f"Search index: {indexed} artifacts indexed in {time.perf_counter() - started:.1f}s")
+    return indexed
+
+
+def rebuild_tags(batch_size=500):
+    """(Re)create the tag inverted index from every folder. Writes keep it current afterwards."""
+    started = time.perf_counter()
+    with Connection.cursor() as cursor:
+        Tags.ensure_schema(cursor)
+        cursor.execute(f"TRUNCATE TABLE `{TAG_POSTING_TABLE}`")
+
+    indexed = 0
+    for folder, rows in _iter_batches(batch_size):
+        with Connection.transaction() as cursor:
+            Tags.index_rows(cursor, folder, rows)
+        indexed += len(rows)
+    print(f"Tag index: {indexed} artifacts indexed in {time.perf_counter() - started:.1f}s")
+    return indexed
+
+
+INDEXES = {"search": rebuild_search, "tags": rebuild_tags}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the catalog's side indexes from the folder tables.")
+    parser.add_argument("indexes", nargs="*", choices=sorted(INDEXES), help="Indexes to rebuild (default: all)")
+    parser.add_argument("--batch-size", type=int, default=500, help="Artifacts indexed per transaction")
+    args = Connection.login_from_args(parser, argv)
+
+    for name in args.indexes or sorted(INDEXES):
+        INDEXES[name](args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
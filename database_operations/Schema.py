@@ -0,0 +1,114 @@
+# Column layout shared by every folder table
+IMAGE_COLUMNS = [f"img_{i}" for i in range(1, 6)]
+REFERENCE_COLUMNS = [f"reference_{i}" for i in range(1, 11)]
+SIZE_COLUMNS = ["hight", "width", "length"]  # "hight" is the column name used by the existing tables
+TAG_COLUMNS = [f"tag_{i}" for i in range(1, 16)]
+ARTIFACT_COLUMNS = (
+    ["title", "description"]
+    + IMAGE_COLUMNS
+    + REFERENCE_COLUMNS
+    + ["location"]
+    + SIZE_COLUMNS
+    + TAG_COLUMNS
+)
+
+# Field limits enforced by the entry forms (see Database.update_character_count)
+TITLE_MAX_LENGTH = 75
+DESCRIPTION_MAX_LENGTH = 3000
+LOCATION_MAX_LENGTH = 75
+REFERENCE_MAX_LENGTH = 75
+TAG_MAX_LENGTH = 20
+SIZE_MAX = 99999.99
+
+# Tables whose name starts with this prefix belong to the application (indexes, caches), not to curators
+INTERNAL_TABLE_PREFIX = "_"
+
+
+def folder_table_ddl(folder):
+    """Return the CREATE TABLE statement for a (wide layout) folder table."""
+    columns = ["id INT AUTO_INCREMENT PRIMARY KEY", f"title VARCHAR({TITLE_MAX_LENGTH}) NOT NULL", "description TEXT"]
+    columns += [f"{column} VARCHAR(255)" for column in IMAGE_COLUMNS]
+    columns += [f"{column} VARCHAR({REFERENCE_MAX_LENGTH})" for column in REFERENCE_COLUMNS]
+    columns += [f"location VARCHAR({LOCATION_MAX_LENGTH})"]
+    columns += [f"{column} DECIMAL(7, 2)" for column in SIZE_COLUMNS]
+    columns += [f"{column} VARCHAR({TAG_MAX_LENGTH})" for column in TAG_COLUMNS]
+    columns += ["INDEX idx_title (title)"]
+    return f"CREATE TABLE `{folder}` (\n    " + ",\n    ".join(columns) + "\n) CHARACTER SET utf8mb4"
+
+
+# Normalized layout: one artifacts table plus indexed child tables for the list-valued fields
+FOLDER_TABLE = "_folder"
+ARTIFACT_TABLE = "_artifact"
+IMAGE_TABLE = "_artifact_image"
+REFERENCE_TABLE = "_artifact_reference"
+TAG_TABLE = "_artifact_tag"
+
+# (child table, value column, wide-layout columns it replaces)
+CHILD_TABLES = [
+    (IMAGE_TABLE, "name", IMAGE_COLUMNS),
+    (REFERENCE_TABLE, "reference", REFERENCE_COLUMNS),
+    (TAG_TABLE, "tag", TAG_COLUMNS),
+]
+
+NORMALIZED_DDL = [
+    f"""CREATE TABLE IF NOT EXISTS `{FOLDER_TABLE}` (
+    name VARCHAR(64) PRIMARY KEY
+) CHARACTER SET utf8mb4""",
+    f"""CREATE TABLE IF NOT EXISTS `{ARTIFACT_TABLE}` (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    folder VARCHAR(64) NOT NULL,
+    title VARCHAR({TITLE_MAX_LENGTH}) NOT NULL,
+    description TEXT,
+    location VARCHAR({LOCATION_MAX_LENGTH}),
+    hight DECIMAL(7, 2),
+    width DECIMAL(7, 2),
+    length DECIMAL(7, 2),
+    UNIQUE KEY uq_title (title),
+    KEY idx_folder_title (folder, title),
+    FOREIGN KEY (folder) REFERENCES `{FOLDER_TABLE}` (name) ON UPDATE CASCADE
+) CHARACTER SET utf8mb4""",
+] + [
+    f"""CREATE TABLE IF NOT EXISTS `{table}` (
+    artifact_id INT NOT NULL,
+    position TINYINT NOT NULL,
+    {value_column} VARCHAR(255) NOT NULL,
+    PRIMARY KEY (artifact_id, position),
+    KEY idx_{value_column} ({value_column}, artifact_id),
+    FOREIGN KEY (artifact_id) REFERENCES `{ARTIFACT_TABLE}` (id) ON DELETE CASCADE
+) CHARACTER SET utf8mb4"""
+    for table, value_column, _ in CHILD_TABLES
+]
+
+# Full-text search documents, one per artifact (maintained by Search, rebuilt with Reindex)
+SEARCH_TABLE = "_search_document"
+SEARCH_DDL = f"""CREATE TABLE IF NOT EXISTS `{SEARCH_TABLE}` (
+    title VARCHAR({TITLE_MAX_LENGTH}) NOT NULL PRIMARY KEY,
+    folder VARCHAR(64) NOT NULL,
+    description TEXT,
+    location VARCHAR({LOCATION_MAX_LENGTH}),
+    keywords TEXT,
+    FULLTEXT KEY ft_title (title),
+    FULLTEXT KEY ft_all (title, description, location, keywords)
+) ENGINE=InnoDB CHARACTER SET utf8mb4"""
+
+# Tag inverted index: one posting per (tag, artifact), maintained by Tags, rebuilt with Reindex
+TAG_POSTING_TABLE = "_tag_posting"
+TAG_POSTING_DDL = f"""CREATE TABLE IF NOT EXISTS `{TAG_POSTING_TABLE}` (
+    tag VARCHAR(64) NOT NULL,
+    folder VARCHAR(64) NOT NULL,
+    title VARCHAR({TITLE_MAX_LENGTH}) NOT NULL,
+    PRIMARY KEY (tag, folder, title),
+    KEY idx_folder_tag (folder, tag),
+    KEY idx_title (title)
+) CHARACTER SET utf8mb4"""
+
+# Managed images: one row per unique original, named after its SHA-256 digest, listing its web derivatives
+# (maintained by Images). dhash is a 64-bit perceptual hash used to flag near-duplicates.
+IMAGE_STORE_TABLE = "_image"
+IMAGE_STORE_DDL = f"""CREATE TABLE IF NOT EXISTS `{IMAGE_STORE_TABLE}` (
+    name VARCHAR(255) NOT NULL PRIMARY KEY,
+    width INT NOT NULL,
+    height INT NOT NULL,
+    dhash BIGINT UNSIGNED,
+    derivatives TEXT NOT NULL
+) CHARACTER SET utf8mb4"""
@@ -0,0 +1,62 @@
+import re
+
+from database_operations import Connection
+from database_operations.Schema import REFERENCE_COLUMNS, SEARCH_DDL, SEARCH_TABLE, TAG_COLUMNS
+
+_table = Connection.TableCheck(SEARCH_TABLE)
+
+
+def ensure_schema(cursor):
+    cursor.execute(SEARCH_DDL)
+    _table.mark_created()
+
+
+def enabled(cursor):
+    """Return True if the search table exists (it is created by `python -m database_operations.Reindex`)."""
+    return _table.exists(cursor)
+
+
+def _document(folder, row):
+    keywords = [row.get(column) for column in REFERENCE_COLUMNS + TAG_COLUMNS if row.get(column)]
+    return row["title"], folder, row.get("description"), row.get("location"), " | ".join(keywords)
+
+
+def index_rows(cursor, folder, rows):
+    """Add or refresh the search documents of artifacts written to `folder` (call inside the write transaction)."""
+    if rows and enabled(cursor):
+        cursor.executemany(
+            f"REPLACE INTO `{SEARCH_TABLE}` (title, folder, description, location, keywords) "
+            f"VALUES (%s, %s, %s, %s, %s)",
+            [_document(folder, row) for row in rows]
+        )
+
+
+def remove_titles(cursor, titles):
+    titles = list(titles)
+    if titles and enabled(cursor):
+        placeholders = ", ".join(["%s"] * len(titles))
+        cursor.execute(f"DELETE FROM `{SEARCH_TABLE}` WHERE title IN ({placeholders})", tuple(titles))
+
+
+def boolean_query(text):
+    """Turn free text into a MySQL boolean-mode query requiring every word (as a prefix)."""
+    words = re.findall(r"\w+", text, flags=re.UNICODE)
+    return " ".join(f"+{word}*" for word in words)
+
+
+def search(text, limit=50):
+    """Return up to `limit` (folder, title, score) results for `text`, best first; title matches weigh double."""
+    query = boolean_query(text)
+    if not query:
+        return []
+    with Connection.cursor() as cursor:
+        cursor.execute(f"""
+        SELECT folder, title,
+               MATCH(title) AGAINST (%s IN BOOLEAN MODE) * 2
+               + MATCH(title, description, location, keywords) AGAINST (%s IN BOOLEAN MODE) AS score
+        FROM `{SEARCH_TABLE}`
+        WHERE MATCH(title, description, location, keywords) AGAINST (%s IN BOOLEAN MODE)
+        ORDER BY score DESC, title
+        LIMIT %s
+        """, (query, query, query, limit))
+        return cursor.fetchall()
@@ -0,0 +1,111 @@
+from database_operations import Connection
+from database_operations.Schema import TAG_COLUMNS, TAG_POSTING_DDL, TAG_POSTING_TABLE
+
+_table = Connection.TableCheck(TAG_POSTING_TABLE)
+
+
+def ensure_schema(cursor):
+    cursor.execute(TAG_POSTING_DDL)
+    _table.mark_created()
+
+
+def enabled(cursor):
+    """Return True if the tag index exists (it is created by `python -m database_operations.Reindex`)."""
+    return _table.exists(cursor)
+
+
+def normalize(tag):
+    """Tags are matched case-insensitively and without surrounding whitespace."""
+    return str(tag).strip().lower()
+
+
+def remove_titles(cursor, titles):
+    titles = list(titles)
+    if titles and enabled(cursor):
+        placeholders = ", ".join(["%s"] * len(titles))
+        cursor.execute(f"DELETE FROM `{TAG_POSTING_TABLE}` WHERE title IN ({placeholders})", tuple(titles))
+
+
+def index_rows(cursor, folder, rows):
+    """Replace the postings of artifacts written to `folder` (call inside the write transaction)."""
+    if not rows or not enabled(cursor):
+        return
+    remove_titles(cursor, [row["title"] for row in rows])
+    postings = {
+        (normalize(row[column]), folder, row["title"])
+        for row in rows
+        for column in TAG_COLUMNS
+        if row.get(column) and normalize(row[column])
+    }
+    if postings:
+        cursor.executemany(
+            f"INSERT IGNORE INTO `{TAG_POSTING_TABLE}` (tag, folder, title) VALUES (%s, %s, %s)", sorted(postings)
+        )
+
+
+def _in_list(column, values):
+    return f"{column} IN ({', '.join(['%s'] * len(values))})"
+
+
+def _matching_sql(all_of, any_of, folders):
+    """Return (sql, params) selecting the (folder, title) of artifacts matching the facet filter."""
+    all_of = sorted({normalize(tag) for tag in all_of or []})
+    any_of = sorted({normalize(tag) for tag in any_of or []})
+    conditions, params = [], []
+    tags = all_of + [tag for tag in any_of if tag not in all_of]
+    if tags:
+        conditions.append(_in_list("tag", tags))
+        params += tags
+    if folders:
+        conditions.append(_in_list("folder", folders))
+        params += list(folders)
+
+    having, having_params = [], []
+    if all_of:
+        having.append(f"COUNT(DISTINCT CASE WHEN {_in_list('tag', all_of)} THEN tag END) = %s")
+        having_params += all_of + [len(all_of)]
+    if any_of:
+        having.append(f"SUM({_in_list('tag', any_of)}) > 0")
+        having_params += any_of
+
+    sql = f"SELECT folder, title FROM `{TAG_POSTING_TABLE}`"
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += " GROUP BY folder, title"
+    if having:
+        sql += " HAVING " + " AND ".join(having)
+    return sql, params + having_params
+
+
+def filter_artifacts(all_of=(), any_of=(), folders=None, limit=None):
+    """Return (folder, title) of artifacts having every tag of `all_of` and at least one of `any_of`.
+
+    Either list may be empty; `folders` restricts the result to those folders.
+    """
+    sql, params = _matching_sql(all_of, any_of, folders)
+    sql += " ORDER BY title"
+    if limit:
+        sql += " LIMIT %s"
+        params.append(limit)
+    with Connection.cursor() as cursor:
+        cursor.execute(sql, tuple(params))
+        return cursor.fetchall()
+
+
+def tag_counts(all_of=(), any_of=(), folders=None, limit=50):
+    """Return (tag, count) facets over the artifacts matching the filter, most frequent first."""
+    with Connection.cursor() as cursor:
+        if not all_of and not any_of:
+            # No tag filter: counts come straight from the (folder, tag) index
+            sql = f"SELECT tag, COUNT(*) AS n FROM `{TAG_POSTING_TABLE}`"
+            params = []
+            if folders:
+                sql += " WHERE " + _in_list("folder", folders)
+                params += list(folders)
+        else:
+            matching, params = _matching_sql(all_of, any_of, folders)
+            sql = (f"SELECT p.tag, COUNT(*) AS n FROM `{TAG_POSTING_TABLE}` p "
+                   f"JOIN ({matching}) m ON m.folder = p.folder AND m.title = p.title")
+        sql += " GROUP BY tag ORDER BY n DESC, tag LIMIT %s"
+        cursor.execute(sql, tuple(params) + (limit,))
+        return cursor.fetchall()
@@ -0,0 +1,110 @@
+from concurrent.futures import ThreadPoolExecutor
+import tkinter as tk
+from tkinter import messagebox
+import mysql.connector
+import config
+
+POLL_INTERVAL_MS = 50  # How often the Tk event loop checks for finished work
+
+_executor = None
+
+
+def executor():
+    """Return the shared worker pool, started on first use."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=config.gui_workers, thread_name_prefix="museum-gui")
+    return _executor
+
+
+def show_error(err):
+    """Default error handler: report a failed request in a message box (on the Tk thread)."""
+    if isinstance(err, mysql.connector.Error):
+        messagebox.showerror("Database Error", f"The database request failed: {err}")
+    else:
+        messagebox.showerror("Error", f"An unexpected error occurred: {err}")
+
+
+class Channel:
+    """Runs one kind of request for a window (e.g. "titles of the selected folder") off the Tk thread.
+
+    Submitting a new request supersedes the pending one: it is cancelled if it has not started yet, and its result is
+    dropped if it has. Callbacks always run on the Tk thread, polled with after(), so they may touch widgets.
+    A running request may call progress() from its worker thread to update the indicator.
+    The `controls` (e.g. the button that submits the request) are disabled while a request runs.
+    """
+
+    def __init__(self, widget, indicator=None, controls=()):
+        self.widget = widget
+        self.indicator = indicator  # Optional Label showing the loading message
+        self.controls = list(controls)
+        self._future = None
+        self._generation = 0
+        self._progress = None  # Latest message from progress(), shown on the next poll
+
+    def submit(self, function, *args, on_done=None, on_error=show_error, message="Loading…"):
+        self.cancel()
+        generation = self._generation
+        self._future = executor().submit(function, *args)
+        self._set_message(message)
+        self._set_enabled(False)
+        self.widget.after(POLL_INTERVAL_MS, self._poll, self._future, generation, on_done, on_error)
+        return self._future
+
+    def progress(self, message):
+        """Show `message` in the indicator while the request runs. Safe to call from the worker thread."""
+        self._progress = (self._generation, message)
+
+    def cancel(self):
+        """Forget the pending request, if any."""
+        self._generation += 1
+        self._progress = None
+        if self._future is not None:
+            self._future.cancel()  # Only takes effect if a worker has not picked it up yet
+            self._future = None
+        self._set_message("")
+        self._set_enabled(True)
+
+    def busy(self):
+        return self._future is not None
+
+    def _set_message(self, message):
+        if self.indicator is not None:
+            try:
+                self.indicator.config(text=message)
+            except tk.TclError:
+                pass  # The window has been closed
+
+    def _set_enabled(self, enabled):
+        for control in self.controls:
+            try:
+                control.config(state="normal" if enabled else "disabled")
+            except tk.TclError:
+                pass
+
+    def _poll(self, future, generation, on_done, on_error):
+        if generation != self._generation:
+            return  # Superseded or cancelled
+        try:
+            if not self.widget.winfo_exists():
+                return
+        except tk.TclError:
+            return
+        progress, self._progress = self._progress, None
+        if progress is not None and progress[0] == generation:
+            self._set_message(progress[1])
+        if not future.done():
+            self.widget.after(POLL_INTERVAL_MS, self._poll, future, generation, on_done, on_error)
+            return
+
+        self._future = None
+        self._set_message("")
+        self._set_enabled(True)
+        try:
+            result = future.result()
+        except Exception as err:
+            if on_error:
+                on_error(err)
+            return
+        if on_done:
+            on_done(result)
@@ -0,0 +1,139 @@
+import argparse
+import os
+import textwrap
+from html import escape
+from itertools import islice
+
+import segno
+
+import config
+from database_operations import Catalog
+from database_operations import Connection
+from html_operations import Output
+from html_operations import Render
+
+# Default sheet: A4 portrait, 3 x 8 labels of 70 x 37 mm (all sizes in millimetres)
+PAGE_WIDTH = 210
+PAGE_HEIGHT = 297
+COLUMNS = 3
+ROWS = 8
+LABEL_WIDTH = 70
+LABEL_HEIGHT = 37
+QR_PADDING = 1
+QR_BORDER = 4  # Quiet zone in modules, required by most scanners
+CAPTION_FONT_SIZE = 3.2
+CAPTION_CHARS_PER_LINE = 18
+CAPTION_MAX_LINES = 6
+
+
+def qr_path(payload, x, y, size):
+    """Return an SVG path drawing the QR code for `payload` in a `size` x `size` square at (x, y)."""
+    qr = segno.make(payload)
+    modules = qr.symbol_size(scale=1, border=QR_BORDER)[0]
+    step = size / modules
+    commands = []
+    for row, cells in enumerate(qr.matrix_iter(border=QR_BORDER)):
+        column = 0
+        while column < modules:
+            if not cells[column]:
+                column += 1
+                continue
+            start = column
+            while column < modules and cells[column]:
+                column += 1
+            # One rectangle per horizontal run of dark modules keeps the path short
+            width = (column - start) * step
+            commands.append(f"M{x + start * step:.2f} {y + row * step:.2f}h{width:.2f}v{step:.2f}h{-width:.2f}z")
+    return f'<path d="{"".join(commands)}" fill="#000"/>\n'
+
+
+def label_svg(caption, payload, x, y):
+    """Return the SVG markup of one label: the QR code on the left, the wrapped caption on the right."""
+    qr_size = LABEL_HEIGHT - 2 * QR_PADDING
+    parts = [qr_path(payload, x + QR_PADDING, y + QR_PADDING, qr_size)]
+
+    lines = textwrap.wrap(str(caption), CAPTION_CHARS_PER_LINE)
+    if len(lines) > CAPTION_MAX_LINES:
+        lines = lines[:CAPTION_MAX_LINES]
+        lines[-1] = lines[-1][:CAPTION_CHARS_PER_LINE - 1] + "…"
+    text_x = x + qr_size + 2 * QR_PADDING
+    text_y = y + (LABEL_HEIGHT - len(lines) * CAPTION_FONT_SIZE * 1.2) / 2 + CAPTION_FONT_SIZE
+    for index, line in enumerate(lines):
+        parts.append(
+            f'<text x="{text_x:.2f}" y="{text_y + index * CAPTION_FONT_SIZE * 1.2:.2f}" '
+            f'font-family="Arial, sans-serif" font-size="{CAPTION_FONT_SIZE}">{escape(line)}</text>\n'
+        )
+    return "".join(parts)
+
+
+def iter_sheet(labels):
+    """Yield the SVG markup of one printable page holding up to COLUMNS x ROWS (caption, payload) labels."""
+    margin_x = (PAGE_WIDTH - COLUMNS * LABEL_WIDTH) / 2
+    margin_y = (PAGE_HEIGHT - ROWS * LABEL_HEIGHT) / 2
+    yield (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{PAGE_WIDTH}mm" height="{PAGE_HEIGHT}mm" '
+        f'viewBox="0 0 {PAGE_WIDTH} {PAGE_HEIGHT}">\n'
+    )
+    for index, (caption, payload) in enumerate(labels):
+        row, column = divmod(index, COLUMNS)
+        yield label_svg(caption, payload, margin_x + column * LABEL_WIDTH, margin_y + row * LABEL_HEIGHT)
+    yield "</svg>\n"
+
+
+def write_sheets(labels, output_dir, prefix="labels"):
+    """Lay (caption, payload) labels out into numbered SVG pages in `output_dir`; returns the page paths.
+
+    Labels are consumed lazily one page at a time, so memory stays flat however many labels are printed.
+    """
+    labels = iter(labels)
+    paths = []
+    while True:
+        page = list(islice(labels, COLUMNS * ROWS))
+        if not page:
+            break
+        path = os.path.join(output_dir, f"{prefix}-{len(paths) + 1:04d}.svg")
+        Output.write_if_changed(path, iter_sheet(page))
+        paths.append(path)
+    return paths
+
+
+def folder_labels(folder, base_url):
+    """Yield a (title, page URL) label for every artifact of a folder table."""
+    for title in Catalog.iter_folder_titles(folder):
+        yield title, Render.page_url(base_url, folder, title)
+
+
+def title_labels(titles, base_url):
+    """Yield a (title, page URL) label for each title, resolving its folder through the title index."""
+    for title in titles:
+        with Connection.cursor() as cursor:
+            folder = Catalog.title_index.lookup(cursor, title)
+        if folder is None:
+            print(f"Skipping unknown title: {title}")
+            continue
+        yield title, Render.page_url(base_url, folder, title)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate printable QR label sheets (SVG pages).")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--folder", help="Print a label for every artifact of this folder")
+    source.add_argument("--titles", nargs="+", help="Print labels for these titles")
+    source.add_argument("--titles-file", help="Print labels for the titles listed in this file, one per line")
+    parser.add_argument("--output", default="labels", help="Directory for the generated pages")
+    parser.add_argument("--base-url", default=config.site_base_url, help="Public URL of the generated site")
+    args = Connection.login_from_args(parser, argv)
+
+    if args.folder:
+        paths = write_sheets(folder_labels(args.folder, args.base_url), args.output)
+    elif args.titles:
+        paths = write_sheets(title_labels(args.titles, args.base_url), args.output)
+    else:
+        with open(args.titles_file, encoding="utf-8") as file:  # Streamed line by line
+            titles = (line.strip() for line in file if line.strip())
+            paths = write_sheets(title_labels(titles, args.base_url), args.output)
+    print(f"Wrote {len(paths)} label sheet(s) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import hashlib
+import json
+import os
+
+from html_operations import Output
+
+
+def fingerprint(*parts):
+    """Return a stable hash of the inputs an artifact's outputs are generated from (row, template version...)."""
+    encoded = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class Manifest:
+    """On-disk record of what was generated for every artifact, so rebuilds only redo what changed.
+
+    Each entry maps an artifact key to the fingerprint of its inputs and the digest of every output file
+    (paths relative to the output root).
+    """
+
+    FILE_NAME = ".manifest.json"
+
+    def __init__(self, root):
+        self.root = root
+        self.path = os.path.join(root, self.FILE_NAME)
+        self.entries = {}
+        self.seen = set()
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                self.entries = json.load(file).get("artifacts", {})
+        except (FileNotFoundError, ValueError):
+            self.entries = {}  # Missing or corrupt manifest: everything is rebuilt once
+
+    def is_current(self, key, input_hash):
+        """Return True (and mark the artifact as seen) if its inputs are unchanged and its outputs still exist."""
+        self.seen.add(key)
+        entry = self.entries.get(key)
+        if not entry or entry.get("inputs") != input_hash:
+            return False
+        return all(os.path.exists(os.path.join(self.root, path)) for path in entry.get("outputs", {}))
+
+    def output_digests(self, key):
+        """Return {relative path: digest} of the outputs last recorded for an artifact."""
+        return dict(self.entries.get(key, {}).get("outputs", {}))
+
+    def record(self, key, input_hash, outputs):
+        self.seen.add(key)
+        self.entries[key] = {"inputs": input_hash, "outputs": outputs}
+
+    def remove_stale(self):
+        """Delete the outputs of artifacts that were not seen during this build. Returns the number removed."""
+        removed = 0
+        for key in [key for key in self.entries if key not in self.seen]:
+            for path in self.entries.pop(key).get("outputs", {}):
+                for suffix in ("",) + Output.COMPRESSED_SUFFIXES:
+                    try:
+                        os.remove(os.path.join(self.root, path + suffix))
+                    except FileNotFoundError:
+                        pass
+            removed += 1
+        return removed
+
+    def save(self):
+        Output.write_if_changed(self.path, [json.dumps({"artifacts": self.entries}, sort_keys=True)])
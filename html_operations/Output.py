@@ -0,0 +1,116 @@
+import gzip
+import hashlib
+import os
+import tempfile
+
+import metrics
+
+try:
+    import brotli  # Optional: without it only .gz siblings are written
+except ImportError:
+    brotli = None
+
+CHUNK_SIZE = 1 << 20
+COMPRESSED_SUFFIXES = (".gz", ".br")  # Pre-compressed siblings served by Apache (see apache_precompressed.conf)
+
+
+def file_digest(path):
+    """Return the SHA-256 hex digest of a file, read in chunks; None if it does not exist."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+
+def _write_atomically(path, write):
+    """Call write(file) on a temporary file next to `path`, then move it into place."""
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            write(file)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def _iter_file(path):
+    with open(path, "rb") as file:
+        yield from iter(lambda: file.read(CHUNK_SIZE), b"")
+
+
+def _expected_suffixes():
+    return COMPRESSED_SUFFIXES if brotli is not None else (".gz",)
+
+
+@metrics.timed("output.write_compressed")
+def write_compressed(path):
+    """Write `path`.gz (and `path`.br when brotli is installed) at maximum compression, streaming the file."""
+    def write_gzip(file):
+        # mtime=0 keeps the output byte-identical across builds
+        with gzip.GzipFile(filename="", mode="wb", compresslevel=9, fileobj=file, mtime=0) as compressed:
+            for chunk in _iter_file(path):
+                compressed.write(chunk)
+
+    def write_brotli(file):
+        compressor = brotli.Compressor(quality=11, mode=brotli.MODE_TEXT)
+        for chunk in _iter_file(path):
+            file.write(compressor.process(chunk))
+        file.write(compressor.finish())
+
+    _write_atomically(path + ".gz", write_gzip)
+    if brotli is not None:
+        _write_atomically(path + ".br", write_brotli)
+    elif os.path.exists(path + ".br"):
+        os.remove(path + ".br")  # Never leave a sibling that no longer matches the page
+
+
+@metrics.timed("output.write_if_changed")  # Includes rendering: pages are generated while they are written
+def write_if_changed(path, chunks, current_digest=None, compress=False):
+    """Stream `chunks` (str or bytes) to `path`, leaving the existing file untouched if it is byte-identical.
+
+    The content is written to a temporary file in the same directory while being hashed, then atomically
+    moved into place only when its digest differs from the current file's (`current_digest` may be passed
+    in, e.g. from a manifest, to avoid re-reading the old file). With `compress`, .gz/.br siblings are
+    written too, only when the content changed (or a sibling is missing). Returns (changed, digest, size).
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode("utf-8")
+                digest.update(chunk)
+                file.write(chunk)
+                size += len(chunk)
+        new_digest = digest.hexdigest()
+
+        if current_digest is None or not os.path.exists(path):
+            current_digest = file_digest(path)
+        if current_digest == new_digest:
+            os.remove(temp_path)
+            if compress and not all(os.path.exists(path + suffix) for suffix in _expected_suffixes()):
+                write_compressed(path)  # First build with compression (or brotli newly installed)
+            return False, new_digest, size
+
+        os.chmod(temp_path, 0o644)  # mkstemp creates owner-only files; Apache needs to read them
+        os.replace(temp_path, path)
+        metrics.add_bytes("output.write_if_changed", size)
+        if compress:
+            write_compressed(path)
+        return True, new_digest, size
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
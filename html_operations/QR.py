@@ -1,159 +1,61 @@
 import tkinter as tk
 from tkinter import filedialog, Toplevel, Scrollbar, Listbox
-from PIL import Image, ImageTk
-from io import BytesIO
-import segno
+from PIL import ImageTk
 import webbrowser
+import os
+import tempfile
 from database_operations import Database
+from database_operations import Connection
+from database_operations import Catalog
+from database_operations import Search
+from database_operations import Images
 import mysql.connector
 from tkinter import messagebox
 import config
+import metrics
+from html_operations import Render
+from html_operations import Output
+from html_operations import QRCache
+from html_operations import Labels
+from html_operations import Site
+from html_operations import Background
+
+TITLE_PAGE_SIZE = 200  # Titles fetched per page as the title list is scrolled
+
+
+def generate_html_page(data, title, file_path):
+    """Generate an HTML page dynamically from the fetched data and save it to file_path (runs on a Background worker)."""
+    # The page links the shared stylesheet, which is saved alongside it; identical files are not rewritten
+    directory = os.path.dirname(file_path)
+    stylesheet_path = os.path.join(directory, Render.STYLESHEET_NAME)
+    Output.write_if_changed(stylesheet_path, [Render.stylesheet_text()], compress=True)
+    # Stored images are shown with their web derivatives, copied into an images folder next to the page
+    try:
+        with Connection.cursor() as cursor:
+            images = Images.image_info(cursor, [data.get(column) for column in Catalog.IMAGE_COLUMNS])
+        Site.publish_images(directory, config.image_store_root, images)
+    except (OSError, mysql.connector.Error) as err:
+        print(f"Images left out of {file_path}: {err}")
+        images = {}
+    changed, _, _ = Output.write_if_changed(
+        file_path, Render.iter_page(data, title, images=images, image_base=f"{Render.IMAGES_DIRNAME}/"), compress=True
+    )
+    print(f"HTML page saved to {file_path}" if changed else f"HTML page at {file_path} is already up to date")
+    return changed
 
 
-def generate_html_page(data, title):
-    """Generate an HTML page dynamically from the fetched data."""
-    def safe(value):
-        return value if value else None
-
-    # Extract specific fields if they exist
-    description = safe(data.get("description"))
-    location = safe(data.get("location"))
-    size_components = [
-        f"H: {safe(data.get('hight'))}",
-        f"W: {safe(data.get('width'))}",
-        f"L: {safe(data.get('length'))}"
-    ]
-    size = ", ".join(filter(None, size_components))
-    image_titles = [safe(data.get(f"img_{i}")) for i in range(1, 6) if f"img_{i}" in data and data.get(f"img_{i}")]
-    biblio_ref = [safe(data.get(f"reference_{i}")) for i in range(1, 11) if f"reference_{i}" in data and data.get(f"reference_{i}")]
-    tags = [safe(data.get(f"tag_{i}")) for i in range(1, 16) if f"tag_{i}" in data and data.get(f"tag_{i}")]
-
-    html_sections = []
-
-    # Add sections conditionally
-    if description:
-        html_sections.append(f"""
-        <div class="section">
-            <h2>Description</h2>
-            <p>{description}</p>
-        </div>
-        """)
-
-    if image_titles:
-        images_html = ''.join(f'<div class="image"><p>{img}</p></div>' for img in image_titles)
-        html_sections.append(f"""
-        <div class="section">
-            <h2>Images</h2>
-            {images_html}
-        </div>
-        """)
-
-    if biblio_ref:
-        biblio_html = ''.join(f'<li>{ref}</li>' for ref in biblio_ref)
-        html_sections.append(f"""
-        <div class="section">
-            <h2>Bibliographic References</h2>
-            <div class="biblio">
-                <ul>
-                    {biblio_html}
-                </ul>
-            </div>
-        </div>
-        """)
-
-    if location:
-        html_sections.append(f"""
-        <div class="section">
-            <h2>Location</h2>
-            <p>{location}</p>
-        </div>
-        """)
-
-    if size:
-        html_sections.append(f"""
-        <div class="section">
-            <h2>Size</h2>
-            <p>{size}</p>
-        </div>
-        """)
-
-    if tags:
-        tags_html = ', '.join(tags)
-        html_sections.append(f"""
-        <div class="section">
-            <h2>Tags</h2>
-            <div class="tags">
-                {tags_html}
-            </div>
-        </div>
-        """)
-
-    # Combine all sections
-    html_content = f"""
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>{title}</title>
-        <style>
-            body {{
-                font-family: Arial, sans-serif;
-                background-color: #E0F0FD;
-                color: #0D47A1;
-                margin: 20px;
-            }}
-            h1, h2 {{
-                color: #0D47A1;
-            }}
-            .section {{
-                margin-bottom: 20px;
-            }}
-            .image {{
-                margin: 10px 0;
-            }}
-            .biblio, .tags {{
-                background-color: #BBDEFB;
-                padding: 10px;
-                border-radius: 5px;
-            }}
-        </style>
-    </head>
-    <body>
-        <h1>{title}</h1>
-        {''.join(html_sections)}
-    </body>
-    </html>
-    """
-
-    # Save the HTML
-    file_path = filedialog.asksaveasfilename(defaultextension=".html", filetypes=[("HTML files", "*.html")], title="Save HTML Page")
-    if file_path:
-        with open(file_path, "w", encoding="utf-8") as file:
-            file.write(html_content)
-        print(f"HTML page saved to {file_path}")
-        open_options_window(title, file_path)  # Transition to the options window
+@metrics.timed("qr.generate")
+def generate_qr(data):
+    """Generate a QR code as a PIL image (runs on a Background worker; wrap it in a PhotoImage on the Tk thread)."""
+    return QRCache.qr_cache.display_image(data, size=200)  # Rendered once, then served from the cache
 
 
-def generate_qr(data):
-    """Generate a QR code and return it as a PhotoImage."""
-    qr = segno.make(data)  # Create QR code
-    buffer = BytesIO()
-    qr.save(buffer, kind='png', scale=10)  # Generate high-quality QR code
-    buffer.seek(0)
-    image = Image.open(buffer)
-    image = image.resize((200, 200), Image.Resampling.LANCZOS)  # Resize for display
-    return ImageTk.PhotoImage(image)
-
-
-def save_qr_to_file(data):
-    """Prompt the user to save the QR code as a .png file."""
-    qr = segno.make(data)  # Generate QR code
-    file_path = filedialog.asksaveasfilename(defaultextension=".png", filetypes=[("PNG files", "*.png")], title="Save QR Code")
-    if file_path:
-        qr.save(file_path, kind='png', scale=10)
-        qr.save(file_path, kind='png', scale=10)
-        print(f"QR Code saved to {file_path}")
+def save_qr_to_file(data, file_path):
+    """Save the QR code as a .png (or .svg) file (runs on a Background worker)."""
+    kind = "svg" if file_path.lower().endswith(".svg") else "png"
+    changed, _, _ = Output.write_if_changed(file_path, [QRCache.qr_cache.encoded(data, kind=kind)])
+    print(f"QR Code saved to {file_path}" if changed else f"QR Code at {file_path} is already up to date")
+    return changed
 
 
 def open_save_html(data, title):
@@ -171,8 +73,23 @@ def open_save_html(data, title):
         bg=config.BG_COLOR
     ).pack(pady=10)
 
+    # Shows that the page is being written in the background
+    status_label = tk.Label(third_window, text="", font=config.FONT_TEXT, bg=config.BG_COLOR, fg=config.TEXT_COLOR)
+    save_channel = Background.Channel(third_window, status_label)
+
+    def save_html():
+        if save_channel.busy():
+            return
+        file_path = filedialog.asksaveasfilename(defaultextension=".html", filetypes=[("HTML files", "*.html")], title="Save HTML Page")
+        if file_path:
+            def saved(_):
+                third_window.destroy()
+                open_options_window(title, file_path)  # Transition to the options window
+
+            save_channel.submit(generate_html_page, data, title, file_path, on_done=saved, message="Saving the page…")
+
     # Button to save the HTML file
-    tk.Button(
+    save_button = tk.Button(
         third_window,
         text="Save HTML File",
         font=config.FONT_BOLD,
@@ -182,8 +99,11 @@ def open_save_html(data, title):
         activeforeground="white",
         padx=10,
         pady=5,
-        command=lambda: [generate_html_page(data, title), third_window.destroy()]  # Pass both arguments
-    ).pack(pady=20)
+        command=save_html
+    )
+    save_button.pack(pady=20)
+    save_channel.controls.append(save_button)  # Disabled while the page is being written
+    status_label.pack()
 
 
 def open_options_window(title, html_path):
@@ -255,14 +175,34 @@ def open_qr_code_window(title, html_path):
         wraplength=380,  # Ensure long paths wrap nicely
     ).pack(pady=10)
 
-    # Generate and display the QR code
-    qr_image = generate_qr(html_path)  # Generate QR code for the HTML path
-    qr_label = tk.Label(qr_window, image=qr_image, bg=config.BG_COLOR)
-    qr_label.image = qr_image  # Keep a reference to avoid garbage collection
+    # The QR code is rendered in the background and shown when ready
+    qr_label = tk.Label(qr_window, text="", font=config.FONT, bg=config.BG_COLOR, fg=config.TEXT_COLOR)
     qr_label.pack(pady=20)
+    status_label = tk.Label(qr_window, text="", font=config.FONT_TEXT, bg=config.BG_COLOR, fg=config.TEXT_COLOR)
+    render_channel = Background.Channel(qr_window, qr_label)
+
+    def show_qr(image):
+        qr_image = ImageTk.PhotoImage(image)  # Generate QR code for the HTML path
+        qr_label.config(image=qr_image)
+        qr_label.image = qr_image  # Keep a reference to avoid garbage collection
+
+    render_channel.submit(generate_qr, html_path, on_done=show_qr, message="Generating the QR code…")
+
+    def save_qr():
+        """Prompt the user for a .png (or .svg) file and write the QR code to it in the background."""
+        if file_channel.busy():
+            return
+        file_path = filedialog.asksaveasfilename(defaultextension=".png", filetypes=[("PNG files", "*.png"), ("SVG files", "*.svg")], title="Save QR Code")
+        if file_path:
+            file_channel.submit(save_qr_to_file, html_path, file_path, message="Saving the QR code…")
+
+    def print_qr():
+        if not file_channel.busy():
+            file_channel.submit(print_qr_label, title, html_path, on_done=webbrowser.open_new_tab,
+                                message="Preparing the label sheet…")
 
     # Save button
-    tk.Button(
+    save_button = tk.Button(
         qr_window,
         text="Save",
         font=config.FONT_BOLD,
@@ -272,11 +212,12 @@ def open_qr_code_window(title, html_path):
         activeforeground="white",
         padx=10,
         pady=5,
-        command=lambda: save_qr_to_file(html_path)
-    ).pack(pady=10)
+        command=save_qr
+    )
+    save_button.pack(pady=10)
 
-    # Print button (placeholder for actual print functionality)
-    tk.Button(
+    # Print button: lay the QR code out on a label sheet and open it in the browser's print dialog
+    print_button = tk.Button(
         qr_window,
         text="Print",
         font=config.FONT_BOLD,
@@ -286,8 +227,19 @@ def open_qr_code_window(title, html_path):
         activeforeground="white",
         padx=10,
         pady=5,
-        command=lambda: print(f"Printing QR Code for {html_path}")  # Replace with actual print logic
-    ).pack(pady=10)
+        command=print_qr
+    )
+    print_button.pack(pady=10)
+    status_label.pack()
+
+    # Saving and printing write files in the background, one at a time
+    file_channel = Background.Channel(qr_window, status_label, controls=(save_button, print_button))
+
+
+def print_qr_label(title, html_path):
+    """Write a label sheet with this QR code and return its path, to open for printing (runs on a Background worker)."""
+    output_dir = tempfile.mkdtemp(prefix="museum-labels-")
+    return Labels.write_sheets([(title, html_path)], output_dir)[0]
 
 
 def confirm_delete(title, parent_window):
@@ -306,8 +258,22 @@ def confirm_delete(title, parent_window):
         wraplength=280,  # Ensure text wraps nicely
     ).pack(pady=10)
 
-    # Yes button - Placeholder for actual delete logic
-    tk.Button(
+    # Shows that the entry is being deleted in the background
+    status_label = tk.Label(confirm_window, text="", font=config.FONT_TEXT, bg=config.BG_COLOR, fg=config.TEXT_COLOR)
+    delete_channel = Background.Channel(confirm_window, status_label)
+
+    def deleted(table):
+        if not table:
+            messagebox.showinfo("Not Found", f"'{title}' was not found in the database.")
+        confirm_window.destroy()
+        parent_window.destroy()  # Close both windows
+
+    def delete():
+        if not delete_channel.busy():
+            delete_channel.submit(delete_entry, title, on_done=deleted, message=f"Deleting {title}…")
+
+    # Yes button
+    yes_button = tk.Button(
         confirm_window,
         text="Yes",
         font=config.FONT_BOLD,
@@ -317,8 +283,10 @@ def confirm_delete(title, parent_window):
         activeforeground="white",
         padx=10,
         pady=5,
-        command=lambda: [delete_entry(title), confirm_window.destroy(), parent_window.destroy()]  # Close both windows
-    ).pack(side="left", padx=20, pady=10)
+        command=delete
+    )
+    yes_button.pack(side="left", padx=20, pady=10)
+    delete_channel.controls.append(yes_button)  # Disabled while the entry is being deleted
 
     # No button - Closes the confirmation window
     tk.Button(
@@ -333,6 +301,7 @@ def confirm_delete(title, parent_window):
         pady=5,
         command=confirm_window.destroy
     ).pack(side="right", padx=20, pady=10)
+    status_label.pack(side="bottom")
 
 
 def open_select_window():
@@ -376,6 +345,10 @@ def open_select_window():
         fg=config.TEXT_COLOR
     ).pack(pady=10)
 
+    # Type-ahead filter: narrows the title list to titles starting with what is typed
+    filter_entry = tk.Entry(root, font=config.FONT, bg=config.ENTRY_COLOR, fg=config.TEXT_COLOR, width=30)
+    filter_entry.pack()
+
     # Frame for title selection
     title_frame = tk.Frame(root, bg=config.BG_COLOR)
     title_frame.pack(pady=10)
@@ -394,59 +367,160 @@ def open_select_window():
 
     title_scrollbar = tk.Scrollbar(title_frame, orient="vertical", command=title_listbox.yview)
     title_scrollbar.pack(side="right", fill="y")
-    title_listbox.config(yscrollcommand=title_scrollbar.set)
 
-    # Populate folder listbox with folder names
-    folders = get_folders()  # Fetch all folder (table) names dynamically
-    for folder in folders:
-        folder_listbox.insert("end", folder)
+    # Shows what is being loaded while a request runs in the background
+    status_label = tk.Label(root, text="", font=config.FONT_TEXT, bg=config.BG_COLOR, fg=config.TEXT_COLOR)
+    status_label.pack()
+
+    # One channel per kind of request: a new folder click or search supersedes the one still loading
+    folder_channel = Background.Channel(root, status_label)
+    title_channel = Background.Channel(root, status_label)
+    data_channel = Background.Channel(root, status_label)
+
+    # The title list holds one page of the selected folder to begin with; more pages are fetched as it is scrolled
+    paging = {"folder": None, "last_title": "", "exhausted": True}
+
+    def fill_titles(titles):
+        paging["exhausted"] = True  # Search results are not paged
+        title_listbox.delete(0, "end")
+        for title in titles:
+            title_listbox.insert("end", title)
+
+    def append_page(titles):
+        if titles:
+            title_listbox.insert("end", *titles)
+            paging["last_title"] = titles[-1]
+        paging["exhausted"] = len(titles) < TITLE_PAGE_SIZE
+
+    def load_more_titles():
+        if paging["exhausted"] or title_channel.busy():
+            return
+        title_channel.submit(get_title_page, paging["folder"], paging["last_title"], on_done=append_page,
+                             message=f"Loading {paging['folder']}…")
+
+    def on_title_scroll(first, last):
+        title_scrollbar.set(first, last)
+        if float(last) > 0.9:  # Near the end of what is loaded: fetch the next page
+            load_more_titles()
+
+    title_listbox.config(yscrollcommand=on_title_scroll)
+
+    # Search box: full-text search over titles, descriptions, locations, references and tags of every folder
+    tk.Label(
+        root,
+        text="Or search all folders:",
+        font=config.FONT_BOLD,
+        bg=config.BG_COLOR,
+        fg=config.TEXT_COLOR
+    ).pack(pady=10)
+
+    search_frame = tk.Frame(root, bg=config.BG_COLOR)
+    search_frame.pack(pady=10)
+
+    search_entry = tk.Entry(search_frame, font=config.FONT, bg=config.ENTRY_COLOR, fg=config.TEXT_COLOR, width=22)
+    search_entry.pack(side="left", padx=5)
+
+    def run_search(event=None):
+        """Fill the title listbox with the best matches for the search box text."""
+        text = search_entry.get().strip()
+        if not text:
+            return
+
+        def show_results(results):
+            if results is None:
+                messagebox.showwarning(
+                    "Search Unavailable",
+                    "The search index has not been built yet. Run: python -m database_operations.Reindex"
+                )
+                return
+            fill_titles(title for folder, title, score in results)
+            if not results:
+                messagebox.showinfo("No Results", f"Nothing matches: {text}")
+
+        folder_listbox.selection_clear(0, "end")
+        title_listbox.delete(0, "end")
+        title_channel.submit(search_catalog, text, on_done=show_results, message=f"Searching for {text}…")
+
+    search_entry.bind("<Return>", run_search)
+
+    tk.Button(
+        search_frame,
+        text="Find",
+        command=run_search,
+        font=config.FONT,
+        bg=config.BUTTON_COLOR,
+        fg="white"
+    ).pack(side="left", padx=5)
+
+    # Populate folder listbox with folder names (fetched in the background; the window shows up immediately)
+    def fill_folders(folders):
+        for folder in folders:
+            folder_listbox.insert("end", folder)
+
+    folder_channel.submit(get_folders, on_done=fill_folders, message="Loading folders…")
 
     def update_titles(event):
         """Update the titles listbox based on the selected folder."""
-        try:
-            # Check if a folder is selected
-            if not folder_listbox.curselection():
-                return  # Exit the function if no folder is selected
+        # Check if a folder is selected
+        if not folder_listbox.curselection():
+            return  # Exit the function if no folder is selected
 
-            # Get the selected folder
-            selected_folder = folder_listbox.get(folder_listbox.curselection())
+        # Get the selected folder
+        selected_folder = folder_listbox.get(folder_listbox.curselection())
 
-            # Fetch titles from the selected folder
-            titles = get_titles_in_folder(selected_folder)
+        # Clear the title listbox, then fetch the first page of the selected folder; a quicker click on another folder wins
+        filter_entry.delete(0, "end")
+        show_folder_titles(selected_folder)
 
-            # Clear the title listbox
-            title_listbox.delete(0, "end")
+    def show_folder_titles(folder):
+        title_listbox.delete(0, "end")
+        title_channel.cancel()
+        paging.update(folder=folder, last_title="", exhausted=False)
+        load_more_titles()
 
-            # Populate the title listbox with titles from the selected folder
-            for title in titles:
-                title_listbox.insert("end", title)
+    folder_listbox.bind("<<ListboxSelect>>", update_titles)
 
-        except Exception as e:
-            print(f"Error updating titles: {e}")  # Debugging purpose, can be removed in production
+    def filter_titles(event=None):
+        """Show the titles (of the selected folder, or of every folder) that start with the filter text."""
+        prefix = filter_entry.get().strip()
+        if not prefix:
+            if paging["folder"]:
+                show_folder_titles(paging["folder"])
+            else:
+                fill_titles([])
+            return
+        # In-memory bisect over the sorted titles: fast enough to run on every keystroke
+        titles = Catalog.title_index.with_prefix(None, prefix, paging["folder"], TITLE_PAGE_SIZE)
+        if titles is not None:
+            title_channel.cancel()
+            fill_titles(titles)
+        else:
+            # First use: the index is built once in the background, later keystrokes are answered from memory
+            title_channel.submit(filter_title_prefix, prefix, paging["folder"], on_done=fill_titles,
+                                 message="Indexing titles…")
 
-    folder_listbox.bind("<<ListboxSelect>>", update_titles)
+    filter_entry.bind("<KeyRelease>", filter_titles)
 
     def on_search():
         """Fetch data for the selected title and open the next window."""
-        try:
-            # Validate title selection
-            if not title_listbox.curselection():
-                messagebox.showwarning("Selection Error", "Please select a title.")
-                return
+        # Validate title selection
+        if not title_listbox.curselection():
+            messagebox.showwarning("Selection Error", "Please select a title.")
+            return
 
-            # Get the selected title
-            selected_title = title_listbox.get(title_listbox.curselection())
-
-            # Fetch data for the selected title
-            data, table = fetch_data_for_title_dynamic(selected_title)
+        # Get the selected title
+        selected_title = title_listbox.get(title_listbox.curselection())
 
+        def show_data(result):
+            data, table = result
             if data:
-                open_what_to_do(data, selected_title)  # Pass the data and title to the next window
+                open_what_to_do(data, selected_title, table)  # Pass the data and title to the next window
             else:
                 messagebox.showinfo("No Data Found", f"No data found for the title: {selected_title}")
 
-        except Exception as e:
-            messagebox.showerror("Error", f"An unexpected error occurred: {e}")
+        # Fetch data for the selected title
+        data_channel.submit(Catalog.fetch_artifact, selected_title, on_done=show_data,
+                            message=f"Loading {selected_title}…")
 
     # Search button
     tk.Button(
@@ -461,57 +535,44 @@ def open_select_window():
     root.mainloop()
 
 
+# The three helpers below run on Background worker threads: they raise instead of opening message boxes,
+# and the window that submitted them reports the error on the Tk thread.
+
+@metrics.timed("db.get_folders")
 def get_folders():
     """Fetch all folder (table) names dynamically."""
     if not config.mysql_username or not config.mysql_password:
-        messagebox.showerror("Login Error", "MySQL credentials are not set. Please log in first.")
-        return []  # Return an empty list if credentials are not set
+        raise ValueError("MySQL credentials are not set. Please log in first.")
+    with Connection.cursor() as cursor:
+        return Catalog.list_folders(cursor)
 
-    try:
-        connection = mysql.connector.connect(
-            host="localhost",
-            user=config.mysql_username,
-            password=config.mysql_password,
-            database="museum"
-        )
-        cursor = connection.cursor()
-        cursor.execute("""
-        SELECT TABLE_NAME 
-        FROM INFORMATION_SCHEMA.TABLES 
-        WHERE TABLE_SCHEMA = 'museum'
-        """)
-        return [row[0] for row in cursor.fetchall()]
-    except mysql.connector.Error as err:
-        messagebox.showerror("Database Error", f"Error fetching folders: {err}")
-        return []
-    finally:
-        if connection.is_connected():
-            cursor.close()
-            connection.close()
 
+@metrics.timed("db.search_catalog")
+def search_catalog(text):
+    """Return ranked (folder, title, score) results for a full-text search across all folders (None if not indexed)."""
+    with Connection.cursor() as cursor:
+        if not Search.enabled(cursor):
+            return None
+    return Search.search(text)
 
-def get_titles_in_folder(folder):
-    """Fetch all titles from a specific folder (table)."""
-    try:
-        connection = mysql.connector.connect(
-            host="localhost",
-            user=config.mysql_username,
-            password=config.mysql_password,
-            database="museum"
-        )
-        cursor = connection.cursor()
-        cursor.execute(f"SELECT title FROM `{folder}`")
-        return [row[0] for row in cursor.fetchall()]
-    except mysql.connector.Error as err:
-        messagebox.showerror("Database Error", f"Error fetching titles from {folder}: {err}")
-        return []
-    finally:
-        if connection.is_connected():
-            cursor.close()
-            connection.close()
+
+@metrics.timed("db.filter_title_prefix")
+def filter_title_prefix(prefix, folder=None):
+    """Return the titles starting with `prefix`, from one folder or (folder None) from every folder."""
+    titles = Catalog.title_index.with_prefix(None, prefix, folder, TITLE_PAGE_SIZE)  # No database access needed
+    if titles is not None:
+        return titles
+    with Connection.cursor() as cursor:
+        return Catalog.title_index.with_prefix(cursor, prefix, folder, TITLE_PAGE_SIZE)
+
+
+@metrics.timed("db.get_title_page")
+def get_title_page(folder, after=""):
+    """Fetch the next page of titles from a specific folder (table), after the last title already shown."""
+    return Catalog.title_page(folder, after, TITLE_PAGE_SIZE)
 
 
-def open_what_to_do(data, title):
+def open_what_to_do(data, title, table=None):
     """Open a window to display options for the selected title."""
     what_to_do_window = Toplevel()
     what_to_do_window.title("What to Do Next")
@@ -537,7 +598,7 @@ def open_what_to_do(data, title):
         activeforeground="white",
         padx=10,
         pady=5,
-        command=lambda: open_modify_delete_window(title)
+        command=lambda: open_modify_delete_window(title, data, table)
     ).pack(pady=10)
 
     # Generate HTML/QR Button
@@ -555,9 +616,8 @@ def open_what_to_do(data, title):
     ).pack(pady=10)
 
 
-def open_modify_delete_window(title):
-    """Open a window for modifying or deleting the selected entry."""
-    data, table = fetch_data_for_title_dynamic(title)
+def _entry_fields(data):
+    """Return the (description, references, location, size, tags, image_titles) of a fetched entry for the entry forms."""
     description = data.get("description") if data else ""  # Default to an empty string if no description
     references = [
         data.get(f"reference_{i}") for i in range(1, 11)
@@ -565,14 +625,12 @@ def open_modify_delete_window(title):
     ]
     location = data.get("location") if data else ""
 
-
-    # Extract size components
-    length = data.get("length", "")  # Use the database column names
-    width = data.get("width", "")
-    height = data.get("hight", "")  # Assuming "hight" is the column name
-
-    # Format size as a dictionary
-    size = {"length": length, "width": width, "height": height}
+    # Extract size components, formatted as a dictionary
+    size = {
+        "length": data.get("length", "") if data else "",  # Use the database column names
+        "width": data.get("width", "") if data else "",
+        "height": data.get("hight", "") if data else "",  # Assuming "hight" is the column name
+    }
 
     # Extract tags
     tags = [
@@ -580,6 +638,18 @@ def open_modify_delete_window(title):
         if data and data.get(f"tag_{i}")  # Only include non-empty tags
     ]
 
+    # Stored image names are kept: saving the modified entry replaces its row
+    image_titles = [data.get(column) for column in Catalog.IMAGE_COLUMNS if data and data.get(column)]
+    return description, references, location, size, tags, image_titles
+
+
+def open_modify_delete_window(title, data=None, table=None):
+    """Open a window for modifying or deleting the selected entry (`table` is the folder holding it).
+
+    Without `data` the entry is fetched in the background first; the buttons are enabled once it has arrived.
+    """
+    entry = {"data": data, "table": table}
+
     # Create Modify/Delete window
     modify_delete_window = Toplevel()
     modify_delete_window.title("Modify/Delete Entry")
@@ -594,8 +664,14 @@ def open_modify_delete_window(title):
         bg=config.BG_COLOR
     ).pack(pady=10)
 
+    def modify():
+        description, references, location, size, tags, image_titles = _entry_fields(entry["data"])
+        Database.send_to_db_window(title, description, references, location, size, tags, image_titles,
+                                   original=(entry["table"], title) if entry["table"] else None)  # Pass title, description, and references
+        modify_delete_window.destroy()
+
     # Modify Button
-    tk.Button(
+    modify_button = tk.Button(
         modify_delete_window,
         text="Modify Entry",
         font=config.FONT_BOLD,
@@ -605,14 +681,12 @@ def open_modify_delete_window(title):
         activeforeground="white",
         padx=10,
         pady=5,
-        command=lambda: [
-            Database.send_to_db_window(title, description, references, location, size, tags),
-            modify_delete_window.destroy(),
-        ]  # Pass title, description, and references
-    ).pack(pady=10)
+        command=modify
+    )
+    modify_button.pack(pady=10)
 
     # Delete Button
-    tk.Button(
+    delete_button = tk.Button(
         modify_delete_window,
         text="Delete Entry",
         font=config.FONT_BOLD,
@@ -623,98 +697,41 @@ def open_modify_delete_window(title):
         padx=10,
         pady=5,
         command=lambda: confirm_delete(title, modify_delete_window)
-    ).pack(pady=10)
+    )
+    delete_button.pack(pady=10)
 
+    if data is None:
+        status_label = tk.Label(modify_delete_window, text="", font=config.FONT_TEXT, bg=config.BG_COLOR,
+                                fg=config.TEXT_COLOR)
+        status_label.pack()
+        fetch_channel = Background.Channel(modify_delete_window, status_label, controls=(modify_button, delete_button))
 
+        def fetched(result):
+            entry["data"], entry["table"] = result
+            if not entry["data"]:
+                messagebox.showinfo("No Data Found", f"No data found for the title: {title}")
+                modify_delete_window.destroy()
+
+        fetch_channel.submit(fetch_data_for_title_dynamic, title, on_done=fetched, message=f"Loading {title}…")
+
+
+@metrics.timed("db.get_titles")
 def get_titles():
     """Fetch all titles dynamically from all tables with a 'title' column."""
     try:
-        connection = mysql.connector.connect(
-            host="localhost",
-            user=config.mysql_username,
-            password=config.mysql_password,
-            database="museum"
-        )
-        cursor = connection.cursor()
-
-        # Find all tables with a 'title' column
-        cursor.execute("""
-        SELECT TABLE_NAME 
-        FROM INFORMATION_SCHEMA.COLUMNS 
-        WHERE TABLE_SCHEMA = 'museum' AND COLUMN_NAME = 'title'
-        """)
-        tables = [row[0] for row in cursor.fetchall()]
-
-        # Retrieve all titles from those tables
-        titles = []
-        for table in tables:
-            cursor.execute(f"SELECT title FROM `{table}`")
-            titles.extend([row[0] for row in cursor.fetchall()])
-
-        return titles
+        return Catalog.all_titles()
     except mysql.connector.Error as err:
         messagebox.showerror("Database Error", f"Error fetching titles: {err}")
         return []
-    finally:
-        if connection.is_connected():
-            cursor.close()
-            connection.close()
 
 
+@metrics.timed("db.fetch_data_for_title")
 def fetch_data_for_title_dynamic(title):
-    """Fetch detailed information (title, description, images, references, location, size, tags) for a given title from any table dynamically."""
-    try:
-        connection = mysql.connector.connect(
-            host="localhost",
-            user=config.mysql_username,
-            password=config.mysql_password,
-            database="museum"
-        )
-        cursor = connection.cursor()
-
-        # Find all tables with a 'title' column
-        cursor.execute("""
-        SELECT TABLE_NAME 
-        FROM INFORMATION_SCHEMA.COLUMNS 
-        WHERE TABLE_SCHEMA = 'museum' AND COLUMN_NAME = 'title'
-        """)
-        tables = [row[0] for row in cursor.fetchall()]
-
-        # Search for the title in each table
-        for table in tables:
-            query = f"""
-            SELECT title, description, 
-                   img_1, img_2, img_3, img_4, img_5, 
-                   reference_1, reference_2, reference_3, reference_4, reference_6, reference_7, reference_8, reference_9, reference_10,
-                   location, 
-                   hight, width, length, 
-                   tag_1, tag_2, tag_3, tag_4, tag_5, tag_6, tag_7, tag_8, tag_9, tag_10, tag_11, tag_12, tag_13, tag_14, tag_15
-            FROM `{table}`
-            WHERE title = %s
-            """
-            cursor.execute(query, (title,))
-            result = cursor.fetchone()
-            if result:
-                # Build a detailed dictionary of the result
-                columns = [
-                    "title", "description",
-                    "img_1", "img_2", "img_3", "img_4", "img_5",
-                    "reference_1", "reference_2", "reference_3", "reference_4", "reference_6", "reference_7", "reference_8", "reference_9", "reference_10",
-                    "location",
-                    "hight", "width", "length",
-                    "tag_1", "tag_2", "tag_3", "tag_4", "tag_5", "tag_6", "tag_7", "tag_8", "tag_9", "tag_10",
-                    "tag_11", "tag_12", "tag_13", "tag_14", "tag_15"
-                ]
-                detailed_info = dict(zip(columns, result))
-                return detailed_info, table  # Return detailed info and table name
-        return None, None  # No matching title found
-    except mysql.connector.Error as err:
-        messagebox.showerror("Database Error", f"Error fetching data: {err}")
-        return None, None
-    finally:
-        if connection.is_connected():
-            cursor.close()
-            connection.close()
+    """Fetch detailed information (title, description, images, references, location, size, tags) for a given title from any table dynamically.
+
+    Runs on a Background worker: returns (data, table), (None, None) if not found, and raises on database errors.
+    """
+    return Catalog.fetch_artifact(title)  # One indexed lookup instead of a query per folder table
 
 
 def mysql_login_window():
@@ -795,8 +812,14 @@ def mysql_login_window():
     # Bind key events to update the Caps Lock indicator
     login_window.bind("<KeyPress>", update_capslock_indicator)
 
+    # Shows that the credentials are being checked
+    status_label = tk.Label(login_window, text="", font=config.FONT_TEXT, bg=config.BG_COLOR, fg=config.TEXT_COLOR)
+    login_channel = Background.Channel(login_window, status_label)
+
     def submit_credentials():
-        """Retrieve credentials, validate them, and handle errors."""
+        """Retrieve credentials, validate them in the background, and handle errors."""
+        if login_channel.busy():
+            return
         config.mysql_username = username_entry.get()
         config.mysql_password = password_entry.get()
 
@@ -804,31 +827,36 @@ def mysql_login_window():
             messagebox.showwarning("Input Error", "Both username and password are required!")
             return  # Exit without proceeding further
 
-        # Try to connect to MySQL with the provided credentials
-        try:
-            connection = mysql.connector.connect(
-                host="localhost",  # Update this if the MySQL server is on another host
-                user=config.mysql_username,
-                password=config.mysql_password
-            )
-            connection.close()  # Close connection if successful
+        def logged_in(_):
+            # Folder tables from before the title index get it once, in the background (title paging needs it)
+            Background.executor().submit(add_title_indexes)
             login_window.destroy()  # Close the login window
             open_main_menu_window()  # Proceed to the main menu window
-        except mysql.connector.Error as err:
-            messagebox.showerror("Login Failed", f"Invalid credentials: {err}")
+
+        def failed(err):
+            if isinstance(err, mysql.connector.Error):
+                messagebox.showerror("Login Failed", f"Invalid credentials: {err}")
+            else:
+                Background.show_error(err)
             # Do not close the login window or proceed to the main menu
 
+        # Try to connect to MySQL with the provided credentials; the connection stays in the shared pool
+        login_channel.submit(Connection.check_credentials, on_done=logged_in, on_error=failed, message="Logging in…")
+
     # Bind Enter key to the submit_credentials function
     login_window.bind("<Return>", lambda event: submit_credentials())
     # Submit button
-    tk.Button(
+    login_button = tk.Button(
         login_window,
         text="Login",
         font=config.FONT_BOLD,
         bg=config.BUTTON_COLOR,
         fg="white",
         command=submit_credentials
-    ).pack(pady=20)
+    )
+    login_button.pack(pady=20)
+    status_label.pack()
+    login_channel.controls.append(login_button)  # Disabled while the credentials are checked
 
     login_window.mainloop()
 
@@ -889,16 +917,30 @@ def open_main_menu_window():
     main_menu_window.mainloop()
 
 
+def add_title_indexes():
+    """Add the missing title indexes (runs on a Background worker after login; failures are only logged)."""
+    try:
+        Catalog.ensure_title_indexes()
+    except mysql.connector.Error as err:
+        print(f"Could not check the title indexes: {err}")
+
+
+@metrics.timed("db.delete_entry")
 def delete_entry(title):
-    """Delete the entry from the database or file system."""
+    """Delete the entry from the database; returns the folder it was deleted from, or None (raises on errors).
 
-    print(f"Entry '{title}' deleted.")  # Log the action for debugging
+    Runs on a Background worker: resolving the title may rebuild the title index.
+    """
+    table = Catalog.delete_title(title)
+    print(f"Entry '{title}' deleted from {table}." if table else f"Entry '{title}' was not found.")  # Log the action for debugging
+    return table
 
 
+@metrics.timed("db.create_folder")
 def create_folder(folder_name):
+    """Create said folder in MySQL (raises on invalid names or database errors)."""
+    Catalog.create_folder(folder_name)
     print(f"I created a folder with name: {folder_name}")
-    #todo
-    #create said folder in MySQL
 
 
 if __name__ == "__main__":
@@ -0,0 +1,76 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+import segno
+from PIL import Image
+
+import config
+import metrics
+from html_operations import Output
+
+
+class QRCache:
+    """Content-addressed QR code cache.
+
+    Encoded outputs (PNG/SVG bytes) are stored on disk under a hash of the payload and render parameters,
+    so they are produced once per artifact. Display-sized images are also kept in a small in-memory LRU,
+    which makes reopening a QR window free.
+    """
+
+    def __init__(self, directory, max_images=64):
+        self.directory = directory
+        self.max_images = max_images
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(payload, kind, **params):
+        encoded = json.dumps([payload, kind, params], sort_keys=True)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def _path(self, key, kind):
+        return os.path.join(self.directory, key[:2], f"{key}.{kind}")
+
+    def encoded(self, payload, kind="png", scale=10):
+        """Return the QR code for `payload` as PNG or SVG bytes, rendering and storing it on first use."""
+        path = self._path(self.key(payload, kind, scale=scale), kind)
+        try:
+            with open(path, "rb") as file:
+                return file.read()
+        except FileNotFoundError:
+            pass
+
+        buffer = BytesIO()
+        with metrics.timer(f"qr.segno_{kind}"):
+            segno.make(payload).save(buffer, kind=kind, scale=scale)
+        data = buffer.getvalue()
+        try:
+            Output.write_if_changed(path, [data])
+        except OSError as err:
+            print(f"Could not cache QR code in {self.directory}: {err}")  # Caching is best effort
+        return data
+
+    def display_image(self, payload, size=200):
+        """Return a `size` x `size` PIL image of the QR code for `payload`, from the in-memory LRU if possible."""
+        key = self.key(payload, "display", size=size)
+        with self._lock:
+            if key in self._images:
+                self._images.move_to_end(key)
+                return self._images[key]
+
+        with metrics.timer("qr.display_image"):
+            image = Image.open(BytesIO(self.encoded(payload)))
+            image = image.resize((size, size), Image.Resampling.LANCZOS)  # Resize for display
+
+        with self._lock:
+            self._images[key] = image
+            while len(self._images) > self.max_images:
+                self._images.popitem(last=False)
+        return image
+
+
+qr_cache = QRCache(config.qr_cache_dir)
@@ -0,0 +1,279 @@
+import hashlib
+import os
+import re
+import string
+from html import escape
+
+from database_operations import Catalog
+
+# Bump whenever the page markup changes so incremental builds re-render every page
+TEMPLATE_VERSION = 4
+
+# Shared stylesheet, written once at the site root (or next to a page saved on its own)
+STYLESHEET_NAME = "museum.css"
+STYLESHEET_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", STYLESHEET_NAME)
+SEARCH_SCRIPT_NAME = "search.js"
+SEARCH_SCRIPT_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", SEARCH_SCRIPT_NAME)
+
+# Image derivatives are published in this directory of the site root, next to the folder directories
+IMAGES_DIRNAME = "images"
+# Rendered image width: the full column on phones, capped on larger screens (matches .image img in museum.css)
+IMAGE_SIZES = "(max-width: 680px) calc(100vw - 40px), 640px"
+
+# Folder index (gallery) pages list this many artifacts each
+INDEX_PAGE_SIZE = 60
+
+
+def _values(data, columns):
+    """Return the non-empty values of `columns` in order."""
+    return [data.get(column) for column in columns if data.get(column)]
+
+
+def page_filename(title):
+    """Return a stable, URL-safe file name for an artifact page (a short digest keeps similar titles apart)."""
+    slug = re.sub(r"[^a-z0-9]+", "-", str(title).lower()).strip("-")[:60] or "artifact"
+    digest = hashlib.sha1(str(title).encode("utf-8")).hexdigest()[:6]
+    return f"{slug}-{digest}.html"
+
+
+def qr_filename(title):
+    """Return the file name of an artifact's QR code image, next to its page."""
+    return page_filename(title)[:-len(".html")] + ".png"
+
+
+def folder_dirname(folder):
+    """Return the output directory name for a folder table."""
+    return re.sub(r"[^A-Za-z0-9_-]+", "-", str(folder)).strip("-") or "folder"
+
+
+def page_path(folder, title):
+    """Return an artifact page's path relative to the site root."""
+    return f"{folder_dirname(folder)}/{page_filename(title)}"
+
+
+def index_filename(page_number):
+    """Return the file name of a folder's gallery page; the first one is the directory index."""
+    return "index.html" if page_number == 1 else f"index-{page_number}.html"
+
+
+def page_url(base_url, folder, title):
+    """Return the public URL of an artifact page."""
+    return f"{base_url.rstrip('/')}/{page_path(folder, title)}"
+
+
+class Template:
+    """A template parsed once into literal chunks and field names; rendering only interleaves escaped values."""
+
+    def __init__(self, source):
+        self.parts = [(literal, field) for literal, field, _, _ in string.Formatter().parse(source)]
+
+    def iter(self, **values):
+        for literal, field in self.parts:
+            if literal:
+                yield literal
+            if field is not None:
+                yield escape(str(values[field]))
+
+
+PAGE_HEAD = Template(
+    '<!DOCTYPE html>\n'
+    '<html lang="en">\n'
+    '<head>\n'
+    '<meta charset="UTF-8">\n'
+    '<meta name="viewport" content="width=device-width, initial-scale=1.0">\n'
+    '<title>{title}</title>\n'
+    '<link rel="stylesheet" href="{stylesheet}">\n'
+    '</head>\n'
+    '<body>\n'
+    '<h1>{title}</h1>\n'
+)
+PAGE_FOOT = Template('</body>\n</html>\n')
+BACK_LINK = Template('<p class="nav"><a href="{href}">{label}</a></p>\n')
+GALLERY_OPEN = Template('<ul class="gallery">\n')
+GALLERY_CLOSE = Template('</ul>\n')
+GALLERY_ITEM = Template('<li><a href="{href}"><span>{title}</span></a></li>\n')
+GALLERY_THUMBNAIL = Template(
+    '<li><a href="{href}"><picture>'
+    '<source type="image/webp" srcset="{webp}">'
+    '<img src="{jpeg}" width="{width}" height="{height}" alt="" loading="lazy" decoding="async">'
+    '</picture><span>{title}</span></a></li>\n'
+)
+NAV_OPEN = Template('<nav class="pager">\n')
+NAV_LINK = Template('<a href="{href}" rel="{rel}">{label}</a>\n')
+NAV_PAGE = Template('<span>Page {number}</span>\n')
+NAV_CLOSE = Template('</nav>\n')
+SEARCH_FORM = Template(
+    '<input id="search-input" type="search" placeholder="Search titles, tags and locations" autofocus>\n'
+    '<ul id="search-results"></ul>\n'
+    '<script src="{script}" data-root="" defer></script>\n'
+)
+SECTION_OPEN = Template('<div class="section">\n<h2>{heading}</h2>\n')
+SECTION_CLOSE = Template('</div>\n')
+PARAGRAPH = Template('<p>{text}</p>\n')
+IMAGE = Template('<div class="image"><p>{image}</p></div>\n')
+PICTURE = Template(
+    '<div class="image"><picture>\n'
+    '<source type="image/webp" srcset="{webp_srcset}" sizes="{sizes}">\n'
+    '<img src="{src}" srcset="{jpeg_srcset}" sizes="{sizes}" width="{width}" height="{height}" alt="{alt}" '
+    'loading="lazy" decoding="async">\n'
+    '</picture></div>\n'
+)
+BIBLIO_OPEN = Template('<div class="biblio">\n<ul>\n')
+BIBLIO_ITEM = Template('<li>{reference}</li>\n')
+BIBLIO_CLOSE = Template('</ul>\n</div>\n')
+TAGS = Template('<div class="tags">{tags}</div>\n')
+
+
+def stylesheet_text():
+    """Return the shared stylesheet linked from every page."""
+    with open(STYLESHEET_SOURCE, encoding="utf-8") as file:
+        return file.read()
+
+
+def search_script_text():
+    """Return the client-side search script used by search.html."""
+    with open(SEARCH_SCRIPT_SOURCE, encoding="utf-8") as file:
+        return file.read()
+
+
+def image_filename(derivative_path):
+    """Return the published file name of a derivative (its store path is derived/<name>)."""
+    return derivative_path.rsplit("/", 1)[-1]
+
+
+def _picture(info, alt, image_base):
+    """Yield a responsive <picture> for a stored image: WebP with a JPEG fallback, every width in the srcset."""
+    derivatives = info["derivatives"]
+    largest = derivatives[-1]
+    # The middle width is a sensible src for browsers without srcset support
+    fallback = derivatives[len(derivatives) // 2]
+    yield from PICTURE.iter(
+        webp_srcset=", ".join(f"{image_base}{image_filename(d['webp'])} {d['width']}w" for d in derivatives),
+        jpeg_srcset=", ".join(f"{image_base}{image_filename(d['jpeg'])} {d['width']}w" for d in derivatives),
+        sizes=IMAGE_SIZES,
+        src=f"{image_base}{image_filename(fallback['jpeg'])}",
+        width=largest["width"],  # Intrinsic size reserves the space before the file arrives: no layout shift
+        height=largest["height"],
+        alt=alt,
+    )
+
+
+def _text_section(heading, text):
+    yield from SECTION_OPEN.iter(heading=heading)
+    yield from PARAGRAPH.iter(text=text)
+    yield from SECTION_CLOSE.iter()
+
+
+def iter_page(data, title, stylesheet=STYLESHEET_NAME, images=None, image_base=f"../{IMAGES_DIRNAME}/",
+              folder=None):
+    """Render the HTML page for one artifact as a stream of chunks, ready to be written out as they come.
+
+    `images` maps stored image names to their Images.image_info; names without an entry are shown as text.
+    With `folder`, the page links back to the folder's gallery (published sites only).
+    """
+    images = images or {}
+    description = data.get("description")
+    location = data.get("location")
+    size = ", ".join(
+        f"{label}: {data.get(column)}"
+        for label, column in (("H", "hight"), ("W", "width"), ("L", "length"))
+        if data.get(column)
+    )
+    image_titles = _values(data, Catalog.IMAGE_COLUMNS)
+    biblio_ref = _values(data, Catalog.REFERENCE_COLUMNS)
+    tags = _values(data, Catalog.TAG_COLUMNS)
+
+    yield from PAGE_HEAD.iter(title=title, stylesheet=stylesheet)
+    if folder:
+        yield from BACK_LINK.iter(href=index_filename(1), label=f"All of {folder}")
+
+    # Add sections conditionally
+    if description:
+        yield from _text_section("Description", description)
+
+    if image_titles:
+        yield from SECTION_OPEN.iter(heading="Images")
+        for number, img in enumerate(image_titles, start=1):
+            if img in images and images[img]["derivatives"]:
+                yield from _picture(images[img], f"{title} ({number})", image_base)
+            else:
+                yield from IMAGE.iter(image=img)
+        yield from SECTION_CLOSE.iter()
+
+    if biblio_ref:
+        yield from SECTION_OPEN.iter(heading="Bibliographic References")
+        yield from BIBLIO_OPEN.iter()
+        for ref in biblio_ref:
+            yield from BIBLIO_ITEM.iter(reference=ref)
+        yield from BIBLIO_CLOSE.iter()
+        yield from SECTION_CLOSE.iter()
+
+    if location:
+        yield from _text_section("Location", location)
+
+    if size:
+        yield from _text_section("Size", size)
+
+    if tags:
+        yield from SECTION_OPEN.iter(heading="Tags")
+        yield from TAGS.iter(tags=", ".join(tags))
+        yield from SECTION_CLOSE.iter()
+
+    yield from PAGE_FOOT.iter()
+
+
+def iter_index_page(folder, page_number, entries, images, has_next, stylesheet=f"../{STYLESHEET_NAME}",
+                    image_base=f"../{IMAGES_DIRNAME}/"):
+    """Render one gallery page of a folder: (title, image name) entries with thumbnails, and previous/next links."""
+    heading = folder if page_number == 1 else f"{folder} (page {page_number})"
+    yield from PAGE_HEAD.iter(title=heading, stylesheet=stylesheet)
+    yield from BACK_LINK.iter(href="../index.html", label="All folders")
+    yield from GALLERY_OPEN.iter()
+    for title, image in entries:
+        info = images.get(image)
+        if info and info["derivatives"]:
+            smallest = info["derivatives"][0]
+            yield from GALLERY_THUMBNAIL.iter(
+                href=page_filename(title),
+                webp=f"{image_base}{image_filename(smallest['webp'])}",
+                jpeg=f"{image_base}{image_filename(smallest['jpeg'])}",
+                width=smallest["width"],
+                height=smallest["height"],
+                title=title,
+            )
+        else:
+            yield from GALLERY_ITEM.iter(href=page_filename(title), title=title)
+    yield from GALLERY_CLOSE.iter()
+
+    yield from NAV_OPEN.iter()
+    if page_number > 1:
+        yield from NAV_LINK.iter(href=index_filename(page_number - 1), rel="prev", label="Previous")
+    yield from NAV_PAGE.iter(number=page_number)
+    if has_next:
+        yield from NAV_LINK.iter(href=index_filename(page_number + 1), rel="next", label="Next")
+    yield from NAV_CLOSE.iter()
+    yield from PAGE_FOOT.iter()
+
+
+def iter_site_index(folders, stylesheet=STYLESHEET_NAME):
+    """Render the site's home page: a link to the gallery of every folder."""
+    yield from PAGE_HEAD.iter(title="Collection", stylesheet=stylesheet)
+    yield from BACK_LINK.iter(href="search.html", label="Search the collection")
+    yield from GALLERY_OPEN.iter()
+    for folder in folders:
+        yield from GALLERY_ITEM.iter(href=f"{folder_dirname(folder)}/{index_filename(1)}", title=folder)
+    yield from GALLERY_CLOSE.iter()
+    yield from PAGE_FOOT.iter()
+
+
+def iter_search_page(stylesheet=STYLESHEET_NAME):
+    """Render the site's search page (results come from the static index, see SearchIndex)."""
+    yield from PAGE_HEAD.iter(title="Search", stylesheet=stylesheet)
+    yield from BACK_LINK.iter(href="index.html", label="All folders")
+    yield from SEARCH_FORM.iter(script=SEARCH_SCRIPT_NAME)
+    yield from PAGE_FOOT.iter()
+
+
+def render_page(data, title, stylesheet=STYLESHEET_NAME, images=None, image_base=f"../{IMAGES_DIRNAME}/"):
+    """Render the HTML page for one artifact from its fetched row."""
+    return "".join(iter_page(data, title, stylesheet, images, image_base))
@@ -0,0 +1,115 @@
+import json
+import os
+import re
+import unicodedata
+
+from database_operations import Catalog
+from database_operations import Connection
+from html_operations import Output
+from html_operations import Render
+
+# Written under <output root>/search/ and read by static/search.js
+SEARCH_DIRNAME = "search"
+SHARD_PREFIX_LENGTH = 2  # Tokens are first grouped by their first two characters...
+MAX_PREFIX_LENGTH = 4  # ...and a group that grows past SHARD_MAX_BYTES is split by longer prefixes, down to this
+SHARD_MAX_BYTES = 64 * 1024
+DOCS_PER_CHUNK = 500
+MIN_TOKEN_LENGTH = 2
+
+
+def tokens(text):
+    """Split text into lowercase ASCII search tokens (same rules as tokenize() in search.js)."""
+    text = unicodedata.normalize("NFKD", str(text).lower())
+    text = "".join(character for character in text if not unicodedata.combining(character))
+    return [token for token in re.split(r"[^a-z0-9]+", text) if len(token) >= MIN_TOKEN_LENGTH]
+
+
+def _document_tokens(data):
+    """Return the set of tokens an artifact is found by: its title, tags and location."""
+    found = set(tokens(data.get("title") or ""))
+    found.update(tokens(data.get("location") or ""))
+    for column in Catalog.TAG_COLUMNS:
+        if data.get(column):
+            found.update(tokens(data[column]))
+    return found
+
+
+def _encode(postings):
+    """Return the JSON of a shard: {token: delta-encoded sorted doc ids}. Small deltas compress very well."""
+    shard = {}
+    for token in sorted(postings):
+        previous = 0
+        deltas = []
+        for doc_id in postings[token]:  # Ids are assigned in order, so the lists are already sorted
+            deltas.append(doc_id - previous)
+            previous = doc_id
+        shard[token] = deltas
+    return json.dumps(shard, separators=(",", ":"))
+
+
+def _shards(postings, key):
+    """Yield (key, shard JSON), splitting groups larger than SHARD_MAX_BYTES by one more prefix character."""
+    encoded = _encode(postings)
+    if len(encoded) <= SHARD_MAX_BYTES or len(key) >= MAX_PREFIX_LENGTH:
+        yield key, encoded
+        return
+    # Tokens no longer than the key stay in the key's own shard; the others move one level down
+    own = {token: ids for token, ids in postings.items() if len(token) <= len(key)}
+    if own:
+        yield key, _encode(own)
+    groups = {}
+    for token, ids in postings.items():
+        if len(token) > len(key):
+            groups.setdefault(token[:len(key) + 1], {})[token] = ids
+    for sub_key in sorted(groups):
+        yield from _shards(groups[sub_key], sub_key)
+
+
+def build_search_index(output_root):
+    """Write the sharded search index of every artifact's title, tags and location. Returns the number of artifacts.
+
+    Document details are written in fixed-size chunks as they are read, so only the postings stay in memory.
+    """
+    directory = os.path.join(output_root, SEARCH_DIRNAME)
+    written = set()
+
+    def write(name, text):
+        Output.write_if_changed(os.path.join(directory, name), [text], compress=True)
+        written.add(name)
+
+    postings = {}
+    documents = []
+    doc_id = 0
+    with Connection.cursor() as cursor:
+        folders = Catalog.list_folders(cursor)
+    for folder in folders:
+        for data in Catalog.iter_folder_rows(folder):
+            for token in _document_tokens(data):
+                postings.setdefault(token, []).append(doc_id)
+            documents.append([data["title"], Render.page_path(folder, data["title"]), folder])
+            doc_id += 1
+            if len(documents) == DOCS_PER_CHUNK:
+                write(f"docs-{doc_id // DOCS_PER_CHUNK - 1}.json", json.dumps(documents, separators=(",", ":")))
+                documents = []
+    if documents:
+        write(f"docs-{doc_id // DOCS_PER_CHUNK}.json", json.dumps(documents, separators=(",", ":")))
+
+    groups = {}
+    for token, ids in postings.items():
+        groups.setdefault(token[:SHARD_PREFIX_LENGTH], {})[token] = ids
+    shard_keys = []
+    for key in sorted(groups):
+        for shard_key, encoded in _shards(groups[key], key):
+            write(f"shard-{shard_key}.json", encoded)
+            shard_keys.append(shard_key)
+
+    # Written last: clients never see a manifest that points at shards not written yet
+    manifest = {"documents": doc_id, "docs_per_chunk": DOCS_PER_CHUNK, "shards": shard_keys}
+    write("index.json", json.dumps(manifest, separators=(",", ":")))
+
+    # Shards and chunks of an earlier, bigger or differently split index
+    for name in os.listdir(directory):
+        base = name[:-3] if name.endswith(Output.COMPRESSED_SUFFIXES) else name
+        if base.endswith(".json") and base not in written:
+            os.remove(os.path.join(directory, name))
+    return doc_id
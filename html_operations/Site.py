@@ -0,0 +1,247 @@
+import argparse
+import os
+import shutil
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from io import BytesIO
+from itertools import islice
+
+import segno
+
+import config
+import metrics
+from database_operations import Catalog
+from database_operations import Connection
+from database_operations import Images
+from html_operations import Manifest
+from html_operations import Output
+from html_operations import Render
+from html_operations import SearchIndex
+
+
+def _copy_derivatives(output_root, image_store_root, info):
+    copied = 0
+    for derivative in info["derivatives"]:
+        for path in (derivative["webp"], derivative["jpeg"]):
+            target = os.path.join(output_root, Render.IMAGES_DIRNAME, Render.image_filename(path))
+            if os.path.exists(target):
+                continue
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            partial = f"{target}.{os.getpid()}.part"  # Workers may publish the same image concurrently
+            shutil.copyfile(os.path.join(image_store_root, path), partial)
+            os.chmod(partial, 0o644)
+            os.replace(partial, target)
+            copied += os.path.getsize(target)
+    return copied
+
+
+def publish_images(output_root, image_store_root, images):
+    """Copy the derivatives of `images` (name -> Images.image_info) into the site's images directory.
+
+    Derivative names embed the original's SHA-256 digest, so a file that is already published is never copied
+    again, however many pages show it. Missing derivatives are regenerated from the original; an image that
+    cannot be published is logged and removed from `images`, so its pages are rendered without it.
+    Returns the number of bytes copied.
+    """
+    copied = 0
+    for name, info in list(images.items()):
+        try:
+            copied += _copy_derivatives(output_root, image_store_root, info)
+        except FileNotFoundError:
+            try:
+                Images.make_derivatives(name, image_store_root, [derivative["width"] for derivative in info["derivatives"]])
+                copied += _copy_derivatives(output_root, image_store_root, info)
+                print(f"Regenerated the missing derivatives of image {name}")
+            except (OSError, ValueError) as err:  # Original missing or unreadable too
+                print(f"Image {name} left out: {err}")
+                del images[name]
+    return copied
+
+
+def _render_batch(output_root, base_url, image_store_root, folder, jobs):
+    """Worker: render pages (and QR codes) for a batch of artifacts of one folder.
+
+    `jobs` is a list of (key, input_hash, data, images, previous output digests). Returns one
+    (key, input_hash, outputs, bytes written) tuple per artifact, outputs mapping relative paths to digests,
+    and the worker's metrics for the parent to merge.
+    """
+    results = []
+    for key, input_hash, data, images, previous in jobs:
+        title = data["title"]
+        outputs = {}
+        written = publish_images(output_root, image_store_root, images)
+
+        relative = Render.page_path(folder, title)
+        changed, digest, size = Output.write_if_changed(
+            os.path.join(output_root, relative),
+            Render.iter_page(data, title, stylesheet=f"../{Render.STYLESHEET_NAME}", images=images, folder=folder),
+            previous.get(relative),
+            compress=True  # .gz/.br siblings, only re-compressed when the page changed
+        )
+        outputs[relative] = digest
+        written += size if changed else 0
+
+        if base_url:
+            buffer = BytesIO()
+            with metrics.timer("qr.segno_png"):
+                segno.make(Render.page_url(base_url, folder, title)).save(buffer, kind="png", scale=10)
+            relative = f"{Render.folder_dirname(folder)}/{Render.qr_filename(title)}"
+            changed, digest, size = Output.write_if_changed(
+                os.path.join(output_root, relative), [buffer.getvalue()], previous.get(relative)
+            )
+            outputs[relative] = digest
+            written += size if changed else 0
+
+        results.append((key, input_hash, outputs, written))
+    return results, metrics.drain()
+
+
+def build_folder_index(output_root, folder, page_size=Render.INDEX_PAGE_SIZE):
+    """Write a folder's gallery pages with keyset pagination: one page of rows in memory at a time.
+
+    Unchanged pages are left untouched (write_if_changed). Returns the number of pages.
+    """
+    directory = os.path.join(output_root, Render.folder_dirname(folder))
+    after = ""
+    page_number = 0
+    while True:
+        rows = Catalog.thumbnail_page(folder, after, page_size + 1)  # One extra row tells whether there is a next page
+        entries = rows[:page_size]
+        page_number += 1
+        with Connection.cursor() as cursor:
+            images = Images.image_info(cursor, [image for _, image in entries])
+        publish_images(output_root, config.image_store_root, images)
+        Output.write_if_changed(
+            os.path.join(directory, Render.index_filename(page_number)),
+            Render.iter_index_page(folder, page_number, entries, images, len(rows) > page_size),
+            compress=True
+        )
+        if len(rows) <= page_size:
+            break
+        after = entries[-1][0]
+
+    # Remove the pages left over from when the folder was bigger
+    stale = page_number + 1
+    while os.path.exists(os.path.join(directory, Render.index_filename(stale))):
+        for suffix in ("",) + Output.COMPRESSED_SUFFIXES:
+            try:
+                os.remove(os.path.join(directory, Render.index_filename(stale)) + suffix)
+            except FileNotFoundError:
+                pass
+        stale += 1
+    return page_number
+
+
+def build_indexes(output_root):
+    """Write the site home page and the gallery pages of every folder. Returns the number of gallery pages."""
+    with Connection.cursor() as cursor:
+        folders = Catalog.list_folders(cursor)
+    Output.write_if_changed(os.path.join(output_root, "index.html"), Render.iter_site_index(folders), compress=True)
+    return sum(build_folder_index(output_root, folder) for folder in folders)
+
+
+def _image_info(rows):
+    """Fetch the stored image info of every image shown by a chunk of rows, with one query."""
+    names = [row.get(column) for row in rows for column in Catalog.IMAGE_COLUMNS]
+    with Connection.cursor() as cursor:
+        return Images.image_info(cursor, names)
+
+
+def iter_batches(manifest, base_url, batch_size):
+    """Yield (folder, jobs) batches for every artifact whose inputs changed since the last build."""
+    with Connection.cursor() as cursor:
+        folders = Catalog.list_folders(cursor)
+    for folder in folders:
+        batch = []
+        rows = Catalog.iter_folder_rows(folder, batch_size)
+        while True:
+            chunk = list(islice(rows, batch_size))
+            if not chunk:
+                break
+            images = _image_info(chunk)
+            for data in chunk:
+                key = f"{folder}/{data['title']}"
+                page_images = {
+                    data[column]: images[data[column]] for column in Catalog.IMAGE_COLUMNS if data.get(column) in images
+                }
+                # The image info is part of the inputs: regenerated derivatives re-render the pages showing them
+                input_hash = Manifest.fingerprint(Render.TEMPLATE_VERSION, base_url, data, page_images)
+                if manifest.is_current(key, input_hash):
+                    continue
+                batch.append((key, input_hash, data, page_images, manifest.output_digests(key)))
+                if len(batch) >= batch_size:
+                    yield folder, batch
+                    batch = []
+        if batch:
+            yield folder, batch
+
+
+def build_site(output_root, base_url=None, workers=None, batch_size=200, progress_every=5.0):
+    """Render every changed artifact page of the catalog into `output_root` using a process pool."""
+    os.makedirs(output_root, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = workers * 2  # Bounded queue keeps memory flat however big the catalog is
+    manifest = Manifest.Manifest(output_root)
+    Output.write_if_changed(os.path.join(output_root, Render.STYLESHEET_NAME), [Render.stylesheet_text()], compress=True)
+
+    pages = 0
+    total_bytes = 0
+    started = time.perf_counter()
+    last_report = started
+
+    def collect(future):
+        nonlocal pages, total_bytes
+        results, worker_metrics = future.result()
+        metrics.merge(worker_metrics)
+        for key, input_hash, outputs, written in results:
+            manifest.record(key, input_hash, outputs)
+            pages += 1
+            total_bytes += written
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=metrics.collect_only) as executor:
+        in_flight = set()
+        for folder, jobs in iter_batches(manifest, base_url, batch_size):
+            in_flight.add(executor.submit(_render_batch, output_root, base_url, config.image_store_root, folder, jobs))
+            if len(in_flight) >= max_in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect(future)
+
+            now = time.perf_counter()
+            if now - last_report >= progress_every:
+                print(f"{pages} pages rendered ({pages / (now - started):.0f} pages/s)")
+                last_report = now
+
+        for future in in_flight:
+            collect(future)
+
+    removed = manifest.remove_stale()
+    manifest.save()
+    index_pages = build_indexes(output_root)
+    Output.write_if_changed(os.path.join(output_root, Render.SEARCH_SCRIPT_NAME), [Render.search_script_text()],
+                            compress=True)
+    Output.write_if_changed(os.path.join(output_root, "search.html"), Render.iter_search_page(), compress=True)
+    searchable = SearchIndex.build_search_index(output_root)
+
+    elapsed = time.perf_counter() - started
+    skipped = len(manifest.seen) - pages
+    print(f"Rendered {pages} pages ({total_bytes / 1e6:.1f} MB written) in {elapsed:.1f}s "
+          f"({pages / elapsed if elapsed else 0:.0f} pages/s), {skipped} unchanged, "
+          f"{removed} deleted artifacts removed, {index_pages} gallery pages, "
+          f"{searchable} artifacts in the search index, into {output_root}")
+    return pages
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render every artifact page of the museum catalog.")
+    parser.add_argument("--output", default=config.site_output_root, help="Output root (the Apache public_html)")
+    parser.add_argument("--base-url", default=config.site_base_url, help="Public URL of the output root, for QR codes")
+    parser.add_argument("--workers", type=int, default=config.site_workers, help="Rendering processes")
+    parser.add_argument("--batch-size", type=int, default=200, help="Artifacts sent to a worker at a time")
+    args = Connection.login_from_args(parser, argv)
+
+    build_site(args.output, base_url=args.base_url, workers=args.workers, batch_size=args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
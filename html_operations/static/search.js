@@ -0,0 +1,147 @@
+// Client-side search over the sharded index written by html_operations/SearchIndex.py.
+// Only the shards matching the typed words, and the document chunks of the shown results, are downloaded.
+(function () {
+    "use strict";
+
+    var MIN_TOKEN_LENGTH = 2;
+    var MAX_RESULTS = 50;
+    var root = document.currentScript.getAttribute("data-root") || "";
+    var cache = {};
+    var manifest = null;
+
+    function load(name) {
+        if (!cache[name]) {
+            cache[name] = fetch(root + "search/" + name).then(function (response) {
+                if (!response.ok) {
+                    throw new Error(response.status + " " + name);
+                }
+                return response.json();
+            }).catch(function (error) {
+                delete cache[name];  // A failed download (network blip, 404) is retried by the next query
+                throw error;
+            });
+        }
+        return cache[name];
+    }
+
+    // Same rules as tokens() in SearchIndex.py
+    function tokenize(text) {
+        return text.toLowerCase().normalize("NFKD").replace(/[\u0300-\u036f]/g, "")
+            .split(/[^a-z0-9]+/).filter(function (token) { return token.length >= MIN_TOKEN_LENGTH; });
+    }
+
+    // Shards that may hold tokens starting with `term`: the longest shard key that is a prefix of it,
+    // plus every (deeper) key that starts with it
+    function shardsFor(term) {
+        var longest = null;
+        var keys = manifest.shards.filter(function (key) {
+            if (term.indexOf(key) === 0 && (longest === null || key.length > longest.length)) {
+                longest = key;
+            }
+            return key.indexOf(term) === 0;
+        });
+        if (longest !== null && keys.indexOf(longest) < 0) {
+            keys.push(longest);
+        }
+        return keys;
+    }
+
+    function decode(deltas) {
+        var ids = [];
+        var id = 0;
+        for (var i = 0; i < deltas.length; i++) {
+            id += deltas[i];
+            ids.push(id);
+        }
+        return ids;
+    }
+
+    // {doc id: score} for one term: exact token matches score higher than prefix matches
+    function matchTerm(term) {
+        return Promise.all(shardsFor(term).map(function (key) { return load("shard-" + key + ".json"); }))
+            .then(function (shards) {
+                var scores = {};
+                shards.forEach(function (shard) {
+                    Object.keys(shard).forEach(function (token) {
+                        if (token.indexOf(term) !== 0) {
+                            return;
+                        }
+                        var score = token === term ? 2 : 1;
+                        decode(shard[token]).forEach(function (id) {
+                            scores[id] = Math.max(scores[id] || 0, score);
+                        });
+                    });
+                });
+                return scores;
+            });
+    }
+
+    function search(text) {
+        var terms = tokenize(text);
+        if (!terms.length) {
+            return Promise.resolve([]);
+        }
+        return load("index.json").then(function (loaded) {
+            manifest = loaded;
+            return Promise.all(terms.map(matchTerm));
+        }).then(function (perTerm) {
+            // Every term has to match (AND); the score is the sum over the terms
+            var ranked = Object.keys(perTerm[0]).filter(function (id) {
+                return perTerm.every(function (scores) { return id in scores; });
+            }).map(function (id) {
+                var score = perTerm.reduce(function (sum, scores) { return sum + scores[id]; }, 0);
+                return {id: Number(id), score: score};
+            }).sort(function (a, b) { return b.score - a.score || a.id - b.id; }).slice(0, MAX_RESULTS);
+
+            var chunks = {};
+            ranked.forEach(function (hit) { chunks[Math.floor(hit.id / manifest.docs_per_chunk)] = true; });
+            return Promise.all(Object.keys(chunks).map(function (chunk) {
+                return load("docs-" + chunk + ".json").then(function (docs) { return [chunk, docs]; });
+            })).then(function (loadedChunks) {
+                var docs = {};
+                loadedChunks.forEach(function (pair) { docs[pair[0]] = pair[1]; });
+                return ranked.map(function (hit) {
+                    var chunk = Math.floor(hit.id / manifest.docs_per_chunk);
+                    return docs[chunk][hit.id % manifest.docs_per_chunk];
+                });
+            });
+        });
+    }
+
+    var input = document.getElementById("search-input");
+    var results = document.getElementById("search-results");
+    var pending = 0;
+
+    function show(text) {
+        var request = ++pending;
+        search(text).then(function (documents) {
+            if (request !== pending) {
+                return; // A newer query has been typed since
+            }
+            results.textContent = "";
+            documents.forEach(function (doc) {
+                var item = document.createElement("li");
+                var link = document.createElement("a");
+                link.href = root + doc[1];
+                link.textContent = doc[0];
+                item.appendChild(link);
+                item.appendChild(document.createTextNode(" (" + doc[2] + ")"));
+                results.appendChild(item);
+            });
+            if (!documents.length && tokenize(text).length) {
+                results.textContent = "No matches.";
+            }
+        }).catch(function (error) {
+            results.textContent = "Search is unavailable: " + error.message;
+        });
+    }
+
+    var timer = null;
+    input.addEventListener("input", function () {
+        clearTimeout(timer);
+        timer = setTimeout(function () { show(input.value); }, 150);
+    });
+    if (input.value) {
+        show(input.value);
+    }
+}());
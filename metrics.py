@@ -0,0 +1,249 @@
+import atexit
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+import config
+
+# Histogram bucket upper bounds (seconds); the last, implicit bucket is +Inf
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Series:
+    """Count, errors, latency histogram and bytes written of one instrumented operation."""
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.bytes = 0
+
+
+class _Timer:
+    """Context manager recording the time spent in its block (and whether it raised) under `name`."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, error_type, error, traceback):
+        observe(self.name, time.perf_counter() - self.started, error=error_type is not None)
+        return False
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, error_type, error, traceback):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+_series = {}
+_lock = threading.Lock()
+_flusher = None
+_collect_only = False
+
+
+def enabled():
+    return config.metrics_file is not None
+
+
+def timer(name):
+    """Return a context manager timing its block under `name`; a shared no-op when metrics are disabled."""
+    if config.metrics_file is None:
+        return _NULL_TIMER
+    return _Timer(name)
+
+
+def timed(name):
+    """Decorator timing every call of a function under `name`. Disabled, it adds one attribute lookup per call."""
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if config.metrics_file is None:
+                return function(*args, **kwargs)
+            with _Timer(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _get(name):
+    series = _series.get(name)
+    if series is None:
+        series = _series[name] = _Series()
+    return series
+
+
+def observe(name, seconds, error=False):
+    """Record one call of `name` that took `seconds`."""
+    if config.metrics_file is None:
+        return
+    with _lock:
+        series = _get(name)
+        series.count += 1
+        series.errors += error
+        series.seconds += seconds
+        series.buckets[bisect_left(BUCKETS, seconds)] += 1
+    _start_flusher()
+
+
+def add_bytes(name, size):
+    """Add `size` bytes written to the counter of `name`."""
+    if config.metrics_file is None or not size:
+        return
+    with _lock:
+        _get(name).bytes += size
+    _start_flusher()
+
+
+def collect_only():
+    """Process pool initializer: workers keep recording but never write the metrics file; the parent merges
+    what they drain() instead, so there is one file (and one set of series) per application."""
+    global _collect_only
+    _collect_only = True
+
+
+def drain():
+    """Return the metrics recorded since the last drain ({name: series}, for merge()) and reset them."""
+    global _series
+    if config.metrics_file is None:
+        return {}
+    with _lock:
+        drained, _series = _series, {}
+    return drained
+
+
+def merge(drained):
+    """Add metrics drained in a worker process to this process's."""
+    if not drained:
+        return
+    with _lock:
+        for name, other in drained.items():
+            series = _get(name)
+            series.count += other.count
+            series.errors += other.errors
+            series.seconds += other.seconds
+            series.bytes += other.bytes
+            series.buckets = [mine + theirs for mine, theirs in zip(series.buckets, other.buckets)]
+    _start_flusher()
+
+
+def snapshot():
+    """Return the current metrics as a JSON-serialisable dict: {name: {count, errors, seconds, bytes, buckets}}."""
+    with _lock:
+        return {
+            name: {
+                "count": series.count,
+                "errors": series.errors,
+                "seconds": series.seconds,
+                "bytes": series.bytes,
+                # Cumulative, as in Prometheus: calls that took at most `le` seconds
+                "buckets": [
+                    {"le": bound, "count": sum(series.buckets[:index + 1])}
+                    for index, bound in enumerate(BUCKETS + ("+Inf",))
+                ],
+            }
+            for name, series in sorted(_series.items())
+        }
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text(metrics):
+    """Format a snapshot in the Prometheus text exposition format (for the node_exporter textfile collector)."""
+    lines = [
+        "# HELP museum_operation_seconds Time spent in instrumented operations.",
+        "# TYPE museum_operation_seconds histogram",
+    ]
+    for name, values in metrics.items():
+        for bucket in values["buckets"]:
+            lines.append(f'museum_operation_seconds_bucket{{operation="{_label(name)}",le="{bucket["le"]}"}} '
+                         f'{bucket["count"]}')
+        lines.append(f'museum_operation_seconds_sum{{operation="{_label(name)}"}} {values["seconds"]}')
+        lines.append(f'museum_operation_seconds_count{{operation="{_label(name)}"}} {values["count"]}')
+    for family, key, help_text in (("errors", "errors", "Instrumented operations that raised."),
+                                   ("bytes", "bytes", "Bytes written by instrumented operations.")):
+        lines.append(f"# HELP museum_operation_{family}_total {help_text}")
+        lines.append(f"# TYPE museum_operation_{family}_total counter")
+        for name, values in metrics.items():
+            lines.append(f'museum_operation_{family}_total{{operation="{_label(name)}"}} {values[key]}')
+    return "\n".join(lines) + "\n"
+
+
+def role():
+    """Name of the running program (e.g. "QR" for the application, "Site" for python -m html_operations.Site)."""
+    name = os.path.splitext(os.path.basename(sys.argv[0] if sys.argv else ""))[0]
+    return name if name not in ("", "-", "-c") else "python"
+
+
+def metrics_path():
+    # "{role}" in the file name gives each program its own, stable file
+    return config.metrics_file.format(role=role())
+
+
+def flush():
+    """Write the metrics to config.metrics_file (JSON, or Prometheus text when metrics_format is "prometheus")."""
+    if config.metrics_file is None or _collect_only:
+        return
+    metrics = snapshot()
+    if config.metrics_format == "prometheus":
+        text = prometheus_text(metrics)
+    else:
+        text = json.dumps({"role": role(), "pid": os.getpid(), "written": time.time(), "operations": metrics}, indent=2)
+
+    path = metrics_path()
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            file.write(text)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)  # Scrapers never read a half-written file
+    except OSError as err:
+        print(f"Could not write metrics to {path}: {err}")  # Metrics are best effort
+
+
+def _flush_periodically():
+    while True:
+        time.sleep(config.metrics_flush_interval)
+        flush()
+
+
+def _start_flusher():
+    """Start the flushing thread on the first recorded metric, so nothing runs while metrics are disabled."""
+    global _flusher
+    if _flusher is not None or _collect_only:
+        return
+    with _lock:
+        if _flusher is not None:
+            return
+        _flusher = threading.Thread(target=_flush_periodically, name="metrics-flush", daemon=True)
+        _flusher.start()
+    atexit.register(flush)
+
+
+def _reset_after_fork():
+    """A forked process (site build worker) starts with empty metrics: what it drains is its own work only."""
+    global _series, _lock, _flusher
+    _series = {}
+    _lock = threading.Lock()
+    _flusher = None
+
+
+if hasattr(os, "register_at_fork"):  # Windows spawns workers instead, with a fresh module
+    os.register_at_fork(after_in_child=_reset_after_fork)
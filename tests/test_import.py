@@ -0,0 +1,107 @@
+from database_operations import Catalog
+from database_operations import Import
+
+
+def test_iter_records_reads_csv_with_header_line_numbers(tmp_path):
+    path = tmp_path / "inventory.csv"
+    path.write_text("title,description\nCompass,Brass compass\nBell,Ship's bell\n", encoding="utf-8")
+    assert list(Import.iter_records(str(path))) == [
+        (2, {"title": "Compass", "description": "Brass compass"}),
+        (3, {"title": "Bell", "description": "Ship's bell"}),
+    ]
+
+
+def test_iter_records_reports_bad_jsonl_lines(tmp_path):
+    path = tmp_path / "inventory.jsonl"
+    path.write_text('{"title": "Compass"}\n\nnot json\n[1, 2]\n', encoding="utf-8")
+    records = list(Import.iter_records(str(path)))
+    assert records[0] == (1, {"title": "Compass"})
+    assert records[1][0] == 3 and records[1][1]["__error__"].startswith("invalid JSON")
+    assert records[2] == (4, {"__error__": "not a JSON object"})
+
+
+def test_record_to_row_maps_fields_and_lists():
+    row, errors = Import.record_to_row({
+        " title ": " Compass ",
+        "description": "Brass compass",
+        "location": "",
+        "tags": ["brass", "", "navigation"],
+        "references": ["Smith (1990)"],
+        "unknown": "ignored",
+    })
+    assert errors == []
+    assert set(row) == set(Catalog.ARTIFACT_COLUMNS)
+    assert row["title"] == "Compass"
+    assert row["location"] is None
+    assert (row["tag_1"], row["tag_2"], row["tag_3"]) == ("brass", "navigation", None)
+    assert row["reference_1"] == "Smith (1990)"
+    assert "unknown" not in row
+
+
+def test_record_to_row_rejects_too_many_list_items():
+    tags = [f"tag{i}" for i in range(len(Catalog.TAG_COLUMNS) + 1)]
+    row, errors = Import.record_to_row({"title": "Compass", "description": "Brass", "tags": tags})
+    assert f"more than {len(Catalog.TAG_COLUMNS)} tags" in errors
+
+
+def test_record_to_row_passes_parse_errors_through():
+    assert Import.record_to_row({"__error__": "invalid JSON"}) == (None, ["invalid JSON"])
+
+
+def test_validate_row_accepts_a_complete_row():
+    assert Catalog.validate_row(Catalog.entry_row("Compass", "Brass compass", size={"length": "12.5"})) == []
+
+
+def test_validate_row_reports_every_problem():
+    row = Catalog.entry_row("x" * (Catalog.TITLE_MAX_LENGTH + 1), "", tags=["t" * (Catalog.TAG_MAX_LENGTH + 1)],
+                            size={"length": "long", "width": Catalog.SIZE_MAX + 1})
+    errors = Catalog.validate_row(row)
+    assert "description is required" in errors
+    assert f"title is longer than {Catalog.TITLE_MAX_LENGTH} characters" in errors
+    assert f"tag_1 is longer than {Catalog.TAG_MAX_LENGTH} characters" in errors
+    assert "length is not a number" in errors
+    assert f"width is larger than {Catalog.SIZE_MAX}" in errors
+
+
+def test_validate_row_requires_a_title():
+    assert "title is required" in Catalog.validate_row(Catalog.entry_row("", "Brass compass"))
+
+
+def test_import_file_checks_titles_per_chunk(tmp_path, monkeypatch):
+    from contextlib import contextmanager
+    import json
+
+    @contextmanager
+    def cursor():
+        yield None
+
+    lookups, written = [], []
+
+    def existing_titles(cursor, titles):
+        lookups.append(list(titles))
+        catalog = dict.fromkeys(written, "tools")
+        catalog["Bell"] = "ships"
+        return {title: catalog[title] for title in titles if title in catalog}
+
+    def insert_entries(folder, rows, replace=False):
+        written.extend(row["title"] for row in rows)
+        return len(rows)
+
+    monkeypatch.setattr(Import.Connection, "cursor", cursor)
+    monkeypatch.setattr(Catalog, "existing_titles", existing_titles)
+    monkeypatch.setattr(Catalog, "insert_entries", insert_entries)
+    path = tmp_path / "inventory.jsonl"
+    path.write_text("".join(json.dumps({"title": title, "description": "d"}) + "\n"
+                            for title in ["Compass", "Compass", "Bell", "Oar", "Compass", "Flag"]), encoding="utf-8")
+
+    inserted, rejected = Import.import_file(str(path), "tools", chunk_size=2)
+
+    assert (inserted, rejected) == (3, 3)
+    assert written == ["Compass", "Oar", "Flag"]
+    assert lookups == [["Compass", "Bell"], ["Oar", "Compass"], ["Flag"]]  # One query per chunk, never per row
+    rejects = [json.loads(line) for line in (tmp_path / "inventory.jsonl.rejects.jsonl").read_text().splitlines()]
+    assert [(reject["line"], reject["errors"]) for reject in rejects] == [
+        (2, ["duplicate title in the input file"]), (3, ["title already exists in ships"]),
+        (5, ["title already exists in tools"]),
+    ]
+    assert Catalog.title_index._tables is None  # The import never loads the title index
@@ -0,0 +1,56 @@
+import os
+
+from html_operations import Manifest
+
+
+def _write(root, relative, text="x"):
+    path = os.path.join(root, relative)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(text)
+
+
+def test_fingerprint_is_stable_and_order_independent():
+    assert Manifest.fingerprint({"a": 1, "b": 2}, "v1") == Manifest.fingerprint({"b": 2, "a": 1}, "v1")
+    assert Manifest.fingerprint({"a": 1}, "v1") != Manifest.fingerprint({"a": 1}, "v2")
+
+
+def test_unchanged_artifact_with_its_outputs_is_current(tmp_path):
+    root = str(tmp_path)
+    manifest = Manifest.Manifest(root)
+    _write(root, "tools/compass.html")
+    manifest.record("tools/Compass", "h1", {"tools/compass.html": "d1"})
+    manifest.save()
+
+    reloaded = Manifest.Manifest(root)
+    assert reloaded.is_current("tools/Compass", "h1")
+    assert not reloaded.is_current("tools/Compass", "h2")  # Inputs changed
+    assert reloaded.output_digests("tools/Compass") == {"tools/compass.html": "d1"}
+    os.remove(os.path.join(root, "tools/compass.html"))
+    assert not reloaded.is_current("tools/Compass", "h1")  # Output deleted by hand
+    assert not reloaded.is_current("tools/Bell", "h1")  # Never built
+
+
+def test_remove_stale_deletes_outputs_of_unseen_artifacts(tmp_path):
+    root = str(tmp_path)
+    manifest = Manifest.Manifest(root)
+    for relative in ("tools/compass.html", "tools/compass.html.gz", "tools/bell.html"):
+        _write(root, relative)
+    manifest.record("tools/Compass", "h1", {"tools/compass.html": "d1"})
+    manifest.record("tools/Bell", "h2", {"tools/bell.html": "d2"})
+    manifest.save()
+
+    rebuild = Manifest.Manifest(root)
+    assert rebuild.is_current("tools/Bell", "h2")  # Only Bell is still in the catalog
+    assert rebuild.remove_stale() == 1
+    assert not os.path.exists(os.path.join(root, "tools/compass.html"))
+    assert not os.path.exists(os.path.join(root, "tools/compass.html.gz"))
+    assert os.path.exists(os.path.join(root, "tools/bell.html"))
+    assert set(rebuild.entries) == {"tools/Bell"}
+
+
+def test_corrupt_manifest_rebuilds_everything(tmp_path):
+    (tmp_path / Manifest.Manifest.FILE_NAME).write_text("{not json")
+    manifest = Manifest.Manifest(str(tmp_path))
+    assert manifest.entries == {}
+    assert not manifest.is_current("tools/Compass", "h1")
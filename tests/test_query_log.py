@@ -0,0 +1,82 @@
+import pytest
+
+import config
+import metrics
+from database_operations import QueryLog
+
+
+@pytest.mark.parametrize("statement, expected", [
+    ("SELECT * FROM `tools` WHERE title = %s LIMIT 1", "SELECT * FROM `tools` WHERE title = ? LIMIT ?"),
+    ("SELECT * FROM t WHERE note = 'it''s' AND n = 4.5", "SELECT * FROM t WHERE note = ? AND n = ?"),
+    ("SELECT * FROM t WHERE a = 'x\\'y'", "SELECT * FROM t WHERE a = ?"),
+    ("DELETE FROM t WHERE title IN (%s, %s,%s)", "DELETE FROM t WHERE title IN (...)"),
+    ("INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s)", "INSERT INTO t (a, b) VALUES (...)"),
+    ("SELECT  title\n  FROM t2", "SELECT title FROM t2"),  # Whitespace, and digits inside names, are kept
+])
+def test_shape_replaces_literals_and_value_lists(statement, expected):
+    assert QueryLog.shape(statement) == expected
+
+
+def test_same_shape_for_different_values_and_list_lengths():
+    first = QueryLog.shape("SELECT * FROM t WHERE id IN (1, 2) AND name = 'a'")
+    second = QueryLog.shape("SELECT * FROM t WHERE id IN (3, 4, 5) AND name = 'bb'")
+    assert first == second
+    assert QueryLog.shape_id(first) == QueryLog.shape_id(second)
+    assert len(QueryLog.shape_id(first)) == 10
+    assert QueryLog.shape("SELECT * FROM `tools`") != QueryLog.shape("SELECT * FROM `ships`")
+
+
+def test_statement_metric_uses_the_leading_keyword():
+    assert QueryLog.statement_metric("  select 1") == "db.select"
+    assert QueryLog.statement_metric("INSERT INTO t VALUES (%s)") == "db.insert"
+    assert QueryLog.statement_metric("(SELECT 1)") == "db.other"
+
+
+class _FakeCursor:
+    def execute(self, operation, params=()):
+        if "fail" in operation:
+            raise ValueError("boom")
+
+    def executemany(self, operation, seq_params):
+        pass
+
+
+def test_logged_cursor_records_statements_in_the_metrics(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "metrics_file", str(tmp_path / "metrics-{role}.json"))
+    monkeypatch.setattr(config, "slow_query_ms", None)
+    monkeypatch.setattr(metrics, "_start_flusher", lambda: None)
+    metrics.drain()
+    cursor = QueryLog.LoggedCursor(_FakeCursor())
+    cursor.execute("SELECT 1")
+    cursor.executemany("INSERT INTO t VALUES (%s)", [(1,), (2,)])
+    with pytest.raises(ValueError):
+        cursor.execute("SELECT fail")
+    recorded = {name: (series.count, series.errors) for name, series in metrics.drain().items()}
+    assert recorded == {"db.select": (2, 1), "db.insert": (1, 0)}
+
+
+def test_slow_statements_are_logged_and_explained_once(monkeypatch):
+    messages = []
+
+    class Logger:
+        def info(self, message):
+            messages.append(message)
+
+    monkeypatch.setattr(config, "metrics_file", None)
+    monkeypatch.setattr(config, "slow_query_ms", 0)
+    monkeypatch.setattr(QueryLog, "logger", lambda: Logger())
+    monkeypatch.setattr(QueryLog, "_explained", set())
+    cursor = QueryLog.LoggedCursor(_FakeCursor())
+    cursor.execute("SELECT * FROM t WHERE id = %s", (1,))
+    cursor.execute("SELECT * FROM t WHERE id = %s", (2,))
+    cursor.execute("SET NAMES utf8mb4")
+    assert len(messages) == 3 and all(message.startswith("SLOW ") for message in messages)
+    assert [operation for _, operation, _ in cursor.pending] == ["SELECT * FROM t WHERE id = %s"]
+
+
+def test_format_plan_marks_full_table_scans():
+    text = QueryLog._format_plan("abc", ["table", "type", "key"], [("tools", "ALL", None), ("ships", "ref", "idx")])
+    lines = text.splitlines()
+    assert lines[0] == "EXPLAIN [abc]"
+    assert lines[2].endswith("<-- full table scan of tools")
+    assert "full table scan" not in lines[3]
@@ -0,0 +1,110 @@
+import json
+import os
+from contextlib import contextmanager
+
+import pytest
+
+from html_operations import Render
+from html_operations import SearchIndex
+
+
+def test_tokens_fold_case_and_accents_and_drop_short_words():
+    assert SearchIndex.tokens("Côte-d'Azur: a Brass SEXTANT, 1890") == ["cote", "azur", "brass", "sextant", "1890"]
+    assert SearchIndex.tokens("") == []
+
+
+def test_document_tokens_use_title_location_and_tags():
+    data = {"title": "Brass Sextant", "location": "Gallery 2", "description": "not indexed", "tag_1": "Navigation"}
+    assert SearchIndex._document_tokens(data) == {"brass", "sextant", "gallery", "navigation"}
+
+
+def test_encode_delta_encodes_sorted_ids():
+    assert json.loads(SearchIndex._encode({"oar": [3, 4, 10], "bell": [0]})) == {"bell": [0], "oar": [3, 1, 6]}
+
+
+def _decode(shard):
+    postings = {}
+    for token, deltas in json.loads(shard).items():
+        ids, total = [], 0
+        for delta in deltas:
+            total += delta
+            ids.append(total)
+        postings[token] = ids
+    return postings
+
+
+def test_small_groups_stay_in_one_shard():
+    postings = {"brass": [0, 1], "bronze": [2]}
+    assert [key for key, _ in SearchIndex._shards(postings, "br")] == ["br"]
+
+
+def test_large_groups_are_split_by_longer_prefixes(monkeypatch):
+    monkeypatch.setattr(SearchIndex, "SHARD_MAX_BYTES", 40)
+    postings = {"br": [0], "brass": [0, 1, 2], "brace": [3], "bronze": [4, 5], "brooch": [6]}
+    shards = dict(SearchIndex._shards(postings, "br"))
+    assert set(shards) == {"br", "bra", "bro"}
+    assert _decode(shards["br"]) == {"br": [0]}  # Tokens no longer than the key stay in its own shard
+    assert _decode(shards["bra"]) == {"brace": [3], "brass": [0, 1, 2]}
+    # Every posting ends up in exactly one shard
+    merged = {}
+    for shard in shards.values():
+        merged.update(_decode(shard))
+    assert merged == postings
+
+
+def test_splitting_stops_at_the_longest_prefix(monkeypatch):
+    monkeypatch.setattr(SearchIndex, "SHARD_MAX_BYTES", 1)
+    postings = {"brass": [0], "brasses": [1]}
+    assert [key for key, _ in SearchIndex._shards(postings, "bras")] == ["bras"]
+
+
+@pytest.fixture
+def catalog(monkeypatch):
+    """Replace the database reads of build_search_index with an in-memory catalog."""
+    folders = {
+        "tools": [{"title": "Brass Sextant", "location": "Gallery 2", "tag_1": "navigation"},
+                  {"title": "Brass Compass", "location": None}],
+        "ships": [{"title": "Ship's Bell", "location": "Gallery 2"}],
+    }
+
+    @contextmanager
+    def cursor():
+        yield None
+
+    monkeypatch.setattr(SearchIndex.Connection, "cursor", cursor)
+    monkeypatch.setattr(SearchIndex.Catalog, "list_folders", lambda cursor: list(folders))
+    monkeypatch.setattr(SearchIndex.Catalog, "iter_folder_rows", lambda folder: iter(folders[folder]))
+    return folders
+
+
+def test_build_search_index_writes_manifest_shards_and_chunks(tmp_path, catalog, monkeypatch):
+    monkeypatch.setattr(SearchIndex, "DOCS_PER_CHUNK", 2)
+    assert SearchIndex.build_search_index(str(tmp_path)) == 3
+
+    directory = tmp_path / SearchIndex.SEARCH_DIRNAME
+    manifest = json.loads((directory / "index.json").read_text())
+    assert manifest["documents"] == 3 and manifest["docs_per_chunk"] == 2
+    documents = json.loads((directory / "docs-0.json").read_text()) + json.loads((directory / "docs-1.json").read_text())
+    assert documents == [
+        ["Brass Sextant", Render.page_path("tools", "Brass Sextant"), "tools"],
+        ["Brass Compass", Render.page_path("tools", "Brass Compass"), "tools"],
+        ["Ship's Bell", Render.page_path("ships", "Ship's Bell"), "ships"],
+    ]
+    postings = {}
+    for key in manifest["shards"]:
+        postings.update(_decode((directory / f"shard-{key}.json").read_text()))
+    assert postings["brass"] == [0, 1]
+    assert postings["gallery"] == [0, 2]
+    assert postings["bell"] == [2]
+    assert "navigation" in postings
+
+
+def test_build_search_index_removes_files_of_an_earlier_index(tmp_path, catalog):
+    directory = tmp_path / SearchIndex.SEARCH_DIRNAME
+    directory.mkdir()
+    for name in ("shard-zz.json", "shard-zz.json.gz", "docs-9.json", "notes.txt"):
+        (directory / name).write_text("{}")
+    SearchIndex.build_search_index(str(tmp_path))
+    names = set(os.listdir(directory))
+    assert not {"shard-zz.json", "shard-zz.json.gz", "docs-9.json"} & names
+    assert {"notes.txt", "index.json", "docs-0.json"} <= names
@@ -0,0 +1,52 @@
+import sqlite3
+
+import pytest
+
+from database_operations import Tags
+from database_operations.Schema import TAG_POSTING_TABLE
+
+POSTINGS = [
+    ("brass", "tools", "Compass"), ("navigation", "tools", "Compass"),
+    ("brass", "tools", "Sextant"), ("navigation", "tools", "Sextant"), ("silver", "tools", "Sextant"),
+    ("brass", "ships", "Bell"),
+    ("silver", "medals", "Medal"),
+]
+
+
+@pytest.fixture
+def run():
+    """Run _matching_sql queries against the postings in SQLite, which understands the same SQL."""
+    connection = sqlite3.connect(":memory:")
+    connection.execute(f"CREATE TABLE `{TAG_POSTING_TABLE}` (tag TEXT, folder TEXT, title TEXT)")
+    connection.executemany(f"INSERT INTO `{TAG_POSTING_TABLE}` VALUES (?, ?, ?)", POSTINGS)
+
+    def run(all_of=(), any_of=(), folders=None):
+        sql, params = Tags._matching_sql(all_of, any_of, folders)
+        assert sql.count("%s") == len(params)
+        return sorted(connection.execute(sql.replace("%s", "?"), params).fetchall())
+
+    yield run
+    connection.close()
+
+
+def test_all_of_requires_every_tag(run):
+    assert run(all_of=["brass", "navigation"]) == [("tools", "Compass"), ("tools", "Sextant")]
+    assert run(all_of=["brass", "navigation", "silver"]) == [("tools", "Sextant")]
+
+
+def test_any_of_requires_one_tag(run):
+    assert run(any_of=["silver", "nothing"]) == [("medals", "Medal"), ("tools", "Sextant")]
+
+
+def test_all_of_and_any_of_combine(run):
+    assert run(all_of=["brass"], any_of=["silver", "navigation"]) == [("tools", "Compass"), ("tools", "Sextant")]
+    assert run(all_of=["navigation"], any_of=["silver"]) == [("tools", "Sextant")]
+
+
+def test_tags_are_normalized_and_deduplicated(run):
+    assert run(all_of=[" Brass ", "brass"]) == [("ships", "Bell"), ("tools", "Compass"), ("tools", "Sextant")]
+
+
+def test_folders_restrict_the_result(run):
+    assert run(all_of=["brass"], folders=["ships"]) == [("ships", "Bell")]
+    assert run(folders=["medals"]) == [("medals", "Medal")]
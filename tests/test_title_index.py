@@ -0,0 +1,123 @@
+import threading
+import time
+
+import pytest
+
+from database_operations import Catalog
+
+CATALOG = {"Brass Compass": "tools", "brass bell": "ships", "Bronze Medal": "medals", "Oar": "ships"}
+
+
+@pytest.fixture
+def index(monkeypatch):
+    """A TitleIndex whose catalog scan returns CATALOG (plus whatever a test adds) instead of querying MySQL."""
+    monkeypatch.setattr(Catalog, "normalized", lambda: False)
+    index = Catalog.TitleIndex()
+    index.catalog = dict(CATALOG)
+    index.scans = 0
+
+    def build(cursor):
+        index.scans += 1
+        return dict(index.catalog)
+
+    index._build = build
+    return index
+
+
+def test_lookup_builds_once(index):
+    assert index.lookup(None, "Oar") == "ships"
+    assert index.lookup(None, "Missing") is None
+    assert sorted(index.titles(None)) == sorted(CATALOG)
+    assert index.scans == 1
+
+
+def test_with_prefix_is_case_insensitive_and_ordered(index):
+    assert index.with_prefix(None, "br") is None  # Memory only: not built yet
+    assert index.with_prefix(object(), "br") == ["brass bell", "Brass Compass", "Bronze Medal"]
+    assert index.with_prefix(None, "BRA") == ["brass bell", "Brass Compass"]
+    assert index.with_prefix(None, "br", folder="ships") == ["brass bell"]
+    assert index.with_prefix(None, "br", limit=1) == ["brass bell"]
+    assert index.with_prefix(None, "x") == []
+
+
+def test_record_write_and_delete_keep_both_maps_in_sync(index):
+    index.lookup(None, "Oar")
+    index.record_write("Brass Compass", "ships")  # Moved to another folder
+    index.record_write("Brass Anchor", "ships")
+    index.record_delete("brass bell")
+    assert index.lookup(None, "Brass Compass") == "ships"
+    assert index.with_prefix(None, "brass") == ["Brass Anchor", "Brass Compass"]
+    assert index.with_prefix(None, "brass", folder="tools") == []
+    assert index.with_prefix(None, "brass", folder="ships") == ["Brass Anchor", "Brass Compass"]
+    assert index.scans == 1
+
+
+def test_writes_before_the_build_are_not_recorded(index):
+    index.record_write("Brass Anchor", "ships")  # Nothing to update yet: the scan will see the row
+    assert index.lookup(None, "Brass Anchor") is None
+    assert index.scans == 1
+
+
+def test_refresh_is_rate_limited(index):
+    index.lookup(None, "Oar")
+    index.catalog["Flag"] = "flags"
+    assert not index.refresh(None)  # Built a moment ago
+    assert index.lookup(None, "Flag") is None
+    assert index.refresh(None, max_age=0)
+    assert index.lookup(None, "Flag") == "flags"
+    assert index.scans == 2
+
+
+def test_invalidate_forces_a_rebuild(index):
+    index.lookup(None, "Oar")
+    index.catalog.pop("Oar")
+    index.invalidate()
+    assert index.lookup(None, "Oar") is None
+    assert index.scans == 2
+
+
+def test_readers_do_not_wait_for_a_scan(index):
+    index.lookup(None, "Oar")
+    release = threading.Event()
+    scanning = threading.Event()
+
+    def slow_build(cursor):
+        scanning.set()
+        release.wait(5)
+        return {"Flag": "flags"}
+
+    index._build = slow_build
+    refresh = threading.Thread(target=index.refresh, args=(None, 0))
+    refresh.start()
+    try:
+        assert scanning.wait(5)
+        started = time.monotonic()
+        assert index.with_prefix(None, "oa") == ["Oar"]  # The previous snapshot, at once
+        assert time.monotonic() - started < 0.5
+        index.record_write("Flagpole", "flags")  # Made while the scan runs: must survive the swap
+    finally:
+        release.set()
+        refresh.join()
+    assert index.with_prefix(None, "fla") == ["Flag", "Flagpole"]
+    assert index.lookup(None, "Oar") is None
+
+
+def test_a_scan_overtaken_by_invalidate_is_not_installed(index):
+    release = threading.Event()
+    scanning = threading.Event()
+
+    def slow_build(cursor):
+        scanning.set()
+        release.wait(5)
+        return {"Stale": "ships"}
+
+    index._build = slow_build
+    results = []
+    lookup = threading.Thread(target=lambda: results.append(index.lookup(None, "Stale")))
+    lookup.start()
+    assert scanning.wait(5)
+    index.invalidate()
+    release.set()
+    lookup.join()
+    assert results == ["ships"]  # The caller still gets an answer...
+    assert index.with_prefix(None, "st") is None  # ...but the index stays unbuilt